@@ -0,0 +1,421 @@
+# alerts.py
+
+import ast
+import atexit
+import json
+import logging
+import os
+import queue
+import socket
+import sys
+import threading
+import time
+from datetime import datetime
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Kolom numerik snapshot: nama -> fungsi pengambil nilai dari hasil analisis live
+NUMERIC_COLUMNS = {
+    'price': lambda r: r.get('price'),
+    'confidence': lambda r: r.get('confidence'),
+    'volatility': lambda r: r.get('volatility'),
+    'ai_confidence': lambda r: r.get('ai_confidence'),
+    'total_buy': lambda r: r.get('total_buy'),
+    'total_sell': lambda r: r.get('total_sell'),
+    'price_change_24h': lambda r: r.get('price_change_24h'),
+    'rsi': lambda r: r.get('indicators', {}).get('rsi'),
+    'macd': lambda r: r.get('indicators', {}).get('macd'),
+    'stochastic': lambda r: r.get('indicators', {}).get('stochastic'),
+    'bollinger': lambda r: r.get('indicators', {}).get('bollinger'),
+    'adx': lambda r: r.get('indicators', {}).get('adx'),
+    'volume_ratio': lambda r: r.get('indicators', {}).get('volume'),
+    'ma_cross': lambda r: r.get('indicators', {}).get('ma_cross')
+}
+
+# Kolom turunan: perubahan dibanding update sebelumnya untuk seri yang sama
+DELTA_COLUMNS = {
+    'delta_confidence': 'confidence',
+    'delta_price_pct': 'price'
+}
+
+CATEGORICAL_COLUMNS = ('symbol', 'timeframe', 'action', 'ai_action')
+
+DEFAULT_COOLDOWN = 300
+
+# ===== KOMPILASI ATURAN =====
+
+_COMPARE_OPS = {
+    ast.Lt: np.less,
+    ast.LtE: np.less_equal,
+    ast.Gt: np.greater,
+    ast.GtE: np.greater_equal,
+    ast.Eq: np.equal,
+    ast.NotEq: np.not_equal
+}
+
+_BIN_OPS = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.true_divide
+}
+
+def _compile_node(node, columns):
+    """Ubah node AST menjadi fungsi cols -> array/skalar (dipanggil sekali saat aturan dimuat)"""
+    if isinstance(node, ast.Expression):
+        return _compile_node(node.body, columns)
+
+    if isinstance(node, ast.BoolOp):
+        parts = [_compile_node(value, columns) for value in node.values]
+        reduce = np.logical_and.reduce if isinstance(node.op, ast.And) else np.logical_or.reduce
+        return lambda cols: reduce([part(cols) for part in parts])
+
+    if isinstance(node, ast.UnaryOp):
+        operand = _compile_node(node.operand, columns)
+        if isinstance(node.op, ast.Not):
+            return lambda cols: np.logical_not(operand(cols))
+        if isinstance(node.op, ast.USub):
+            return lambda cols: np.negative(operand(cols))
+
+    if isinstance(node, ast.Compare):
+        left = _compile_node(node.left, columns)
+        checks = []
+        for op, comparator in zip(node.ops, node.comparators):
+            if isinstance(op, (ast.In, ast.NotIn)):
+                if not isinstance(comparator, (ast.Tuple, ast.List, ast.Set)):
+                    raise ValueError("Operator 'in' hanya untuk daftar konstanta, contoh: action in ('BUY', 'STRONG_BUY')")
+                values = [ast.literal_eval(element) for element in comparator.elts]
+                checks.append((isinstance(op, ast.NotIn), values))
+                continue
+            if type(op) not in _COMPARE_OPS:
+                raise ValueError(f"Operator tidak didukung: {type(op).__name__}")
+            checks.append((_COMPARE_OPS[type(op)], _compile_node(comparator, columns)))
+
+        def compare(cols):
+            # Perbandingan berantai (a < b < c) dievaluasi seperti Python: (a < b) and (b < c)
+            result = None
+            current = left(cols)
+            for check, operand in checks:
+                if isinstance(check, bool):
+                    mask = np.isin(current, operand, invert=check)
+                else:
+                    right = operand(cols)
+                    with np.errstate(invalid='ignore'):
+                        mask = check(current, right)
+                    current = right
+                result = mask if result is None else np.logical_and(result, mask)
+            return result
+        return compare
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _BIN_OPS:
+        left = _compile_node(node.left, columns)
+        right = _compile_node(node.right, columns)
+        op = _BIN_OPS[type(node.op)]
+
+        def binop(cols):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return op(left(cols), right(cols))
+        return binop
+
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == 'abs' and len(node.args) == 1:
+        argument = _compile_node(node.args[0], columns)
+        return lambda cols: np.abs(argument(cols))
+
+    if isinstance(node, ast.Name):
+        if node.id not in columns:
+            raise ValueError(f"Kolom tidak dikenal: {node.id} (tersedia: {', '.join(sorted(columns))})")
+        name = node.id
+        return lambda cols: cols[name]
+
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float, str)):
+        value = node.value
+        return lambda cols: value
+
+    raise ValueError(f"Ekspresi tidak didukung: {ast.dump(node)}")
+
+def compile_rule(expression):
+    """
+    Kompilasi ekspresi aturan menjadi predikat vectorized: cols (dict kolom -> array) -> array bool.
+    Contoh: "rsi < 25 and action in ('BUY', 'STRONG_BUY') and timeframe == '1h'"
+            "delta_confidence > 20"
+    """
+    columns = set(NUMERIC_COLUMNS) | set(DELTA_COLUMNS) | set(CATEGORICAL_COLUMNS)
+    predicate = _compile_node(ast.parse(expression, mode='eval'), columns)
+    return lambda cols: np.broadcast_to(np.asarray(predicate(cols), dtype=bool), cols['_active'].shape)
+
+# ===== SNAPSHOT KOLOM =====
+
+class ColumnSnapshot:
+    """
+    Snapshot kolumnar hasil terakhir semua seri: satu baris per (simbol, timeframe).
+    Update menulis satu baris di tempat, sehingga evaluasi aturan tidak perlu membangun ulang tabel.
+    """
+
+    def __init__(self, capacity=64):
+        self.index = {}
+        self._free = []
+        self.size = 0
+        self.cols = {}
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        old = self.cols
+        cols = {}
+        for name in list(NUMERIC_COLUMNS) + list(DELTA_COLUMNS):
+            cols[name] = np.full(capacity, np.nan)
+        for name in CATEGORICAL_COLUMNS:
+            cols[name] = np.full(capacity, '', dtype=object)
+        cols['_active'] = np.zeros(capacity, dtype=bool)
+        cols['_dirty'] = np.zeros(capacity, dtype=bool)
+        for name, values in old.items():
+            cols[name][:len(values)] = values
+        self.cols = cols
+        self.capacity = capacity
+
+    def _row(self, key):
+        row = self.index.get(key)
+        if row is None:
+            if self._free:
+                row = self._free.pop()
+            else:
+                if self.size == self.capacity:
+                    self._allocate(self.capacity * 2)
+                row = self.size
+                self.size += 1
+            self.index[key] = row
+        return row
+
+    def update(self, key, result):
+        row = self._row(key)
+        cols = self.cols
+        previous = {source: cols[source][row] for source in DELTA_COLUMNS.values()} if cols['_active'][row] else {}
+
+        for name, getter in NUMERIC_COLUMNS.items():
+            value = getter(result)
+            cols[name][row] = np.nan if value is None else value
+        for name in CATEGORICAL_COLUMNS:
+            cols[name][row] = result.get(name) or ''
+
+        prev_confidence = previous.get('confidence', np.nan)
+        prev_price = previous.get('price', np.nan)
+        cols['delta_confidence'][row] = cols['confidence'][row] - prev_confidence
+        cols['delta_price_pct'][row] = (cols['price'][row] / prev_price - 1) * 100 if prev_price else np.nan
+
+        cols['_active'][row] = True
+        cols['_dirty'][row] = True
+        return row
+
+    def remove(self, key):
+        row = self.index.pop(key, None)
+        if row is not None:
+            self.cols['_active'][row] = False
+            self.cols['_dirty'][row] = False
+            self._free.append(row)
+        return row
+
+    def row_values(self, row):
+        """Nilai satu baris sebagai dict Python biasa (NaN menjadi None)"""
+        values = {}
+        for name, column in self.cols.items():
+            if name.startswith('_'):
+                continue
+            value = column[row]
+            if isinstance(value, np.floating):
+                value = None if np.isnan(value) else float(value)
+            values[name] = value
+        return values
+
+# ===== SINK NOTIFIKASI =====
+
+class StdoutSink:
+    """Tulis alert sebagai JSON lines ke stdout"""
+
+    def __init__(self, stream=None):
+        # stdout asli: mode daemon mengalihkan sys.stdout ke stderr agar print modul analisis tidak tercampur
+        self.stream = stream or sys.__stdout__
+
+    def send(self, alert):
+        self.stream.write(json.dumps(alert, default=str) + '\n')
+        self.stream.flush()
+
+class FileSink:
+    """
+    Tambahkan alert sebagai JSON lines ke file.
+    send() hanya memasukkan alert ke antrean; thread latar menulis per batch lewat handle file
+    yang tetap terbuka, sehingga loop live tidak menunggu I/O disk.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a')
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name='alert-file-sink', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def send(self, alert):
+        self._queue.put(alert)
+
+    def _run(self):
+        stopped = False
+        while not stopped:
+            batch = [self._queue.get()]
+            # Alert lain yang sudah antre ditulis dalam satu write
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                stopped = True
+                batch = [alert for alert in batch if alert is not None]
+            if batch:
+                try:
+                    self._file.write(''.join(json.dumps(alert, default=str) + '\n' for alert in batch))
+                    self._file.flush()
+                except OSError as e:
+                    logger.warning(f"Alert gagal ditulis ke {self.path}: {str(e)}")
+        self._file.close()
+
+    def close(self):
+        """Tulis alert yang tersisa lalu tutup file"""
+        atexit.unregister(self.close)
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+class SocketSink:
+    """Kirim alert sebagai datagram ke socket lokal (udp:host:port atau unix:/path)"""
+
+    def __init__(self, address):
+        if isinstance(address, str):
+            self.family = socket.AF_UNIX
+        else:
+            self.family = socket.AF_INET
+        self.address = address
+        self._socket = socket.socket(self.family, socket.SOCK_DGRAM)
+
+    def send(self, alert):
+        try:
+            self._socket.sendto(json.dumps(alert, default=str).encode('utf-8'), self.address)
+        except OSError as e:
+            logger.warning(f"Alert gagal dikirim ke socket {self.address}: {str(e)}")
+
+def buat_sink(spec):
+    """Buat sink dari spesifikasi konfigurasi: 'stdout', 'file:<path>', 'udp:<host>:<port>', 'unix:<path>'"""
+    if spec == 'stdout':
+        return StdoutSink()
+    kind, _, target = spec.partition(':')
+    if kind == 'file':
+        return FileSink(target)
+    if kind == 'udp':
+        host, _, port = target.rpartition(':')
+        return SocketSink((host or '127.0.0.1', int(port)))
+    if kind == 'unix':
+        return SocketSink(target)
+    raise ValueError(f"Sink alert tidak dikenal: {spec}")
+
+# ===== ENGINE =====
+
+class AlertEngine:
+    """
+    Aturan alert dikompilasi sekali menjadi predikat numpy lalu dievaluasi ke seluruh snapshot
+    setiap ada update. Alert hanya dikirim untuk baris yang berubah sejak evaluasi terakhir
+    dan tidak sedang cooldown untuk aturan yang sama.
+    """
+
+    def __init__(self, rules, sinks):
+        self.snapshot = ColumnSnapshot()
+        self.sinks = list(sinks)
+        self.rules = []
+        for rule in rules:
+            try:
+                self.rules.append({
+                    'name': rule.get('name') or rule['when'],
+                    'when': rule['when'],
+                    'message': rule.get('message'),
+                    'cooldown': float(rule.get('cooldown', DEFAULT_COOLDOWN)),
+                    'predicate': compile_rule(rule['when']),
+                    'last_fired': {}
+                })
+            except (SyntaxError, ValueError, KeyError) as e:
+                logger.error(f"Aturan alert {rule!r} diabaikan: {str(e)}")
+        self.stats = {'evaluations': 0, 'fired': 0, 'suppressed': 0}
+
+    @classmethod
+    def from_config(cls, rules, sink_specs):
+        sinks = []
+        for spec in sink_specs:
+            try:
+                sinks.append(buat_sink(spec))
+            except (ValueError, OSError) as e:
+                logger.error(f"Sink alert {spec!r} diabaikan: {str(e)}")
+        return cls(rules, sinks)
+
+    def update(self, key, result):
+        self.snapshot.update(key, result)
+
+    def close(self):
+        """Tutup sink yang punya resource (file, thread penulis)"""
+        for sink in self.sinks:
+            if hasattr(sink, 'close'):
+                sink.close()
+
+    def remove(self, key):
+        self.snapshot.remove(key)
+        # Cooldown ikut dihapus agar seri yang ditambahkan lagi tidak mewarisi waktu alert lama
+        for rule in self.rules:
+            rule['last_fired'].pop(key, None)
+
+    def evaluate(self, now=None):
+        """Evaluasi semua aturan; Returns: list alert yang dikirim"""
+        now = time.time() if now is None else now
+        cols = self.snapshot.cols
+        dirty = cols['_dirty'] & cols['_active']
+        if not dirty.any():
+            return []
+        self.stats['evaluations'] += 1
+
+        fired = []
+        keys = {row: key for key, row in self.snapshot.index.items()}
+        for rule in self.rules:
+            try:
+                mask = rule['predicate'](cols) & dirty
+            except Exception as e:
+                logger.error(f"Error evaluasi aturan {rule['name']}: {str(e)}")
+                continue
+            for row in np.flatnonzero(mask):
+                key = keys[row]
+                if now - rule['last_fired'].get(key, -np.inf) < rule['cooldown']:
+                    self.stats['suppressed'] += 1
+                    continue
+                rule['last_fired'][key] = now
+                fired.append(self._buat_alert(rule, row, now))
+
+        cols['_dirty'][:] = False
+        for alert in fired:
+            for sink in self.sinks:
+                sink.send(alert)
+        self.stats['fired'] += len(fired)
+        return fired
+
+    def _buat_alert(self, rule, row, now):
+        values = self.snapshot.row_values(row)
+        message = rule['message'] or f"{values['symbol']}/USDT ({values['timeframe']}): {rule['when']}"
+        try:
+            message = message.format_map(values)
+        except (KeyError, ValueError, TypeError):
+            pass
+        return {
+            'type': 'alert',
+            'rule': rule['name'],
+            'symbol': values['symbol'],
+            'timeframe': values['timeframe'],
+            'message': message,
+            'values': values,
+            'timestamp': datetime.fromtimestamp(now).isoformat()
+        }
@@ -0,0 +1,177 @@
+# analysis_cache.py
+
+import hashlib
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+# Jumlah baris OHLCV terakhir yang ikut di-hash (panjang df juga masuk kunci)
+FINGERPRINT_ROWS = 200
+
+# File yang memengaruhi hasil analisis selain data: model ML per simbol dan database advisor
+MODEL_PATH_TEMPLATE = 'models/{symbol}_model.joblib'
+ADVISOR_FILES = ('data/crypto_profiles.json', 'data/market_conditions.json')
+
+# Pemangkasan file cache di disk: dicek setiap DISK_PRUNE_EVERY penyimpanan
+DISK_PRUNE_EVERY = 64
+DISK_FILES_PER_ENTRY = 4
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+def fingerprint_frame(df, rows=FINGERPRINT_ROWS):
+    """Hash blake2b dari timestamp + OHLCV baris terakhir; berubah begitu candle terbentuk berubah"""
+    tail = df.iloc[-rows:]
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(tail['timestamp'].values.astype('datetime64[ms]').astype(np.int64)).tobytes())
+    digest.update(np.ascontiguousarray(tail[['open', 'high', 'low', 'close', 'volume']].to_numpy(dtype=np.float64)).tobytes())
+    return digest.hexdigest()
+
+def versi_model(symbol):
+    """Versi model ML simbol dan database advisor (mtime file); berubah saat model dilatih ulang atau JSON diedit"""
+    return _mtime(MODEL_PATH_TEMPLATE.format(symbol=symbol)), tuple(_mtime(path) for path in ADVISOR_FILES)
+
+def buat_kunci(df, symbol, timeframe, account_balance, risk_percent):
+    """
+    Kunci cache hasil analisis lengkap: (simbol, timeframe, panjang df, hash data,
+    parameter akun/risiko, versi model dan database advisor berdasarkan mtime file)
+    """
+    return (symbol, timeframe, len(df), fingerprint_frame(df), float(account_balance), float(risk_percent)) + \
+        versi_model(symbol)
+
+def _nama_file(key):
+    return hashlib.blake2b(repr(key).encode('utf-8'), digest_size=16).hexdigest() + '.pkl'
+
+class AnalysisCache:
+    """
+    Cache LRU hasil run_comprehensive_analysis.
+    Hasil disimpan sebagai bytes pickle: ukuran memori terukur pasti untuk batas max_bytes,
+    dan setiap get() mengembalikan salinan baru sehingga pemanggil bebas mengubah hasilnya.
+    disk_dir (opsional): setiap entri juga ditulis ke disk dan dibaca saat miss di memori,
+    sehingga cache bertahan setelah restart dan bisa dipakai bersama oleh worker proses.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024, disk_dir=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0, 'stores': 0}
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+        if data is None and self.disk_dir:
+            data = self._baca_disk(key)
+            if data is not None:
+                with self._lock:
+                    self._stats['disk_hits'] += 1
+                self._simpan_memori(key, data)
+        if data is None:
+            with self._lock:
+                self._stats['misses'] += 1
+            CACHE_REQUESTS.inc(cache='analysis', result='miss')
+            return None
+        CACHE_REQUESTS.inc(cache='analysis', result='hit')
+        return pickle.loads(data)
+
+    def put(self, key, result):
+        data = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_bytes:
+            return
+        self._simpan_memori(key, data)
+        with self._lock:
+            self._stats['stores'] += 1
+        if self.disk_dir:
+            self._tulis_disk(key, data)
+
+    def _simpan_memori(self, key, data):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = data
+            self._bytes += len(data)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self._stats['evictions'] += 1
+
+    def _baca_disk(self, key):
+        path = os.path.join(self.disk_dir, _nama_file(key))
+        try:
+            with open(path, 'rb') as f:
+                stored_key, data = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            return None
+        # Kunci disimpan bersama data untuk mencegah tabrakan nama file
+        return data if stored_key == key else None
+
+    def _tulis_disk(self, key, data):
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            path = os.path.join(self.disk_dir, _nama_file(key))
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump((key, data), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Cache analisis gagal ditulis ke disk: {str(e)}")
+            return
+        if self._stats['stores'] % DISK_PRUNE_EVERY == 0:
+            self._pangkas_disk()
+
+    def _pangkas_disk(self):
+        """Hapus file cache tertua jika jumlahnya melebihi DISK_FILES_PER_ENTRY x max_entries"""
+        try:
+            entries = [entry for entry in os.scandir(self.disk_dir) if entry.name.endswith('.pkl')]
+            limit = self.max_entries * DISK_FILES_PER_ENTRY
+            if len(entries) <= limit:
+                return
+            entries.sort(key=lambda entry: entry.stat().st_mtime)
+            for entry in entries[:len(entries) - limit]:
+                os.remove(entry.path)
+        except OSError as e:
+            logger.warning(f"Cache analisis di disk gagal dipangkas: {str(e)}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Statistik cache: hit (memori/disk), miss, hit rate, eviction, jumlah entri dan ukuran"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._bytes
+        lookups = stats['hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        return stats
+
+# Cache bersama per proses; diganti lewat configure_cache (None = nonaktif)
+ANALYSIS_CACHE = AnalysisCache()
+
+def configure_cache(enabled=True, max_entries=256, max_mb=64, disk_dir=None):
+    global ANALYSIS_CACHE
+    ANALYSIS_CACHE = AnalysisCache(max_entries, int(max_mb * 1024 * 1024), disk_dir) if enabled else None
+    return ANALYSIS_CACHE
+
+def get_cache():
+    return ANALYSIS_CACHE
@@ -0,0 +1,149 @@
+# analysis_pool.py
+
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+from analysis import analyze_indicators
+from decision import make_decision, hitung_level_resiko
+from log_setup import buat_antrean_worker, setup_worker_logging
+
+# Fitur AI bersifat opsional, sama seperti di main.py
+try:
+    from intelligence_integration import run_comprehensive_analysis, configure_deadlines
+    AI_FEATURES_AVAILABLE = True
+except ImportError:
+    AI_FEATURES_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Urutan kolom pada array OHLCV yang dikirim ke worker
+ARRAY_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+def analisis_seri(df, simbol, timeframe, with_ai=False):
+    """
+    Analisis satu seri untuk mode live: indikator, keputusan, level risiko dan (opsional) AI.
+    Returns: dict baris tabel live
+    """
+    start_time = time.time()
+    timings = {}
+
+    # Durasi per tahap dicatat di hasil (bukan langsung ke metrik) karena fungsi ini
+    # juga berjalan di worker proses; proses utama yang meneruskannya ke metrik
+    stage_start = time.perf_counter()
+    analisis = analyze_indicators(df)
+    timings['analyze_indicators'] = time.perf_counter() - stage_start
+
+    stage_start = time.perf_counter()
+    keputusan = make_decision(analisis, df)
+    timings['make_decision'] = time.perf_counter() - stage_start
+
+    stage_start = time.perf_counter()
+    level_resiko = hitung_level_resiko(df, analisis['current_price'])
+    timings['hitung_level_resiko'] = time.perf_counter() - stage_start
+
+    result = {
+        'symbol': simbol,
+        'price': analisis['current_price'],
+        'action': keputusan['action'],
+        'confidence': keputusan['confidence'],
+        'timeframe': timeframe,
+        'volatility': level_resiko['volatilitas'],
+        'ai_action': None,
+        'ai_confidence': None,
+        # Nilai indikator terakhir (rsi, macd, stochastic, bollinger, adx, volume, ma_cross) untuk aturan alert
+        'indicators': {name.lower(): signal['value'] for name, signal in analisis['indicators'].items()},
+        'total_buy': analisis['total_buy'],
+        'total_sell': analisis['total_sell'],
+        'price_change_24h': analisis['price_change_24h']
+    }
+
+    if with_ai and AI_FEATURES_AVAILABLE:
+        stage_start = time.perf_counter()
+        ai_advice = run_comprehensive_analysis(df, simbol, timeframe).get('ai_advice', {})
+        timings['comprehensive_analysis'] = time.perf_counter() - stage_start
+        if 'error' not in ai_advice:
+            result['ai_action'] = ai_advice.get('action')
+            result['ai_confidence'] = ai_advice.get('confidence')
+
+    result['timings'] = timings
+    result['elapsed'] = time.time() - start_time
+    result['timestamp'] = datetime.now()
+    return result
+
+def pack_frame(df):
+    """Ubah DataFrame OHLCV menjadi array ringkas (timestamp epoch ms int64, OHLCV float64 n x 5)"""
+    timestamps = df['timestamp'].values.astype('datetime64[ms]').astype(np.int64)
+    values = np.ascontiguousarray(df[ARRAY_COLUMNS].to_numpy(dtype=np.float64))
+    return timestamps, values
+
+def unpack_frame(timestamps, values):
+    """Kebalikan pack_frame: bangun ulang DataFrame dengan skema yang dipakai modul analisis"""
+    df = pd.DataFrame(values, columns=ARRAY_COLUMNS)
+    df.insert(0, 'timestamp', pd.to_datetime(timestamps, unit='ms'))
+    return df
+
+def _init_worker(model_dir, log_queue, log_level, deadlines):
+    """Inisialisasi worker: modul analisis sudah diimpor, model dimuat sekali per worker"""
+    # Output print dari modul analisis tidak boleh bercampur dengan layar live;
+    # log worker diteruskan lewat antrean ke pipeline logging proses utama
+    sys.stdout = open(os.devnull, 'w')
+    setup_worker_logging(log_queue, log_level)
+    if AI_FEATURES_AVAILABLE:
+        from intelligence.ml_models import preload_models
+        preload_models(model_dir)
+        if deadlines is not None:
+            configure_deadlines(*deadlines)
+
+def _analisis_worker(simbol, timeframe, timestamps, values, with_ai):
+    """Dijalankan di worker: bangun ulang DataFrame dari array lalu analisis"""
+    return analisis_seri(unpack_frame(timestamps, values), simbol, timeframe, with_ai)
+
+class AnalysisPool:
+    """
+    Process pool dengan worker yang dipanaskan untuk analisis per simbol.
+    Worker memakai start method 'spawn' karena pool dibuat dari thread live,
+    dan fork dari proses multi-thread tidak aman.
+    """
+
+    def __init__(self, workers, model_dir='models', deadlines=None):
+        """deadlines: (batas total, dict batas per tahap) untuk analisis AI di worker, lihat configure_deadlines"""
+        self.workers = workers
+        context = multiprocessing.get_context('spawn')
+        self._log_queue, self._log_listener = buat_antrean_worker(context)
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(model_dir, self._log_queue, logging.getLogger().getEffectiveLevel(), deadlines)
+        )
+
+    def map_unordered(self, jobs, with_ai=False):
+        """
+        jobs: dict key -> (simbol, timeframe, df)
+        Yields: (key, result, error) sesuai urutan selesai, bukan urutan submit
+        """
+        futures = {}
+        for key, (simbol, timeframe, df) in jobs.items():
+            timestamps, values = pack_frame(df)
+            futures[self._executor.submit(_analisis_worker, simbol, timeframe, timestamps, values, with_ai)] = key
+
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, e
+
+    def submit(self, fn, *args):
+        """Jalankan fungsi level modul di worker (model sudah dimuat); Returns: concurrent Future"""
+        return self._executor.submit(fn, *args)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._log_listener.stop()
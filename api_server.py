@@ -0,0 +1,344 @@
+# api_server.py
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlsplit, parse_qs
+
+from analysis import analyze_indicators
+from decision import make_decision, hitung_level_resiko
+from market_data import ambil_data_crypto, COIN_MAP, DAYS_MAP, DEFAULT_REQUESTS_PER_MINUTE, RateLimiter
+from analysis_pool import AnalysisPool, AI_FEATURES_AVAILABLE, pack_frame, unpack_frame
+from analysis_cache import fingerprint_frame, versi_model
+from json_utils import nilai_json
+from log_setup import setup_logging
+from metrics import render_metrics, SINGLEFLIGHT_CALLS, STAGE_SECONDS
+
+if AI_FEATURES_AVAILABLE:
+    from intelligence_integration import run_comprehensive_analysis
+
+logger = logging.getLogger(__name__)
+
+# Histori per (simbol, timeframe) dipakai ulang selama DATA_TTL detik (rate limit CoinGecko)
+DATA_TTL = 60
+# Request histori tanpa data sama sekali menunggu token budget paling lama FETCH_WAIT detik
+FETCH_WAIT = 10
+# Pengambilan yang gagal tidak diulang sebelum backoff habis (FAILURE_BACKOFF x2 per kegagalan, maks FAILURE_BACKOFF_MAX)
+FAILURE_BACKOFF = 5
+FAILURE_BACKOFF_MAX = 120
+# Jumlah maksimum respons analisis yang disimpan (LRU)
+MAX_RESULTS = 1024
+# Batas ukuran header request
+MAX_HEADER_BYTES = 16 * 1024
+
+KINDS = ('indicators', 'decision', 'analysis')
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               431: 'Request Header Fields Too Large', 500: 'Internal Server Error',
+               502: 'Bad Gateway', 503: 'Service Unavailable'}
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+# ===== DIJALANKAN DI WORKER =====
+
+def tugas_api(kind, symbol, timeframe, timestamps, values, balance, risk):
+    """
+    Hitung satu respons API dari array OHLCV (dijalankan di worker proses).
+    Returns: body JSON (bytes), sehingga proses utama cukup menyimpan dan mengirimkannya
+    """
+    df = unpack_frame(timestamps, values)
+    if kind == 'indicators':
+        data = analyze_indicators(df)
+    elif kind == 'decision':
+        analisis = analyze_indicators(df)
+        data = {
+            'decision': make_decision(analisis, df),
+            'risk_levels': hitung_level_resiko(df, analisis['current_price']),
+            'current_price': analisis['current_price'],
+            'total_buy': analisis['total_buy'],
+            'total_sell': analisis['total_sell']
+        }
+    else:
+        data = run_comprehensive_analysis(df, symbol, timeframe, balance, risk)
+
+    body = {
+        'symbol': symbol,
+        'timeframe': timeframe,
+        'kind': kind,
+        'candle_time': df['timestamp'].iloc[-1].isoformat(),
+        'computed_at': datetime.now().isoformat(timespec='seconds'),
+        'data': nilai_json(data)
+    }
+    return json.dumps(body, default=str).encode('utf-8')
+
+# ===== SERVER =====
+
+class ApiServer:
+    """
+    Server HTTP/JSON asyncio untuk dashboard dan bot:
+      GET /indicators?symbol=BTC&timeframe=1h         hasil analyze_indicators
+      GET /decision?symbol=BTC&timeframe=1h           make_decision + level risiko
+      GET /analysis?symbol=BTC&timeframe=1h&balance=1000&risk=2   run_comprehensive_analysis
+      GET /health, /stats, /metrics
+
+    Event loop hanya parsing HTTP dan lookup cache. Histori diambil di thread I/O dan disimpan
+    DATA_TTL detik; analisis dijalankan di worker proses dan disimpan sebagai body JSON siap kirim
+    selama histori (fingerprint data) dan versi model/advisor tidak berubah. Permintaan identik
+    yang sedang berjalan digabung.
+
+    Semua pengambilan histori berbagi satu budget requests_per_minute. Saat budget habis histori
+    lama tetap dipakai; pengambilan yang gagal di-cache sebagai error selama backoff singkat.
+    """
+
+    def __init__(self, workers=2, data_ttl=DATA_TTL, max_results=MAX_RESULTS, deadline=None,
+                 requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE):
+        self.data_ttl = data_ttl
+        self._limiter = RateLimiter(requests_per_minute)
+        self.max_results = max_results
+        # workers=0: analisis di thread pool proses ini (lebih ringan, tetapi terikat GIL)
+        self._pool = AnalysisPool(workers, deadlines=(deadline, {})) if workers > 0 else None
+        self._cpu_executor = None if workers > 0 else ThreadPoolExecutor(max_workers=2, thread_name_prefix='api-cpu')
+        self._io_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='api-fetch')
+        self._frames = {}  # (simbol, timeframe) -> (waktu ambil, fingerprint, timestamps, values)
+        self._failures = {}  # (simbol, timeframe) -> (coba lagi setelah, jumlah gagal beruntun, pesan)
+        self._results = OrderedDict()  # (jenis, simbol, timeframe, parameter) -> (fingerprint, body)
+        self._inflight = {}
+        self.stats = {'requests': 0, 'result_hits': 0, 'computed': 0, 'coalesced': 0, 'fetches': 0, 'errors': 0,
+                      'stale_served': 0, 'throttled': 0, 'failure_hits': 0}
+        self._started = time.time()
+
+    async def _sekali(self, key, factory):
+        """Single-flight di event loop: pemanggil dengan kunci sama menunggu task yang sama"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            SINGLEFLIGHT_CALLS.inc(flight='api', role='leader')
+        else:
+            self.stats['coalesced'] += 1
+            SINGLEFLIGHT_CALLS.inc(flight='api', role='shared')
+        # shield: klien yang memutus koneksi tidak membatalkan task milik klien lain
+        return await asyncio.shield(task)
+
+    async def _frame(self, symbol, timeframe):
+        key = (symbol, timeframe)
+        frame = self._frames.get(key)
+        if frame is not None and time.time() - frame[0] < self.data_ttl:
+            return frame
+        return await self._sekali(('fetch',) + key, lambda: self._ambil(symbol, timeframe))
+
+    async def _ambil(self, symbol, timeframe):
+        key = (symbol, timeframe)
+        previous = self._frames.get(key)
+        failure = self._failures.get(key)
+        if failure is not None and time.time() < failure[0]:
+            # Gagal baru-baru ini: jangan langsung menembak CoinGecko lagi sebelum backoff habis
+            self.stats['failure_hits'] += 1
+            if previous is not None:
+                self.stats['stale_served'] += 1
+                return previous
+            raise ApiError(502, failure[2])
+
+        if not self._limiter.try_acquire():
+            self.stats['throttled'] += 1
+            if previous is not None:
+                # Budget habis: histori lama dipakai sampai token berikutnya tersedia
+                self.stats['stale_served'] += 1
+                return previous
+            await self._tunggu_budget()
+
+        loop = asyncio.get_running_loop()
+        self.stats['fetches'] += 1
+        with STAGE_SECONDS.time(stage='api_fetch'):
+            df = await loop.run_in_executor(self._io_executor, ambil_data_crypto, symbol, timeframe)
+        if df is None or df.empty:
+            failures = failure[1] + 1 if failure is not None else 1
+            backoff = min(FAILURE_BACKOFF_MAX, FAILURE_BACKOFF * 2 ** (failures - 1))
+            message = f"Gagal mengambil data {symbol} {timeframe}"
+            self._failures[key] = (time.time() + backoff, failures, message)
+            if previous is not None:
+                # Histori lama lebih berguna daripada error saat API sedang dibatasi
+                logger.warning(f"{message}, memakai histori sebelumnya (coba lagi dalam {backoff:.0f} detik)")
+                self.stats['stale_served'] += 1
+                return previous
+            raise ApiError(502, message)
+        self._failures.pop(key, None)
+        frame = (time.time(), fingerprint_frame(df)) + pack_frame(df)
+        self._frames[key] = frame
+        return frame
+
+    async def _tunggu_budget(self):
+        """Tunggu token budget untuk histori yang belum ada sama sekali, paling lama FETCH_WAIT detik"""
+        deadline = time.monotonic() + FETCH_WAIT
+        while not self._limiter.try_acquire():
+            wait = self._limiter.wait_time()
+            if time.monotonic() + wait > deadline:
+                raise ApiError(503, f"Budget request CoinGecko habis, coba lagi dalam {wait:.0f} detik")
+            await asyncio.sleep(wait)
+
+    async def _hasil(self, kind, symbol, timeframe, balance, risk):
+        frame = await self._frame(symbol, timeframe)
+        key = (kind, symbol, timeframe, balance, risk)
+        # Analisis lengkap juga bergantung pada model ML dan database advisor (mtime file)
+        version = (frame[1],) + versi_model(symbol) if kind == 'analysis' else (frame[1],)
+        cached = self._results.get(key)
+        if cached is not None and cached[0] == version:
+            self._results.move_to_end(key)
+            self.stats['result_hits'] += 1
+            return cached[1]
+        return await self._sekali(key + version, lambda: self._hitung(key, frame, version))
+
+    async def _hitung(self, key, frame, version):
+        kind, symbol, timeframe, balance, risk = key
+        args = (kind, symbol, timeframe, frame[2], frame[3], balance, risk)
+        self.stats['computed'] += 1
+        with STAGE_SECONDS.time(stage=f"api_{kind}"):
+            if self._pool is not None:
+                body = await asyncio.wrap_future(self._pool.submit(tugas_api, *args))
+            else:
+                body = await asyncio.get_running_loop().run_in_executor(self._cpu_executor, tugas_api, *args)
+        self._results[key] = (version, body)
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_results:
+            self._results.popitem(last=False)
+        return body
+
+    def _parameter(self, query):
+        symbol = (query.get('symbol', [''])[0]).upper()
+        timeframe = query.get('timeframe', ['1h'])[0]
+        if symbol not in COIN_MAP:
+            raise ApiError(404, f"Simbol {symbol or '(kosong)'} tidak dikenal")
+        if timeframe not in DAYS_MAP:
+            raise ApiError(400, f"Timeframe {timeframe} tidak didukung ({', '.join(DAYS_MAP)})")
+        try:
+            balance = float(query.get('balance', ['1000'])[0])
+            risk = float(query.get('risk', ['2'])[0])
+        except ValueError:
+            raise ApiError(400, "balance dan risk harus berupa angka")
+        return symbol, timeframe, balance, risk
+
+    async def _route(self, method, target):
+        if method != 'GET':
+            raise ApiError(405, f"Metode {method} tidak didukung")
+        url = urlsplit(target)
+        path = url.path.rstrip('/') or '/'
+        kind = path.lstrip('/')
+        if kind in KINDS:
+            if kind == 'analysis' and not AI_FEATURES_AVAILABLE:
+                raise ApiError(503, "Modul kecerdasan buatan tidak tersedia")
+            symbol, timeframe, balance, risk = self._parameter(parse_qs(url.query))
+            if kind != 'analysis':
+                # Parameter akun hanya memengaruhi analisis lengkap
+                balance = risk = None
+            return 200, await self._hasil(kind, symbol, timeframe, balance, risk), 'application/json'
+        if path == '/health':
+            return 200, b'{"status": "ok"}', 'application/json'
+        if path == '/stats':
+            stats = dict(self.stats, uptime=round(time.time() - self._started, 1),
+                         frames=len(self._frames), results=len(self._results), inflight=len(self._inflight))
+            return 200, json.dumps(stats).encode('utf-8'), 'application/json'
+        if path == '/metrics':
+            return 200, render_metrics().encode('utf-8'), 'text/plain; version=0.0.4'
+        raise ApiError(404, f"Endpoint {path} tidak ada")
+
+    async def handle(self, reader, writer):
+        """Satu koneksi HTTP/1.1 dengan keep-alive; request diproses berurutan per koneksi"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except asyncio.LimitOverrunError:
+                    writer.write(self._respons(431, b'{"error": "Header terlalu besar"}', 'application/json', False))
+                    break
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+
+                lines = head.decode('latin-1').split('\r\n')
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(':')
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                parts = lines[0].split(' ')
+                version = parts[2] if len(parts) == 3 else 'HTTP/1.0'
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection == 'keep-alive' or (version == 'HTTP/1.1' and connection != 'close')
+                if headers.get('content-length', '0').isdigit() and int(headers.get('content-length', '0')):
+                    await reader.readexactly(int(headers['content-length']))
+
+                self.stats['requests'] += 1
+                try:
+                    if len(parts) != 3:
+                        raise ApiError(400, "Request line tidak valid")
+                    status, body, content_type = await self._route(parts[0], parts[1])
+                except ApiError as e:
+                    self.stats['errors'] += 1
+                    status, body, content_type = e.status, json.dumps({'error': str(e)}).encode('utf-8'), 'application/json'
+                except Exception as e:
+                    self.stats['errors'] += 1
+                    logger.error(f"Error memproses {lines[0]}: {str(e)}")
+                    status, body, content_type = 500, json.dumps({'error': str(e)}).encode('utf-8'), 'application/json'
+
+                writer.write(self._respons(status, body, content_type, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def _respons(self, status, body, content_type, keep_alive):
+        head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        return head.encode('latin-1') + body
+
+    async def serve(self, host='127.0.0.1', port=8080):
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_HEADER_BYTES)
+        logger.info(f"API server berjalan di http://{host}:{port} (indicators, decision, analysis, stats, metrics)")
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+        if self._cpu_executor is not None:
+            self._cpu_executor.shutdown(wait=False)
+        self._io_executor.shutdown(wait=False)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP/JSON API TradingMetrics-AI")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1),
+                        help="Jumlah worker proses untuk analisis (0 = thread di proses server)")
+    parser.add_argument('--data-ttl', type=float, default=DATA_TTL, help="Detik histori dipakai ulang sebelum diambil lagi")
+    parser.add_argument('--deadline', type=float, help="Batas waktu (detik) analisis lengkap per request")
+    parser.add_argument('--rpm', type=float, default=DEFAULT_REQUESTS_PER_MINUTE,
+                        help="Budget request CoinGecko per menit untuk semua pengambilan histori")
+    parser.add_argument('--log-level', default='INFO')
+    args = parser.parse_args(argv)
+
+    setup_logging(args.log_level)
+    server = ApiServer(args.workers, args.data_ttl, deadline=args.deadline, requests_per_minute=args.rpm)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        logger.info("API server dihentikan")
+    finally:
+        server.close()
+
+if __name__ == "__main__":
+    main()
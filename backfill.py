@@ -0,0 +1,165 @@
+# backfill.py
+
+import argparse
+import logging
+import time
+import numpy as np
+import pandas as pd
+from pycoingecko import CoinGeckoAPI
+
+from bar_aggregator import timeframe_ms, build_ohlcv
+from candle_store import STORE_DIR, load_index, find_gaps, frame_to_records, save_records, to_epoch_ms
+from market_data import COIN_MAP, DEFAULT_REQUESTS_PER_MINUTE
+
+logger = logging.getLogger(__name__)
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+def rentang_maks_request(timeframe):
+    """
+    Rentang waktu maksimum satu request market_chart/range yang masih memberi resolusi cukup.
+    CoinGecko memberi titik 5 menit untuk rentang <= 1 hari dan titik per jam untuk rentang <= 90 hari.
+    """
+    if timeframe_ms(timeframe) < 60 * 60 * 1000:
+        return DAY_MS
+    return 90 * DAY_MS
+
+def rencanakan_backfill(gaps, timeframe, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE, max_span_ms=None):
+    """
+    Ubah daftar celah menjadi jumlah request API sesedikit mungkin.
+    Celah yang berdekatan digabung secara greedy ke satu jendela selama jendela tidak melebihi
+    max_span_ms; celah yang lebih panjang dari max_span_ms dipecah. Untuk jendela dengan
+    panjang tetap, greedy dari kiri ini menghasilkan jumlah jendela minimum.
+    Returns: list request {'from_ms', 'to_ms', 'gaps', 'missing_bars', 'not_before'}
+    """
+    tf_ms = timeframe_ms(timeframe)
+    if max_span_ms is None:
+        max_span_ms = rentang_maks_request(timeframe)
+    interval = 60.0 / requests_per_minute
+
+    plan = []
+    window = None
+    for gap_start, gap_end in sorted((int(s), int(e)) for s, e in gaps):
+        while gap_start <= gap_end:
+            if window is not None and gap_end + tf_ms - window['from_ms'] <= max_span_ms:
+                window['to_ms'] = gap_end + tf_ms
+                window['gaps'].append((gap_start, gap_end))
+                window['missing_bars'] += (gap_end - gap_start) // tf_ms + 1
+                break
+
+            if window is not None and gap_start + tf_ms - window['from_ms'] <= max_span_ms:
+                # Sebagian celah masih muat di jendela ini
+                split_end = window['from_ms'] + max_span_ms - tf_ms
+                split_end -= (split_end - gap_start) % tf_ms
+                window['to_ms'] = split_end + tf_ms
+                window['gaps'].append((gap_start, split_end))
+                window['missing_bars'] += (split_end - gap_start) // tf_ms + 1
+                gap_start = split_end + tf_ms
+                continue
+
+            window = {'from_ms': gap_start, 'to_ms': gap_start, 'gaps': [], 'missing_bars': 0}
+            plan.append(window)
+
+    for i, request in enumerate(plan):
+        request['not_before'] = i * interval
+
+    return plan
+
+def _mask_dalam_celah(timestamps, gaps):
+    """Mask candle yang jatuh di dalam salah satu celah (binary search per candle)"""
+    starts = np.array([gap[0] for gap in gaps], dtype=np.int64)
+    ends = np.array([gap[1] for gap in gaps], dtype=np.int64)
+    idx = np.searchsorted(starts, timestamps, side='right') - 1
+    valid = idx >= 0
+    mask = np.zeros(len(timestamps), dtype=bool)
+    mask[valid] = timestamps[valid] <= ends[idx[valid]]
+    return mask
+
+def jalankan_backfill(simbol, timeframe, plan, store_dir=STORE_DIR):
+    """
+    Eksekusi rencana backfill: ambil data per jendela sesuai jadwal rate limit,
+    bangun candle OHLC dan simpan hanya candle yang mengisi celah.
+    Returns: jumlah candle yang ditambahkan
+    """
+    if simbol not in COIN_MAP:
+        raise ValueError(f"Symbol {simbol} tidak ditemukan dalam mapping CoinGecko")
+
+    cg = CoinGeckoAPI()
+    start_time = time.time()
+    added = 0
+
+    for i, request in enumerate(plan, 1):
+        wait = request['not_before'] - (time.time() - start_time)
+        if wait > 0:
+            time.sleep(wait)
+
+        try:
+            data = cg.get_coin_market_chart_range_by_id(
+                id=COIN_MAP[simbol],
+                vs_currency='usd',
+                from_timestamp=request['from_ms'] // 1000,
+                to_timestamp=request['to_ms'] // 1000
+            )
+        except Exception as e:
+            logger.error(f"Request backfill {i}/{len(plan)} gagal: {str(e)}")
+            continue
+
+        prices = pd.DataFrame(data['prices'], columns=['timestamp', 'close'])
+        volumes = pd.DataFrame(data['total_volumes'], columns=['timestamp', 'volume'])
+        if prices.empty:
+            continue
+        prices['timestamp'] = prices['timestamp'].astype(np.int64)
+        volumes['timestamp'] = volumes['timestamp'].astype(np.int64)
+        points = pd.merge_asof(prices, volumes, on='timestamp')
+
+        candles = frame_to_records(build_ohlcv(
+            points['timestamp'].values, points['close'].values, points['volume'].fillna(0).values,
+            timeframe, volume_mode='last', continuous=False
+        ))
+
+        # Jangan menimpa candle yang sudah ada di store (misalnya dari dump bursa)
+        candles = candles[_mask_dalam_celah(candles['timestamp'], request['gaps'])]
+        added += save_records(simbol, timeframe, candles, store_dir)
+        logger.info(f"Backfill {simbol} {timeframe} request {i}/{len(plan)}: {len(candles)} candle")
+
+    return added
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Deteksi celah data candle lokal dan backfill dari CoinGecko")
+    parser.add_argument('--symbol', required=True, help="Simbol aset, contoh: BTC")
+    parser.add_argument('--timeframe', required=True, help="Timeframe, contoh: 15m")
+    parser.add_argument('--start', help="Awal rentang (tanggal atau epoch ms), default awal data di store")
+    parser.add_argument('--end', help="Akhir rentang (tanggal atau epoch ms), default akhir data di store")
+    parser.add_argument('--rpm', type=int, default=DEFAULT_REQUESTS_PER_MINUTE, help="Batas request per menit")
+    parser.add_argument('--store-dir', default=STORE_DIR, help="Direktori store lokal")
+    parser.add_argument('--dry-run', action='store_true', help="Hanya tampilkan celah dan rencana request")
+    args = parser.parse_args(argv)
+
+    simbol = args.symbol.upper()
+    start = to_epoch_ms(int(args.start) if args.start and args.start.isdigit() else args.start)
+    end = to_epoch_ms(int(args.end) if args.end and args.end.isdigit() else args.end)
+
+    index = load_index(simbol, args.timeframe, args.store_dir)
+    gaps = find_gaps(index, args.timeframe, start, end)
+    tf_ms = timeframe_ms(args.timeframe)
+    missing = int(((gaps[:, 1] - gaps[:, 0]) // tf_ms + 1).sum()) if len(gaps) else 0
+    print(f"{simbol} {args.timeframe}: {len(index):,} candle di store, {len(gaps):,} celah, {missing:,} candle hilang")
+
+    plan = rencanakan_backfill(gaps, args.timeframe, args.rpm)
+    for request in plan:
+        print(f"  {pd.Timestamp(request['from_ms'], unit='ms'):%Y-%m-%d %H:%M} -> "
+              f"{pd.Timestamp(request['to_ms'], unit='ms'):%Y-%m-%d %H:%M} UTC: "
+              f"{len(request['gaps'])} celah, {request['missing_bars']} candle (mulai +{request['not_before']:.0f} detik)")
+    print(f"Total {len(plan)} request, estimasi waktu {plan[-1]['not_before'] if plan else 0:.0f} detik")
+
+    if plan and not args.dry_run:
+        added = jalankan_backfill(simbol, args.timeframe, plan, args.store_dir)
+        print(f"{added:,} candle ditambahkan ke store")
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s: %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    main()
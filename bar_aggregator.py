@@ -0,0 +1,150 @@
+# bar_aggregator.py
+
+import numpy as np
+import pandas as pd
+
+# Satuan timeframe dalam milidetik
+_UNIT_MS = {
+    'm': 60 * 1000,
+    'h': 60 * 60 * 1000,
+    'd': 24 * 60 * 60 * 1000
+}
+
+def timeframe_ms(timeframe):
+    """Konversi string timeframe ('15m', '1h', '4h', '1d') ke milidetik"""
+    try:
+        return int(timeframe[:-1]) * _UNIT_MS[timeframe[-1]]
+    except (KeyError, ValueError, IndexError):
+        raise ValueError(f"Timeframe {timeframe} tidak dikenali")
+
+def bar_start(timestamp_ms, timeframe):
+    """Waktu mulai bar (epoch ms) yang memuat timestamp_ms"""
+    tf_ms = timeframe_ms(timeframe)
+    return timestamp_ms - timestamp_ms % tf_ms
+
+class BarAggregator:
+    """
+    Agregator streaming titik harga/volume menjadi bar OHLCV untuk beberapa timeframe sekaligus.
+    Setiap titik diproses O(1) per timeframe; saat titik pertama dari periode baru datang,
+    bar sebelumnya ditutup dan event "bar closed" dikirim ke semua subscriber.
+
+    volume_mode:
+        'sum'  - volume titik dijumlahkan (feed trade/tick)
+        'last' - volume terakhir dalam bar dipakai (feed snapshot seperti total_volumes 24 jam CoinGecko)
+    continuous:
+        Jika True, open bar baru = close bar sebelumnya. Cocok untuk feed harga sampel
+        (bukan trade) karena harga bergerak kontinu dari close sebelumnya.
+    """
+
+    def __init__(self, timeframes, symbol=None, volume_mode='sum', continuous=True, on_bar_closed=None):
+        if volume_mode not in ('sum', 'last'):
+            raise ValueError("volume_mode harus 'sum' atau 'last'")
+        self.symbol = symbol
+        self.volume_mode = volume_mode
+        self.continuous = continuous
+        self.timeframes = {tf: timeframe_ms(tf) for tf in timeframes}
+        self.forming = {tf: None for tf in self.timeframes}
+        self.last_close = {tf: None for tf in self.timeframes}
+        self.subscribers = []
+        if on_bar_closed is not None:
+            self.subscribers.append(on_bar_closed)
+
+    def subscribe(self, callback):
+        """Daftarkan callback(symbol, timeframe, bar) untuk event bar closed"""
+        self.subscribers.append(callback)
+
+    def seed(self, timeframe, bar):
+        """Mulai agregasi dari bar yang sudah ada (misalnya bar terakhir dari histori)"""
+        self.forming[timeframe] = dict(bar)
+        self.last_close[timeframe] = bar['close']
+
+    def update(self, timestamp_ms, price, volume=0.0):
+        """
+        Proses satu titik harga. Titik yang lebih tua dari bar yang sedang dibentuk diabaikan.
+        Returns: list (timeframe, bar) yang ditutup oleh titik ini
+        """
+        closed = []
+        for tf, tf_ms in self.timeframes.items():
+            start = timestamp_ms - timestamp_ms % tf_ms
+            bar = self.forming[tf]
+
+            if bar is not None and start == bar['timestamp']:
+                if price > bar['high']:
+                    bar['high'] = price
+                if price < bar['low']:
+                    bar['low'] = price
+                bar['close'] = price
+                bar['volume'] = bar['volume'] + volume if self.volume_mode == 'sum' else volume
+                continue
+
+            if bar is not None and start < bar['timestamp']:
+                continue
+
+            if bar is not None:
+                closed.append((tf, bar))
+                self.last_close[tf] = bar['close']
+
+            open_price = self.last_close[tf] if self.continuous and self.last_close[tf] is not None else price
+            self.forming[tf] = {
+                'timestamp': start,
+                'open': open_price,
+                'high': max(open_price, price),
+                'low': min(open_price, price),
+                'close': price,
+                'volume': volume
+            }
+
+        for tf, bar in closed:
+            for callback in self.subscribers:
+                callback(self.symbol, tf, bar)
+
+        return closed
+
+    def forming_bar(self, timeframe):
+        """Bar yang sedang dibentuk (belum ditutup) untuk timeframe tertentu"""
+        return self.forming[timeframe]
+
+def build_ohlcv(timestamps_ms, prices, volumes, timeframe, volume_mode='sum', continuous=True):
+    """
+    Versi batch (vectorized) dari BarAggregator untuk satu timeframe.
+    Input harus terurut berdasarkan waktu. Hasilnya identik dengan memproses titik satu per satu.
+    Returns: DataFrame dengan kolom timestamp, open, high, low, close, volume
+    """
+    timestamps_ms = np.asarray(timestamps_ms, dtype=np.int64)
+    prices = np.asarray(prices, dtype=np.float64)
+    volumes = np.asarray(volumes, dtype=np.float64)
+
+    if len(timestamps_ms) == 0:
+        return pd.DataFrame(columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+
+    tf_ms = timeframe_ms(timeframe)
+    starts = timestamps_ms - timestamps_ms % tf_ms
+
+    # Indeks titik pertama setiap bar
+    first_idx = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]])
+    last_idx = np.r_[first_idx[1:] - 1, len(prices) - 1]
+
+    close = prices[last_idx]
+    high = np.maximum.reduceat(prices, first_idx)
+    low = np.minimum.reduceat(prices, first_idx)
+
+    if continuous:
+        open_ = np.r_[prices[0], close[:-1]]
+        high = np.maximum(high, open_)
+        low = np.minimum(low, open_)
+    else:
+        open_ = prices[first_idx]
+
+    if volume_mode == 'sum':
+        volume = np.add.reduceat(volumes, first_idx)
+    else:
+        volume = volumes[last_idx]
+
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(starts[first_idx], unit='ms'),
+        'open': open_,
+        'high': high,
+        'low': low,
+        'close': close,
+        'volume': volume
+    })
@@ -0,0 +1,133 @@
+# bench_alloc.py
+
+import argparse
+import gc
+import json
+import logging
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import analysis_cache
+from analysis import analyze_indicators
+from indicators import calculate_adx
+from intelligence.market_context import calculate_market_phases
+from intelligence.risk_manager import calculate_volatility_metrics
+from intelligence.ml_models import prepare_features
+from intelligence_integration import run_comprehensive_analysis, _frame_fitur_ml
+
+# Batas kenaikan (relatif) terhadap baseline sebelum dianggap regresi
+DEFAULT_TOLERANCE = 0.10
+
+def buat_data(rows=500, seed=42):
+    """Data OHLCV sintetis yang deterministik (random walk), cukup panjang untuk semua indikator"""
+    rng = np.random.default_rng(seed)
+    close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.01, rows)))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.005, rows)) * close
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=rows, freq='h'),
+        'open': open_,
+        'high': np.maximum(open_, close) + spread,
+        'low': np.minimum(open_, close) - spread,
+        'close': close,
+        'volume': rng.uniform(100, 1000, rows)
+    })
+
+def ukur(fn, repeat):
+    """
+    Alokasi per panggilan lewat tracemalloc: peak (puncak memori sementara di atas kondisi awal)
+    dan net (memori yang masih tertahan setelah panggilan selesai), plus waktu rata-rata tanpa tracemalloc.
+    Panggilan pertama dibuang agar impor/cache lazy tidak ikut terukur.
+    """
+    fn()
+    peaks, nets = [], []
+    for _ in range(repeat):
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        result = fn()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del result
+        peaks.append(peak - before)
+        nets.append(current - before)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return {
+        'peak_bytes': int(np.median(peaks)),
+        'net_bytes': int(np.median(nets)),
+        'seconds': (time.perf_counter() - start) / repeat
+    }
+
+def jalankan(rows, repeat, symbol, timeframe):
+    df = buat_data(rows)
+    # Cache hasil dimatikan: setiap panggilan menghitung ulang seluruh analisis
+    analysis_cache.configure_cache(False)
+    targets = {
+        'run_comprehensive_analysis': lambda: run_comprehensive_analysis(df, symbol, timeframe, use_cache=False),
+        'prepare_features': lambda: prepare_features(df),
+        'frame_fitur_ml': lambda: _frame_fitur_ml(df),
+        'calculate_market_phases': lambda: calculate_market_phases(df),
+        'calculate_volatility_metrics': lambda: calculate_volatility_metrics(df),
+        'calculate_adx': lambda: calculate_adx(df),
+        'analyze_indicators': lambda: analyze_indicators(df)
+    }
+    return {name: ukur(fn, repeat) for name, fn in targets.items()}
+
+def bandingkan(results, baseline, tolerance):
+    """Daftar regresi: (nama, metrik, baseline, sekarang) jika naik lebih dari tolerance"""
+    regressions = []
+    for name, item in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for metric in ('peak_bytes', 'net_bytes'):
+            if item[metric] > base[metric] * (1 + tolerance) and item[metric] - base[metric] > 4096:
+                regressions.append((name, metric, base[metric], item[metric]))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark alokasi memori jalur analisis (per panggilan)")
+    parser.add_argument('--rows', type=int, default=500, help="Jumlah candle data sintetis")
+    parser.add_argument('--repeat', type=int, default=5, help="Jumlah pengukuran per fungsi")
+    parser.add_argument('--symbol', default='BTC', help="Simbol (menentukan model ML yang dimuat)")
+    parser.add_argument('--timeframe', default='1h')
+    parser.add_argument('--save', help="Simpan hasil ke file JSON (sebagai baseline)")
+    parser.add_argument('--baseline', help="Bandingkan dengan file JSON baseline; exit 1 jika ada regresi")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Kenaikan relatif yang masih diterima (default 0.10)")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    results = jalankan(args.rows, args.repeat, args.symbol, args.timeframe)
+
+    print(f"{'Fungsi':<30} {'Peak (KiB)':>12} {'Net (KiB)':>12} {'Waktu (ms)':>12}")
+    for name, item in results.items():
+        print(f"{name:<30} {item['peak_bytes'] / 1024:>12.1f} {item['net_bytes'] / 1024:>12.1f} "
+              f"{item['seconds'] * 1000:>12.2f}")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'rows': args.rows, 'results': results}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        if baseline.get('rows') != args.rows:
+            print(f"Peringatan: baseline diukur dengan {baseline.get('rows')} baris, sekarang {args.rows}")
+        regressions = bandingkan(results, baseline['results'], args.tolerance)
+        for name, metric, before, after in regressions:
+            print(f"REGRESI {name} {metric}: {before:,} -> {after:,} bytes ({(after / before - 1) * 100:+.1f}%)")
+        if regressions:
+            return 1
+        print("Tidak ada regresi alokasi terhadap baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,284 @@
+# candle_store.py
+
+import io
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+
+from bar_aggregator import timeframe_ms
+
+# Direktori default penyimpanan candle lokal
+STORE_DIR = 'data/candles'
+
+# Satu baris candle = 48 byte (timestamp epoch ms + 5 kolom float)
+CANDLE_DTYPE = np.dtype([
+    ('timestamp', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8')
+])
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+# Jumlah baris store yang dibaca per blok saat merge streaming (~48 MB)
+MERGE_BLOCK_ROWS = 1000000
+
+def store_path(symbol, timeframe, store_dir=STORE_DIR):
+    """Path file untuk satu seri (symbol, timeframe)"""
+    return os.path.join(store_dir, symbol.upper(), f"{timeframe}.npy")
+
+def empty_records():
+    """Array candle kosong dengan dtype standar"""
+    return np.empty(0, dtype=CANDLE_DTYPE)
+
+def dedupe_records(records):
+    """
+    Urutkan berdasarkan timestamp dan buang duplikat.
+    Jika ada timestamp ganda, baris yang datang terakhir yang dipertahankan.
+    """
+    if len(records) == 0:
+        return records
+    order = np.argsort(records['timestamp'], kind='stable')
+    records = records[order]
+    timestamps = records['timestamp']
+    keep = np.empty(len(records), dtype=bool)
+    keep[:-1] = timestamps[1:] != timestamps[:-1]
+    keep[-1] = True
+    return records[keep]
+
+def frame_to_records(df):
+    """Konversi DataFrame OHLCV (timestamp datetime atau epoch ms) ke array candle"""
+    records = np.empty(len(df), dtype=CANDLE_DTYPE)
+    timestamps = df['timestamp']
+    if pd.api.types.is_datetime64_any_dtype(timestamps):
+        records['timestamp'] = timestamps.values.astype('datetime64[ms]').astype(np.int64)
+    else:
+        records['timestamp'] = np.asarray(timestamps, dtype=np.int64)
+    for column in OHLCV_COLUMNS[1:]:
+        records[column] = np.asarray(df[column], dtype=np.float64)
+    return records
+
+def records_to_frame(records):
+    """Konversi array candle ke DataFrame dengan skema yang dipakai modul analisis"""
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(records['timestamp'], unit='ms'),
+        'open': records['open'],
+        'high': records['high'],
+        'low': records['low'],
+        'close': records['close'],
+        'volume': records['volume']
+    })
+
+def load_records(symbol, timeframe, store_dir=STORE_DIR, mmap=True):
+    """
+    Muat array candle dari store lokal.
+    Dengan mmap=True file dipetakan ke memori sehingga hanya bagian yang dibaca yang dimuat.
+    """
+    path = store_path(symbol, timeframe, store_dir)
+    if not os.path.exists(path):
+        return empty_records()
+    return np.load(path, mmap_mode='r' if mmap else None)
+
+def _header_npy(rows, version):
+    """Header .npy untuk array candle 1 dimensi sepanjang rows"""
+    header = {'descr': np.lib.format.dtype_to_descr(CANDLE_DTYPE), 'fortran_order': False, 'shape': (rows,)}
+    buffer = io.BytesIO()
+    if version == (1, 0):
+        np.lib.format.write_array_header_1_0(buffer, header)
+    else:
+        np.lib.format.write_array_header_2_0(buffer, header)
+    return buffer.getvalue()
+
+def _baca_header(f):
+    """Returns: (versi, jumlah baris, offset data) atau None jika file bukan array candle standar"""
+    version = np.lib.format.read_magic(f)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+    else:
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+    if dtype != CANDLE_DTYPE or fortran_order or len(shape) != 1:
+        return None
+    return version, shape[0], f.tell()
+
+def _tambah_di_akhir(path, records):
+    """
+    Append candle yang seluruhnya lebih baru dari isi store langsung di akhir file.
+    Data ditulis dulu, baru shape di header diperbarui, jadi pembaca melihat panjang lama atau baru.
+    Header .npy diberi ruang untuk pertumbuhan shape sehingga panjangnya tidak berubah.
+    Returns: False jika header tidak bisa diperbarui di tempat (pemanggil menulis ulang file)
+    """
+    with open(path, 'r+b') as f:
+        header = _baca_header(f)
+        if header is None:
+            return False
+        version, rows, offset = header
+        new_header = _header_npy(rows + len(records), version)
+        if len(new_header) != offset:
+            return False
+        f.seek(offset + rows * CANDLE_DTYPE.itemsize)
+        f.write(records.tobytes())
+        # Sisa data dari append yang terputus sebelum header diperbarui dibuang
+        f.truncate()
+        f.flush()
+        f.seek(0)
+        f.write(new_header)
+    return True
+
+def _tulis_gabungan(path, existing, records, block_rows):
+    """
+    Merge streaming store lama (mmap) dengan candle baru ke file sementara lalu ganti secara atomik.
+    Store dibaca per blok block_rows baris; setiap blok digabung hanya dengan candle baru yang
+    timestamp-nya jatuh di rentang blok itu, jadi memori sebanding blok + chunk, bukan ukuran store.
+    Returns: jumlah baris hasil gabungan
+    """
+    timestamps = records['timestamp']
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            # Jumlah baris akhir belum diketahui; header ditulis ulang di akhir dengan panjang yang sama
+            header = _header_npy(len(existing) + len(records), (1, 0))
+            f.write(header)
+            total = 0
+            position = 0
+            for start in range(0, len(existing), block_rows):
+                block = np.array(existing[start:start + block_rows])
+                if start + block_rows < len(existing):
+                    end = int(np.searchsorted(timestamps, block['timestamp'][-1], side='right'))
+                else:
+                    end = len(records)
+                if end > position:
+                    # Candle baru ditaruh setelah blok: untuk timestamp ganda, yang baru dipertahankan
+                    block = dedupe_records(np.concatenate([block, records[position:end]]))
+                    position = end
+                f.write(block.tobytes())
+                total += len(block)
+            if position < len(records):
+                f.write(records[position:].tobytes())
+                total += len(records) - position
+
+            final_header = _header_npy(total, (1, 0))
+            if len(final_header) != len(header):
+                raise ValueError("Header store candle berubah panjang saat merge")
+            f.seek(0)
+            f.write(final_header)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return total
+
+def save_records(symbol, timeframe, records, store_dir=STORE_DIR, block_rows=MERGE_BLOCK_ROWS):
+    """
+    Gabungkan candle baru ke store lokal (dedupe + urut) tanpa memuat seluruh store.
+    - Candle yang semuanya lebih baru dari isi store (ingest dump kronologis, update rutin)
+      di-append langsung di akhir file: I/O dan memori sebanding ukuran chunk
+    - Candle yang tumpang tindih atau mengisi celah: merge streaming per blok ke file sementara
+      lalu diganti secara atomik
+    Returns: jumlah baris baru yang ditambahkan ke store
+    """
+    records = dedupe_records(records.astype(CANDLE_DTYPE, copy=False))
+    if len(records) == 0:
+        return 0
+    path = store_path(symbol, timeframe, store_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    existing = load_records(symbol, timeframe, store_dir)
+    rows = len(existing)
+    if rows and records['timestamp'][0] > existing['timestamp'][-1]:
+        del existing
+        if _tambah_di_akhir(path, records):
+            return len(records)
+        existing = load_records(symbol, timeframe, store_dir)
+
+    total = _tulis_gabungan(path, existing, records, block_rows)
+    return total - rows
+
+def load_candles(symbol, timeframe, limit=None, store_dir=STORE_DIR):
+    """Muat candle sebagai DataFrame (timestamp, open, high, low, close, volume)"""
+    records = load_records(symbol, timeframe, store_dir)
+    if limit is not None:
+        records = records[-limit:]
+    return records_to_frame(records)
+
+def list_series(store_dir=STORE_DIR):
+    """Daftar seri yang tersedia di store: list of (symbol, timeframe, jumlah_baris)"""
+    series = []
+    if not os.path.isdir(store_dir):
+        return series
+    for symbol in sorted(os.listdir(store_dir)):
+        symbol_dir = os.path.join(store_dir, symbol)
+        if not os.path.isdir(symbol_dir):
+            continue
+        for filename in sorted(os.listdir(symbol_dir)):
+            if filename.endswith('.npy'):
+                timeframe = filename[:-len('.npy')]
+                series.append((symbol, timeframe, len(load_records(symbol, timeframe, store_dir))))
+    return series
+
+def to_epoch_ms(value):
+    """Konversi datetime, string tanggal atau epoch ms ke epoch ms (int)"""
+    if value is None:
+        return None
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return int(pd.Timestamp(value).value // 10**6)
+
+def load_index(symbol, timeframe, store_dir=STORE_DIR):
+    """
+    Index timestamp satu seri: array int64 epoch ms yang terurut.
+    Karena store dipetakan ke memori, index ini tidak menyalin data candle.
+    """
+    return load_records(symbol, timeframe, store_dir)['timestamp']
+
+def range_slice(timestamps, start=None, end=None):
+    """Cari batas indeks [start, end] (inklusif) dengan binary search pada timestamp terurut"""
+    lo = 0 if start is None else int(np.searchsorted(timestamps, to_epoch_ms(start), side='left'))
+    hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, to_epoch_ms(end), side='right'))
+    return lo, hi
+
+def query_range(symbol, timeframe, start=None, end=None, store_dir=STORE_DIR):
+    """Ambil candle dari start sampai end (inklusif), contoh: query_range('BTC', '15m', '2025-01-01', '2025-01-02')"""
+    records = load_records(symbol, timeframe, store_dir)
+    lo, hi = range_slice(records['timestamp'], start, end)
+    return records_to_frame(records[lo:hi])
+
+def find_gaps(timestamps, timeframe, start=None, end=None):
+    """
+    Deteksi candle yang hilang secara vectorized.
+    start/end (opsional) memperluas pemeriksaan ke rentang yang diminta.
+    Returns: array int64 shape (n, 2) berisi [candle_hilang_pertama, candle_hilang_terakhir] dalam epoch ms
+    """
+    tf_ms = timeframe_ms(timeframe)
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    start_ms = to_epoch_ms(start)
+    end_ms = to_epoch_ms(end)
+    if start_ms is not None:
+        start_ms -= start_ms % tf_ms
+    if end_ms is not None:
+        end_ms -= end_ms % tf_ms
+
+    if start_ms is not None or end_ms is not None:
+        lo, hi = range_slice(timestamps, start_ms, end_ms)
+        timestamps = timestamps[lo:hi]
+
+    if len(timestamps) == 0:
+        if start_ms is None or end_ms is None:
+            return np.empty((0, 2), dtype=np.int64)
+        return np.array([[start_ms, end_ms]], dtype=np.int64)
+
+    # Titik sentinel di luar rentang membuat celah di awal dan akhir ikut terdeteksi
+    if start_ms is not None:
+        timestamps = np.r_[start_ms - tf_ms, timestamps]
+    if end_ms is not None:
+        timestamps = np.r_[timestamps, end_ms + tf_ms]
+
+    diffs = np.diff(timestamps)
+    idx = np.flatnonzero(diffs > tf_ms)
+    gaps = np.empty((len(idx), 2), dtype=np.int64)
+    gaps[:, 0] = timestamps[idx] + tf_ms
+    gaps[:, 1] = timestamps[idx + 1] - tf_ms
+    return gaps
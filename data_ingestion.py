@@ -0,0 +1,204 @@
+# data_ingestion.py
+
+import argparse
+import logging
+import os
+import time
+import numpy as np
+import pandas as pd
+
+from candle_store import (
+    STORE_DIR, CANDLE_DTYPE, OHLCV_COLUMNS,
+    dedupe_records, save_records, load_records, load_candles
+)
+
+logger = logging.getLogger(__name__)
+
+# Nama kolom yang umum dipakai di dump bursa, dipetakan ke skema standar
+COLUMN_ALIASES = {
+    'timestamp': ['timestamp', 'time', 'date', 'datetime', 'open_time', 'opentime', 'ts', 'unix', 'start'],
+    'open': ['open', 'o', 'open_price'],
+    'high': ['high', 'h', 'high_price'],
+    'low': ['low', 'l', 'low_price'],
+    'close': ['close', 'c', 'close_price', 'price'],
+    'volume': ['volume', 'v', 'vol', 'volume_base', 'base_volume']
+}
+
+def petakan_kolom(columns):
+    """
+    Petakan nama kolom sumber ke skema standar.
+    Returns: dict {nama_kolom_sumber: nama_standar}
+    """
+    lowered = {str(col).strip().lower().replace(' ', '_').replace('-', '_'): col for col in columns}
+    mapping = {}
+    for target, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in lowered:
+                mapping[lowered[alias]] = target
+                break
+
+    missing = [col for col in OHLCV_COLUMNS if col not in mapping.values()]
+    if missing:
+        raise ValueError(f"Kolom wajib tidak ditemukan di dump: {', '.join(missing)}")
+    return mapping
+
+def normalisasi_timestamp(values):
+    """
+    Konversi kolom waktu ke epoch milidetik (int64).
+    Epoch numerik dideteksi otomatis (detik, milidetik, mikrodetik atau nanodetik).
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        raw = values.to_numpy(dtype=np.float64)
+        magnitude = np.nanmedian(np.abs(raw)) if len(raw) else 0
+        if magnitude > 1e17:
+            scale = 1e-6   # nanodetik
+        elif magnitude > 1e14:
+            scale = 1e-3   # mikrodetik
+        elif magnitude > 1e11:
+            scale = 1.0    # milidetik
+        else:
+            scale = 1e3    # detik
+        result = np.full(len(raw), np.iinfo(np.int64).min, dtype=np.int64)
+        finite = np.isfinite(raw)
+        result[finite] = np.round(raw[finite] * scale).astype(np.int64)
+        return result
+
+    parsed = pd.to_datetime(values, utc=True, errors='coerce')
+    return parsed.values.astype('datetime64[ms]').astype(np.int64)
+
+def normalisasi_chunk(chunk, mapping):
+    """Normalisasi satu chunk ke array candle dan buang baris yang tidak valid"""
+    chunk = chunk.rename(columns=mapping)
+    timestamps = normalisasi_timestamp(chunk['timestamp'])
+
+    records = np.empty(len(chunk), dtype=CANDLE_DTYPE)
+    records['timestamp'] = timestamps
+    for column in OHLCV_COLUMNS[1:]:
+        records[column] = pd.to_numeric(chunk[column], errors='coerce').to_numpy(dtype=np.float64)
+
+    # NaT dari pd.to_datetime menjadi nilai int64 minimum
+    valid = timestamps != np.iinfo(np.int64).min
+    for column in OHLCV_COLUMNS[1:]:
+        valid &= np.isfinite(records[column])
+    return records[valid]
+
+def baca_chunks(path, chunksize):
+    """
+    Baca dump CSV (boleh terkompresi) atau Parquet secara bertahap.
+    Yields: (DataFrame chunk, mapping kolom)
+    """
+    if path.lower().endswith(('.parquet', '.pq')):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("pyarrow diperlukan untuk membaca file Parquet (pip install pyarrow)")
+
+        parquet_file = pq.ParquetFile(path)
+        mapping = petakan_kolom(parquet_file.schema_arrow.names)
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=list(mapping.keys())):
+            yield batch.to_pandas(), mapping
+    else:
+        header = pd.read_csv(path, nrows=0)
+        mapping = petakan_kolom(header.columns)
+        for chunk in pd.read_csv(path, chunksize=chunksize, usecols=list(mapping.keys())):
+            yield chunk, mapping
+
+def ingest_file(path, symbol, timeframe, chunksize=500000, flush_rows=2000000, store_dir=STORE_DIR):
+    """
+    Ingest satu dump candle ke store lokal dengan memori terbatas.
+    Chunk dinormalisasi satu per satu; buffer di-flush ke store setiap flush_rows baris.
+    Returns: dict statistik ingest
+    """
+    start_time = time.time()
+    rows_before = len(load_records(symbol, timeframe, store_dir))
+
+    rows_read = 0
+    rows_invalid = 0
+    buffer = []
+    buffered_rows = 0
+
+    def flush():
+        nonlocal buffer, buffered_rows
+        if buffer:
+            save_records(symbol, timeframe, dedupe_records(np.concatenate(buffer)), store_dir)
+            buffer = []
+            buffered_rows = 0
+
+    for chunk, mapping in baca_chunks(path, chunksize):
+        records = normalisasi_chunk(chunk, mapping)
+        rows_read += len(chunk)
+        rows_invalid += len(chunk) - len(records)
+
+        buffer.append(dedupe_records(records))
+        buffered_rows += len(records)
+        if buffered_rows >= flush_rows:
+            flush()
+
+        elapsed = time.time() - start_time
+        logger.info(f"{os.path.basename(path)}: {rows_read:,} baris dibaca ({rows_read / max(elapsed, 1e-9):,.0f} baris/detik)")
+
+    flush()
+
+    elapsed = time.time() - start_time
+    rows_after = len(load_records(symbol, timeframe, store_dir))
+    rows_added = rows_after - rows_before
+
+    return {
+        'path': path,
+        'symbol': symbol.upper(),
+        'timeframe': timeframe,
+        'rows_read': rows_read,
+        'rows_invalid': rows_invalid,
+        'rows_added': rows_added,
+        'duplicates': rows_read - rows_invalid - rows_added,
+        'rows_total': rows_after,
+        'elapsed': elapsed,
+        'rows_per_sec': rows_read / elapsed if elapsed > 0 else 0
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest dump candle historis (CSV/Parquet) ke store lokal")
+    parser.add_argument('paths', nargs='+', help="File dump CSV (.csv, .csv.gz) atau Parquet")
+    parser.add_argument('--symbol', required=True, help="Simbol aset, contoh: BTC")
+    parser.add_argument('--timeframe', required=True, help="Timeframe candle di dump, contoh: 1h")
+    parser.add_argument('--chunksize', type=int, default=500000, help="Jumlah baris per chunk")
+    parser.add_argument('--flush-rows', type=int, default=2000000, help="Flush buffer ke store setiap N baris")
+    parser.add_argument('--store-dir', default=STORE_DIR, help="Direktori store lokal")
+    parser.add_argument('--train-model', action='store_true',
+                        help="Latih ulang model ML simbol ini dengan seluruh histori di store setelah ingest")
+    args = parser.parse_args(argv)
+
+    total_rows = 0
+    total_elapsed = 0.0
+    for path in args.paths:
+        stats = ingest_file(path, args.symbol, args.timeframe, args.chunksize, args.flush_rows, args.store_dir)
+        total_rows += stats['rows_read']
+        total_elapsed += stats['elapsed']
+        print(f"{stats['path']}: {stats['rows_read']:,} baris dibaca, {stats['rows_added']:,} baru, "
+              f"{stats['duplicates']:,} duplikat, {stats['rows_invalid']:,} tidak valid "
+              f"dalam {stats['elapsed']:.2f} detik ({stats['rows_per_sec']:,.0f} baris/detik)")
+
+    print(f"Total: {total_rows:,} baris dalam {total_elapsed:.2f} detik "
+          f"({total_rows / total_elapsed if total_elapsed > 0 else 0:,.0f} baris/detik), "
+          f"store {args.symbol.upper()}/{args.timeframe} sekarang berisi "
+          f"{len(load_records(args.symbol, args.timeframe, args.store_dir)):,} candle")
+
+    if args.train_model:
+        from intelligence.ml_models import train_model
+        from intelligence_integration import _frame_fitur_ml
+
+        history = load_candles(args.symbol, args.timeframe, store_dir=args.store_dir)
+        model_path = f"models/{args.symbol.upper()}_model.joblib"
+        start_time = time.time()
+        # Fitur sama dengan jalur prediksi (kolom fase pasar dan volatilitas), bukan OHLCV mentah saja
+        result = train_model(_frame_fitur_ml(history), save_path=model_path)
+        print(f"Model {model_path} dilatih dengan {len(history):,} candle dalam {time.time() - start_time:.2f} detik "
+              f"(akurasi {result['accuracy'] * 100:.1f}%)")
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s: %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    main()
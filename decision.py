@@ -1,18 +1,26 @@
 import numpy as np
+import pandas as pd
 from datetime import datetime
 
+from indicators import pct_change, rolling
+
+def _rata_terakhir(values, window):
+    """Nilai terakhir rolling mean: rata-rata `window` harga terakhir, NaN jika data kurang"""
+    return values[-window:].mean() if len(values) >= window else np.nan
+
 def calculate_trend(df, short_period=8, medium_period=21, long_period=55):
     """Calculate trend strength using multiple timeframes - optimized for crypto volatility"""
-    df['EMA_short'] = df['close'].ewm(span=short_period).mean()  # Changed to EMA for faster response
-    df['SMA_medium'] = df['close'].rolling(window=medium_period).mean()
-    df['SMA_long'] = df['close'].rolling(window=long_period).mean()
+    # Hanya nilai terakhir yang dipakai; df pemanggil tidak diberi kolom tambahan
+    # (kolom itu dulu ikut terbawa ke fitur model ML yang dilatih otomatis)
+    close = df['close'].to_numpy(dtype=np.float64)
+    ema_short = df['close'].ewm(span=short_period).mean().iloc[-1]  # Changed to EMA for faster response
     
     current_price = df['close'].iloc[-1]
     
     # Determine trend strength with weighted importance
-    short_trend = 1.5 if current_price > df['EMA_short'].iloc[-1] else -1.5  # Higher weight for short term
-    medium_trend = 1 if current_price > df['SMA_medium'].iloc[-1] else -1
-    long_trend = 0.5 if current_price > df['SMA_long'].iloc[-1] else -0.5  # Lower weight for long term
+    short_trend = 1.5 if current_price > ema_short else -1.5  # Higher weight for short term
+    medium_trend = 1 if current_price > _rata_terakhir(close, medium_period) else -1
+    long_trend = 0.5 if current_price > _rata_terakhir(close, long_period) else -0.5  # Lower weight for long term
     
     # Trend alignment adds extra strength
     aligned = (short_trend > 0 and medium_trend > 0 and long_trend > 0) or (short_trend < 0 and medium_trend < 0 and long_trend < 0)
@@ -41,9 +49,11 @@ def calculate_volume_trend(df, period=14):
 
 def calculate_volatility(df, window=14):
     """Calculate current market volatility"""
-    returns = df['close'].pct_change()
-    volatility = returns.rolling(window=window).std() * np.sqrt(window)
-    current_volatility = volatility.iloc[-1] * 100  # Convert to percentage
+    # Standar deviasi return pada jendela terakhir saja (window + 1 harga)
+    close = df['close'].to_numpy(dtype=np.float64)[-(window + 1):]
+    returns = pct_change(close)[1:]
+    std = returns.std(ddof=1) if len(returns) == window else np.nan
+    current_volatility = std * np.sqrt(window) * 100  # Convert to percentage
     
     if np.isnan(current_volatility):
         return 1.0  # Default medium volatility
@@ -173,4 +183,56 @@ def make_decision(analysis, df):
     if decision['confidence'] < 30 and decision['action'] != 'HOLD':
         decision['reason'].append("Low confidence signal - consider transaction costs")
     
-    return decision
\ No newline at end of file
+    return decision
+
+def hitung_level_resiko(df, harga_sekarang, modal_awal=150000):
+    """Menghitung level risiko dan rekomendasi stop loss/take profit"""
+    close = df['close'].to_numpy(dtype=np.float64)
+    volatilitas = pd.Series(pct_change(close), copy=False).std() * 100
+    # Rata-rata range 14 candle (max high - min low), dihitung di array tanpa Series perantara
+    atr = (rolling(df['high'].to_numpy(dtype=np.float64), 14).max().to_numpy()
+           - rolling(df['low'].to_numpy(dtype=np.float64), 14).min().to_numpy())
+    rata_atr = pd.Series(atr, copy=False).mean()
+    
+    if volatilitas > 5:
+        persen_sl = 0.02
+        rasio_tp = 3
+    elif volatilitas > 3:
+        persen_sl = 0.015
+        rasio_tp = 2.5
+    else:
+        persen_sl = 0.01
+        rasio_tp = 2
+
+    support_kuat = df['low'].tail(20).min()
+    support_lemah = harga_sekarang - rata_atr
+    resistance_lemah = harga_sekarang + rata_atr
+    resistance_kuat = df['high'].tail(20).max()
+
+    jumlah_resiko = modal_awal * 0.02
+    ukuran_posisi = jumlah_resiko / persen_sl
+    
+    return {
+        'zona_entry': {
+            'beli_kuat': support_kuat,
+            'beli_lemah': support_lemah,
+            'jual_lemah': resistance_lemah,
+            'jual_kuat': resistance_kuat
+        },
+        'stop_loss': {
+            'ketat': harga_sekarang * (1 - persen_sl),
+            'sedang': harga_sekarang * (1 - persen_sl * 1.5),
+            'longgar': harga_sekarang * (1 - persen_sl * 2)
+        },
+        'take_profit': {
+            'aman': harga_sekarang * (1 + persen_sl * rasio_tp),
+            'sedang': harga_sekarang * (1 + persen_sl * rasio_tp * 1.5),
+            'agresif': harga_sekarang * (1 + persen_sl * rasio_tp * 2)
+        },
+        'ukuran_posisi': {
+            'disarankan': ukuran_posisi,
+            'minimum': modal_awal * 0.5,
+            'maksimum': modal_awal * 2
+        },
+        'volatilitas': volatilitas
+    }
\ No newline at end of file
@@ -54,23 +54,52 @@ def calculate_bollinger_bands(prices, period=20, std=2):
     lower_band = sma - (rolling_std * std)
     return upper_band, sma, lower_band
 
+def rolling(values, window):
+    """Rolling window over a numpy array (wrapped in a Series without copying)"""
+    return pd.Series(values, copy=False).rolling(window=window)
+
+def true_range(high, low, close, out=None):
+    """True range as a numpy array (NaN on the first row, same as the shift(1) version)"""
+    out = np.subtract(high, low, out=out)
+    gap_high = np.full(len(close), np.nan)
+    gap_low = np.full(len(close), np.nan)
+    np.subtract(high[1:], close[:-1], out=gap_high[1:])
+    np.subtract(low[1:], close[:-1], out=gap_low[1:])
+    np.abs(gap_high, out=gap_high)
+    np.abs(gap_low, out=gap_low)
+    np.maximum(gap_high, gap_low, out=gap_high)
+    return np.maximum(out, gap_high, out=out)
+
+def pct_change(values, periods=1, out=None):
+    """Series.pct_change(periods) for a numpy array, optionally written into out"""
+    out = np.empty(len(values)) if out is None else out
+    out[:periods] = np.nan
+    if periods < len(values):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            np.divide(values[periods:], values[:-periods], out=out[periods:])
+        out[periods:] -= 1
+    return out
+
 def calculate_adx(df, period=14):
-    """Calculate ADX"""
-    df = df.copy()
-    df['TR'] = np.maximum(df['high'] - df['low'], 
-                         np.maximum(abs(df['high'] - df['close'].shift(1)),
-                                  abs(df['low'] - df['close'].shift(1))))
-    df['+DM'] = np.where((df['high'] - df['high'].shift(1)) > 
-                        (df['low'].shift(1) - df['low']),
-                        np.maximum(df['high'] - df['high'].shift(1), 0), 0)
-    df['-DM'] = np.where((df['low'].shift(1) - df['low']) > 
-                        (df['high'] - df['high'].shift(1)),
-                        np.maximum(df['low'].shift(1) - df['low'], 0), 0)
-    
-    df['TR14'] = df['TR'].rolling(window=period).mean()
-    df['+DI14'] = (df['+DM'].rolling(window=period).mean() / df['TR14']) * 100
-    df['-DI14'] = (df['-DM'].rolling(window=period).mean() / df['TR14']) * 100
-    df['DX'] = abs(df['+DI14'] - df['-DI14']) / (df['+DI14'] + df['-DI14']) * 100
-    adx = df['DX'].rolling(window=period).mean()
-    
-    return adx, df['+DI14'], df['-DI14']
\ No newline at end of file
+    """Calculate ADX (on numpy arrays, df is not copied or modified)"""
+    high = df['high'].to_numpy(dtype=np.float64)
+    low = df['low'].to_numpy(dtype=np.float64)
+    close = df['close'].to_numpy(dtype=np.float64)
+
+    up_move = np.full(len(df), np.nan)
+    down_move = np.full(len(df), np.nan)
+    np.subtract(high[1:], high[:-1], out=up_move[1:])
+    np.subtract(low[:-1], low[1:], out=down_move[1:])
+    plus_dm = np.where(up_move > down_move, np.maximum(up_move, 0), 0)
+    minus_dm = np.where(down_move > up_move, np.maximum(down_move, 0), 0)
+
+    tr14 = rolling(true_range(high, low, close), period).mean().to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plus_di = rolling(plus_dm, period).mean().to_numpy() / tr14 * 100
+        minus_di = rolling(minus_dm, period).mean().to_numpy() / tr14 * 100
+        dx = np.abs(plus_di - minus_di) / (plus_di + minus_di) * 100
+    adx = rolling(dx, period).mean().to_numpy()
+
+    return (pd.Series(adx, index=df.index, name='DX', copy=False),
+            pd.Series(plus_di, index=df.index, name='+DI14', copy=False),
+            pd.Series(minus_di, index=df.index, name='-DI14', copy=False))
@@ -4,16 +4,34 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import json
+import logging
 import os
 
+from intelligence.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+# Cache file JSON per path: (mtime, data); dibaca ulang hanya jika file berubah
+_json_cache = {}
+
+def _load_json_cached(path):
+    """Baca file JSON dengan cache per mtime (dipakai ulang antar simbol dalam satu proses)"""
+    mtime = os.path.getmtime(path)
+    cached = _json_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(path, 'r') as file:
+        data = json.load(file)
+    _json_cache[path] = (mtime, data)
+    return data
+
 def load_market_conditions():
     """
     Load current market conditions database
     """
     try:
         if os.path.exists('data/market_conditions.json'):
-            with open('data/market_conditions.json', 'r') as file:
-                return json.load(file)
+            return _load_json_cached('data/market_conditions.json')
         else:
             return {
                 'bitcoin_dominance': 50,
@@ -22,7 +40,7 @@ def load_market_conditions():
                 'last_updated': datetime.now().strftime('%Y-%m-%d')
             }
     except Exception as e:
-        print(f"Error loading market conditions: {str(e)}")
+        logger.error(f"Error loading market conditions: {str(e)}")
         return {
             'bitcoin_dominance': 50,
             'global_market_cap': 1000000000000,
@@ -36,8 +54,7 @@ def load_crypto_profiles():
     """
     try:
         if os.path.exists('data/crypto_profiles.json'):
-            with open('data/crypto_profiles.json', 'r') as file:
-                return json.load(file)
+            return _load_json_cached('data/crypto_profiles.json')
         else:
             # Default profiles for common cryptos
             return {
@@ -55,9 +72,10 @@ def load_crypto_profiles():
                 'default': {'correlation_to_market': 0.5, 'avg_volatility': 8.0, 'category': 'altcoin'}
             }
     except Exception as e:
-        print(f"Error loading crypto profiles: {str(e)}")
+        logger.error(f"Error loading crypto profiles: {str(e)}")
         return {'default': {'correlation_to_market': 0.5, 'avg_volatility': 8.0, 'category': 'altcoin'}}
 
+@traced()
 def evaluate_context(crypto_symbol, timeframe, technical_analysis, pattern_analysis, market_context, risk_analysis, ml_prediction):
     """
     Evaluate all context data to provide holistic advice
@@ -139,6 +157,7 @@ def evaluate_context(crypto_symbol, timeframe, technical_analysis, pattern_analy
         'ml_contribution': ml_score
     }
 
+@traced()
 def generate_trading_advice(crypto_symbol, timeframe, analysis_results, context_eval):
     """
     Generate specific trading advice based on all analyses
@@ -4,41 +4,53 @@ import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 
+from indicators import pct_change, rolling, true_range
+from intelligence.tracing import traced
+
+def kolom_fase_pasar(df, short_period=10, long_period=50):
+    """
+    Kolom turunan fase pasar (EMA, slope EMA, true range, ATR) sebagai dict nama -> array numpy.
+    df hanya dibaca; kolom yang sama juga dipakai sebagai fitur model ML.
+    """
+    close = df['close']
+    short_ema = close.ewm(span=short_period).mean().to_numpy()
+    long_ema = close.ewm(span=long_period).mean().to_numpy()
+    short_ema_slope = pct_change(short_ema, 5)
+    short_ema_slope *= 100
+    long_ema_slope = pct_change(long_ema, 10)
+    long_ema_slope *= 100
+    tr = true_range(df['high'].to_numpy(dtype=np.float64), df['low'].to_numpy(dtype=np.float64),
+                    close.to_numpy(dtype=np.float64))
+    return {
+        'short_ema': short_ema,
+        'long_ema': long_ema,
+        'short_ema_slope': short_ema_slope,
+        'long_ema_slope': long_ema_slope,
+        'tr': tr,
+        'atr': rolling(tr, 14).mean().to_numpy()
+    }
+
+@traced()
 def calculate_market_phases(df, short_period=10, long_period=50):
     """
     Mendeteksi fase pasar: uptrend, downtrend, ranging atau choppy
     """
-    # Calculate EMAs
-    df['short_ema'] = df['close'].ewm(span=short_period).mean()
-    df['long_ema'] = df['close'].ewm(span=long_period).mean()
-    
-    # Calculate EMA slope (rate of change)
-    df['short_ema_slope'] = df['short_ema'].pct_change(5) * 100
-    df['long_ema_slope'] = df['long_ema'].pct_change(10) * 100
+    columns = kolom_fase_pasar(df, short_period, long_period)
     
     # Current values
     current_close = df['close'].iloc[-1]
-    current_short_ema = df['short_ema'].iloc[-1]
-    current_long_ema = df['long_ema'].iloc[-1]
-    short_ema_slope = df['short_ema_slope'].iloc[-1]
-    long_ema_slope = df['long_ema_slope'].iloc[-1]
-    
-    # Calculate average true range for volatility
-    df['tr'] = np.maximum(
-        df['high'] - df['low'],
-        np.maximum(
-            abs(df['high'] - df['close'].shift(1)),
-            abs(df['low'] - df['close'].shift(1))
-        )
-    )
-    df['atr'] = df['tr'].rolling(window=14).mean()
+    current_short_ema = columns['short_ema'][-1]
+    current_long_ema = columns['long_ema'][-1]
+    short_ema_slope = columns['short_ema_slope'][-1]
+    long_ema_slope = columns['long_ema_slope'][-1]
     
     # Current ATR as percentage of price
-    atr_percent = (df['atr'].iloc[-1] / current_close) * 100
+    atr_percent = (columns['atr'][-1] / current_close) * 100
     
     # Calculate price range as percentage (identifies ranging market)
-    highest_high = df['high'].rolling(window=20).max().iloc[-1]
-    lowest_low = df['low'].rolling(window=20).min().iloc[-1]
+    # Hanya jendela 20 candle terakhir yang dibutuhkan, bukan seluruh deret rolling
+    highest_high = df['high'].to_numpy()[-20:].max() if len(df) >= 20 else np.nan
+    lowest_low = df['low'].to_numpy()[-20:].min() if len(df) >= 20 else np.nan
     price_range_percent = ((highest_high - lowest_low) / lowest_low) * 100
     
     # Determine market phase
@@ -78,6 +90,7 @@ def calculate_market_phases(df, short_period=10, long_period=50):
         "long_slope": long_ema_slope
     }
 
+@traced()
 def detect_support_resistance(df, lookback=100, threshold_percent=1.0):
     """
     Deteksi level support dan resistance penting
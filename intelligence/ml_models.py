@@ -10,71 +10,107 @@ import joblib
 import os
 from datetime import datetime
 
+from indicators import pct_change, rolling
+from intelligence.tracing import span, traced
+
+# Fitur dasar dalam urutan kolom hasil prepare_features (urutan ini tersimpan di feature_columns model)
+BASE_FEATURES = ['price_change', 'volume_change', 'high_low_diff', 'open_close_diff',
+                 'sma_10', 'sma_20', 'sma_50', 'sma_10_dist', 'sma_20_dist', 'sma_50_dist',
+                 'bb_middle', 'bb_std', 'bb_upper', 'bb_lower', 'bb_width', 'bb_position', 'rsi']
+LOOKBACK_FEATURES = ['price_momentum', 'volume_momentum', 'volatility', 'up_days_ratio']
+
+def _persen_selisih(a, b, out):
+    """((a - b) / b) * 100 ditulis ke out"""
+    np.subtract(a, b, out=out)
+    np.divide(out, b, out=out)
+    out *= 100
+    return out
+
+@traced()
 def prepare_features(df, lookback_periods=[5, 10, 20]):
     """
     Menyiapkan fitur untuk model ML dari data OHLCV
     lookback_periods: list periode untuk fitur historis
+    df tidak disalin maupun diubah: semua fitur ditulis ke satu buffer 2D yang dialokasikan
+    sekali lalu digabung dengan kolom df menjadi frame hasil.
     """
-    # Create a copy of the DataFrame to avoid modifying the original
-    data = df.copy()
-    
-    # Basic price and volume features
-    data['price_change'] = data['close'].pct_change() * 100
-    data['volume_change'] = data['volume'].pct_change() * 100
-    data['high_low_diff'] = ((data['high'] - data['low']) / data['low']) * 100
-    data['open_close_diff'] = ((data['close'] - data['open']) / data['open']) * 100
-    
-    # Moving averages
-    data['sma_10'] = data['close'].rolling(window=10).mean()
-    data['sma_20'] = data['close'].rolling(window=20).mean()
-    data['sma_50'] = data['close'].rolling(window=50).mean()
-    
-    # Distance from moving averages
-    data['sma_10_dist'] = ((data['close'] - data['sma_10']) / data['sma_10']) * 100
-    data['sma_20_dist'] = ((data['close'] - data['sma_20']) / data['sma_20']) * 100
-    data['sma_50_dist'] = ((data['close'] - data['sma_50']) / data['sma_50']) * 100
-    
-    # Bollinger Bands
-    data['bb_middle'] = data['close'].rolling(window=20).mean()
-    data['bb_std'] = data['close'].rolling(window=20).std()
-    data['bb_upper'] = data['bb_middle'] + (data['bb_std'] * 2)
-    data['bb_lower'] = data['bb_middle'] - (data['bb_std'] * 2)
-    data['bb_width'] = ((data['bb_upper'] - data['bb_lower']) / data['bb_middle']) * 100
-    data['bb_position'] = (data['close'] - data['bb_lower']) / (data['bb_upper'] - data['bb_lower'])
-    
-    # RSI calculation
-    delta = data['close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-    rs = gain / loss
-    data['rsi'] = 100 - (100 / (1 + rs))
-    
-    # Historical features for each lookback period
-    for period in lookback_periods:
-        # Price momentum features
-        data[f'price_momentum_{period}'] = data['close'].pct_change(periods=period) * 100
-        
-        # Volume momentum features
-        data[f'volume_momentum_{period}'] = data['volume'].pct_change(periods=period) * 100
-        
-        # Volatility features
-        data[f'volatility_{period}'] = data['price_change'].rolling(window=period).std()
-        
-        # Price direction features (proportion of up days)
-        data[f'up_days_ratio_{period}'] = data['price_change'].rolling(window=period).apply(
-            lambda x: (x > 0).sum() / period, raw=True
-        )
-    
+    names = BASE_FEATURES + [f"{name}_{period}" for period in lookback_periods for name in LOOKBACK_FEATURES]
+    buffer = np.empty((len(names), len(df)))
+    feature = dict(zip(names, buffer))
+
+    close = df['close'].to_numpy(dtype=np.float64)
+    volume = df['volume'].to_numpy(dtype=np.float64)
+    high = df['high'].to_numpy(dtype=np.float64)
+    low = df['low'].to_numpy(dtype=np.float64)
+    open_ = df['open'].to_numpy(dtype=np.float64)
+    scratch = np.empty(len(df))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Basic price and volume features
+        price_change = pct_change(close, out=feature['price_change'])
+        price_change *= 100
+        pct_change(volume, out=feature['volume_change'])
+        feature['volume_change'] *= 100
+        _persen_selisih(high, low, feature['high_low_diff'])
+        _persen_selisih(close, open_, feature['open_close_diff'])
+
+        # Moving averages and distance from moving averages
+        for period in (10, 20, 50):
+            sma = feature[f'sma_{period}']
+            sma[:] = rolling(close, period).mean().to_numpy()
+            _persen_selisih(close, sma, feature[f'sma_{period}_dist'])
+
+        # Bollinger Bands (middle = SMA 20 yang sudah dihitung)
+        middle, std = feature['bb_middle'], feature['bb_std']
+        middle[:] = feature['sma_20']
+        std[:] = rolling(close, 20).std().to_numpy()
+        np.multiply(std, 2, out=scratch)
+        np.add(middle, scratch, out=feature['bb_upper'])
+        np.subtract(middle, scratch, out=feature['bb_lower'])
+        np.subtract(feature['bb_upper'], feature['bb_lower'], out=scratch)
+        np.divide(scratch, middle, out=feature['bb_width'])
+        feature['bb_width'] *= 100
+        np.subtract(close, feature['bb_lower'], out=feature['bb_position'])
+        np.divide(feature['bb_position'], scratch, out=feature['bb_position'])
+
+        # RSI calculation
+        rsi = feature['rsi']
+        delta = np.full(len(df), np.nan)
+        np.subtract(close[1:], close[:-1], out=delta[1:])
+        gain = rolling(np.where(delta > 0, delta, 0), 14).mean().to_numpy()
+        loss = rolling(-np.where(delta < 0, delta, 0), 14).mean().to_numpy()
+        np.divide(gain, loss, out=rsi)
+        rsi += 1
+        np.divide(100, rsi, out=rsi)
+        np.subtract(100, rsi, out=rsi)
+
+        # Candle naik (1/0), NaN jika price_change NaN agar jendela rolling ikut NaN
+        up_days = (price_change > 0).astype(np.float64)
+        up_days[np.isnan(price_change)] = np.nan
+
+        # Historical features for each lookback period
+        for period in lookback_periods:
+            pct_change(close, period, out=feature[f'price_momentum_{period}'])
+            feature[f'price_momentum_{period}'] *= 100
+            pct_change(volume, period, out=feature[f'volume_momentum_{period}'])
+            feature[f'volume_momentum_{period}'] *= 100
+            feature[f'volatility_{period}'][:] = rolling(price_change, period).std().to_numpy()
+            # Proportion of up days
+            np.divide(rolling(up_days, period).sum().to_numpy(), period, out=feature[f'up_days_ratio_{period}'])
+
     # Target variable: price direction in next period
     # 1 if price increases, 0 if price decreases
-    data['target'] = (data['close'].shift(-1) > data['close']).astype(int)
+    target = np.zeros(len(df), dtype=int)
+    np.greater(close[1:], close[:-1], out=target[:-1], casting='unsafe')
+
+    features = pd.DataFrame(buffer.T, index=df.index, columns=names, copy=False)
+    data = pd.concat([df.drop(columns=[name for name in names + ['target'] if name in df.columns]), features], axis=1)
+    data['target'] = target
     
     # Drop NaN values
-    data = data.dropna()
-    
-    # Return processed data
-    return data
+    return data.dropna()
 
+@traced()
 def train_model(df, test_size=0.2, random_state=42, save_path=None):
     """
     Train a machine learning model to predict price movement direction
@@ -139,16 +175,36 @@ def train_model(df, test_size=0.2, random_state=42, save_path=None):
         'top_features': top_features
     }
 
+# Cache model yang sudah dimuat: path -> (mtime file, model_data)
+_model_cache = {}
+
+@traced()
 def load_model(model_path):
     """
     Load trained model and associated objects
+    Model di-cache per proses dan dimuat ulang hanya jika file model berubah
     """
     try:
+        mtime = os.path.getmtime(model_path)
+        cached = _model_cache.get(model_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
         model_data = joblib.load(model_path)
+        _model_cache[model_path] = (mtime, model_data)
         return model_data
     except:
         return None
 
+def preload_models(model_dir='models'):
+    """Muat semua model di direktori ke cache (dipakai untuk worker yang dipanaskan)"""
+    if not os.path.isdir(model_dir):
+        return 0
+    loaded = 0
+    for filename in os.listdir(model_dir):
+        if filename.endswith('_model.joblib') and load_model(os.path.join(model_dir, filename)) is not None:
+            loaded += 1
+    return loaded
+
 def predict_price_movement(df, model_data=None, model_path=None):
     """
     Predict future price movement using trained model
@@ -173,10 +229,12 @@ def predict_price_movement(df, model_data=None, model_path=None):
     latest_data = processed_data.iloc[-1:][feature_columns]
     
     # Scale features
-    latest_data_scaled = scaler.transform(latest_data)
+    with span('scaler.transform'):
+        latest_data_scaled = scaler.transform(latest_data)
     
     # Get prediction (probability of price increase)
-    prediction_proba = model.predict_proba(latest_data_scaled)[0]
+    with span('model.predict_proba'):
+        prediction_proba = model.predict_proba(latest_data_scaled)[0]
     
     # Get class probabilities
     down_prob = prediction_proba[0]  # Probability of price decrease
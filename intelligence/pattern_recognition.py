@@ -3,6 +3,8 @@
 import numpy as np
 import pandas as pd
 
+from intelligence.tracing import traced
+
 def detect_doji(df, tolerance=0.05):
     """
     Deteksi pola Doji (open dan close hampir sama)
@@ -184,6 +186,7 @@ def detect_morning_evening_star(df, doji_tolerance=0.1, body_ratio=0.5):
     
     return results
 
+@traced()
 def detect_all_patterns(df):
     """Deteksi semua pola candle dan return hasil"""
     patterns = []
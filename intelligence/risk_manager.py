@@ -4,44 +4,56 @@ import numpy as np
 import pandas as pd
 from datetime import datetime
 
+from indicators import pct_change, rolling, true_range
+from intelligence.tracing import traced
+
+def kolom_volatilitas(df, window=14):
+    """
+    Kolom turunan volatilitas (returns, volatilitas rolling, ATR, swing) sebagai dict nama -> array numpy.
+    df hanya dibaca; kolom yang sama juga dipakai sebagai fitur model ML.
+    """
+    high = df['high'].to_numpy(dtype=np.float64)
+    low = df['low'].to_numpy(dtype=np.float64)
+    close = df['close'].to_numpy(dtype=np.float64)
+
+    returns = pct_change(close)
+    volatility = rolling(returns, window).std().to_numpy() * np.sqrt(window)
+    tr = true_range(high, low, close)
+    atr = rolling(tr, window).mean().to_numpy()
+    atr_percent = atr / close
+    atr_percent *= 100
+
+    # Swing harga: (max high - min low) / close dalam 1, 3 dan 7 candle
+    swings = {}
+    for name, period in (('swing_1d', 1), ('swing_3d', 3), ('swing_7d', 7)):
+        swing = np.subtract(high, low) if period == 1 else np.subtract(
+            rolling(high, period).max().to_numpy(), rolling(low, period).min().to_numpy())
+        np.abs(swing, out=swing)
+        np.divide(swing, close, out=swing)
+        swing *= 100
+        swings[name] = swing
+
+    return {'returns': returns, 'volatility': volatility, 'tr': tr, 'atr': atr, 'atr_percent': atr_percent, **swings}
+
+@traced()
 def calculate_volatility_metrics(df, window=14):
     """
     Menghitung berbagai metrik volatilitas untuk aset
     """
-    # Calculate returns
-    df['returns'] = df['close'].pct_change()
-    
-    # Calculate rolling volatility (standard deviation of returns)
-    df['volatility'] = df['returns'].rolling(window=window).std() * np.sqrt(window)
-    
-    # Calculate Average True Range (ATR)
-    df['tr'] = np.maximum(
-        df['high'] - df['low'],
-        np.maximum(
-            abs(df['high'] - df['close'].shift(1)),
-            abs(df['low'] - df['close'].shift(1))
-        )
-    )
-    df['atr'] = df['tr'].rolling(window=window).mean()
-    df['atr_percent'] = (df['atr'] / df['close']) * 100
-    
-    # Calculate price swings over different periods
-    df['swing_1d'] = abs(df['high'] - df['low']) / df['close'] * 100
-    df['swing_3d'] = abs(df['high'].rolling(window=3).max() - df['low'].rolling(window=3).min()) / df['close'] * 100
-    df['swing_7d'] = abs(df['high'].rolling(window=7).max() - df['low'].rolling(window=7).min()) / df['close'] * 100
-    
+    columns = kolom_volatilitas(df, window)
     current_close = df['close'].iloc[-1]
     
     return {
-        'daily_volatility': df['volatility'].iloc[-1] * 100,  # as percentage
-        'atr': df['atr'].iloc[-1],
-        'atr_percent': df['atr_percent'].iloc[-1],
-        'swing_1d': df['swing_1d'].iloc[-1],
-        'swing_3d': df['swing_3d'].iloc[-1],
-        'swing_7d': df['swing_7d'].iloc[-1],
+        'daily_volatility': columns['volatility'][-1] * 100,  # as percentage
+        'atr': columns['atr'][-1],
+        'atr_percent': columns['atr_percent'][-1],
+        'swing_1d': columns['swing_1d'][-1],
+        'swing_3d': columns['swing_3d'][-1],
+        'swing_7d': columns['swing_7d'][-1],
         'current_price': current_close
     }
 
+@traced()
 def determine_risk_profile(crypto_symbol, volatility_metrics):
     """
     Menentukan profil risiko berdasarkan simbol crypto dan metrik volatilitas
@@ -93,6 +105,7 @@ def determine_risk_profile(crypto_symbol, volatility_metrics):
         'volatility_score': volatility_score
     }
 
+@traced()
 def calculate_position_size(account_balance, risk_percent, risk_level, entry_price, stop_loss):
     """
     Menghitung ukuran posisi berdasarkan manajemen risiko
@@ -143,6 +156,7 @@ def calculate_position_size(account_balance, risk_percent, risk_level, entry_pri
         'adjusted_stop': adjusted_stop
     }
 
+@traced()
 def calculate_optimal_stops(df, entry_price, risk_level, action, volatility_metrics):
     """
     Menghitung level stop loss dan take profit yang optimal
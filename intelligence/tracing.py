@@ -0,0 +1,188 @@
+# tracing.py
+
+import cProfile
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Tracing nonaktif secara default: span() hanya satu pengecekan flag dan tidak mencatat apa pun
+TRACING_ENABLED = os.environ.get('TRADINGMETRICS_TRACE', '') not in ('', '0')
+
+# Batas jumlah span yang disimpan (mode live bisa berjalan berhari-hari)
+MAX_SPANS = 100000
+
+_spans = deque(maxlen=MAX_SPANS)
+_spans_lock = threading.Lock()
+_local = threading.local()
+_origin = time.perf_counter()
+
+# Profiling opt-in: nama span -> direktori output file .prof
+_profiled = {}
+_profile_dir = 'profiles'
+_profile_lock = threading.Lock()
+_profile_seq = 0
+
+def enable_tracing(memory=False):
+    """
+    Aktifkan pencatatan span.
+    memory=True menyalakan tracemalloc untuk delta alokasi per span; overhead-nya besar dan
+    angkanya global untuk proses (span yang berjalan bersamaan di thread lain ikut terhitung).
+    """
+    global TRACING_ENABLED
+    TRACING_ENABLED = True
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+def disable_tracing():
+    global TRACING_ENABLED
+    TRACING_ENABLED = False
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+def profile_stages(names, output_dir='profiles'):
+    """Bungkus span dengan nama tertentu dalam cProfile; statistik ditulis ke output_dir/<nama>_<n>.prof"""
+    global _profile_dir
+    _profile_dir = output_dir
+    _profiled.clear()
+    _profiled.update(dict.fromkeys(names))
+    if names:
+        enable_tracing()
+
+def _dump_profile(name, profiler):
+    global _profile_seq
+    os.makedirs(_profile_dir, exist_ok=True)
+    _profile_seq += 1
+    path = os.path.join(_profile_dir, f"{name}_{os.getpid()}_{_profile_seq}.prof")
+    profiler.dump_stats(path)
+    logger.info(f"Profil {name} disimpan di {path}")
+
+@contextmanager
+def span(name, **attrs):
+    """
+    Catat satu span: waktu wall, waktu CPU thread, delta alokasi (jika tracemalloc aktif)
+    dan span induk di thread yang sama. Jika nama span diprofil, blok dijalankan di bawah cProfile.
+    """
+    if not TRACING_ENABLED:
+        yield
+        return
+
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    parent = stack[-1] if stack else None
+    stack.append(name)
+
+    # Hanya satu profiler aktif per proses; span lain yang diprofil bersamaan dilewati
+    profiler = None
+    if name in _profiled and _profile_lock.acquire(blocking=False):
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    memory = tracemalloc.is_tracing()
+    alloc_start = tracemalloc.get_traced_memory()[0] if memory else 0
+    cpu_start = time.thread_time()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        cpu = time.thread_time() - cpu_start
+        record = {
+            'name': name,
+            'parent': parent,
+            'start': start - _origin,
+            'wall': end - start,
+            'cpu': cpu,
+            'alloc': tracemalloc.get_traced_memory()[0] - alloc_start if memory else None,
+            'thread': threading.get_ident(),
+            'thread_name': threading.current_thread().name,
+            'attrs': attrs
+        }
+        stack.pop()
+        if profiler is not None:
+            profiler.disable()
+            try:
+                _dump_profile(name, profiler)
+            finally:
+                _profile_lock.release()
+        with _spans_lock:
+            _spans.append(record)
+
+def traced(name=None):
+    """Dekorator: setiap pemanggilan fungsi dicatat sebagai span (default: nama fungsi)"""
+    def decorator(fn):
+        span_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not TRACING_ENABLED:
+                return fn(*args, **kwargs)
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def get_spans():
+    with _spans_lock:
+        return list(_spans)
+
+def clear_spans():
+    with _spans_lock:
+        _spans.clear()
+
+def ringkasan_span(spans=None):
+    """Agregasi per nama span: jumlah, total/rata-rata wall, total CPU dan alokasi (diurutkan total wall)"""
+    summary = {}
+    for record in get_spans() if spans is None else spans:
+        item = summary.setdefault(record['name'], {'name': record['name'], 'count': 0, 'wall': 0.0,
+                                                   'cpu': 0.0, 'alloc': 0, 'max_wall': 0.0})
+        item['count'] += 1
+        item['wall'] += record['wall']
+        item['cpu'] += record['cpu']
+        item['alloc'] += record['alloc'] or 0
+        item['max_wall'] = max(item['max_wall'], record['wall'])
+    for item in summary.values():
+        item['mean_wall'] = item['wall'] / item['count']
+    return sorted(summary.values(), key=lambda item: -item['wall'])
+
+def export_chrome_trace(path, spans=None):
+    """
+    Tulis span sebagai Chrome trace-event JSON (complete event 'X').
+    Buka di chrome://tracing atau https://ui.perfetto.dev untuk tampilan flamegraph per thread.
+    """
+    pid = os.getpid()
+    events = []
+    thread_names = {}
+    for record in get_spans() if spans is None else spans:
+        thread_names[record['thread']] = record['thread_name']
+        args = {'cpu_ms': round(record['cpu'] * 1000, 3)}
+        if record['alloc'] is not None:
+            args['alloc_kb'] = round(record['alloc'] / 1024, 1)
+        args.update({key: str(value) for key, value in record['attrs'].items()})
+        events.append({
+            'name': record['name'],
+            'cat': record['parent'] or 'root',
+            'ph': 'X',
+            'ts': round(record['start'] * 1e6, 3),
+            'dur': round(record['wall'] * 1e6, 3),
+            'pid': pid,
+            'tid': record['thread'],
+            'args': args
+        })
+    for tid, thread_name in thread_names.items():
+        events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': thread_name}})
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+    return len(events)
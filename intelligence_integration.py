@@ -4,85 +4,379 @@ import pandas as pd
 from datetime import datetime
 import time
 import os
+import logging
+import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
 
 # Import semua modul kecerdasan
 from intelligence.pattern_recognition import analyze_patterns
-from intelligence.market_context import analyze_market_context
-from intelligence.risk_manager import analyze_risk_management
+from intelligence.market_context import analyze_market_context, kolom_fase_pasar
+from intelligence.risk_manager import analyze_risk_management, kolom_volatilitas
 from intelligence.ml_models import analyze_ml_prediction
 from intelligence.ai_advisor import provide_ai_advice
+from intelligence.tracing import span, traced
+import analysis_cache
+from singleflight import SingleFlight
 
-def run_comprehensive_analysis(df, crypto_symbol, timeframe="1h", account_balance=1000, risk_percent=2):
+logger = logging.getLogger(__name__)
+
+# Hasil tahap yang menjadi masukan provide_ai_advice
+ANALYSIS_KEYS = ('technical_analysis', 'pattern_analysis', 'market_context', 'risk_analysis', 'ml_prediction')
+
+# Tahap analisis yang independen dijalankan bersamaan di thread pool bersama
+# (pandas/numpy melepas GIL di sebagian besar operasi berat); dengan satu CPU tahap dijalankan inline
+STAGE_WORKERS = min(4, os.cpu_count() or 1)
+# Thread tahap yang melewati batas waktu tetap berjalan sampai selesai; cadangan ini
+# menjaga agar thread tersebut tidak menghabiskan slot analisis berikutnya
+STAGE_SPARE_WORKERS = 4
+_stage_executor = None
+_stage_executor_lock = threading.Lock()
+
+# Batas waktu analisis (detik, None = tanpa batas): total untuk semua tahap kontributor dan per tahap.
+# Tahap yang melewati batas diganti hasil kosong, provide_ai_advice tetap berjalan dengan sisa hasil.
+ANALYSIS_DEADLINE = None
+STAGE_DEADLINES = {}
+
+# Status hasil tahap yang tidak selesai
+STATUS_TIMEOUT = 'timeout'
+STATUS_SKIPPED = 'skipped'
+
+def configure_deadlines(deadline=None, stage_deadlines=None):
+    global ANALYSIS_DEADLINE, STAGE_DEADLINES
+    ANALYSIS_DEADLINE = deadline or None
+    STAGE_DEADLINES = {name: seconds for name, seconds in (stage_deadlines or {}).items() if seconds}
+
+def _get_stage_executor(required=False):
+    """required=True: batas waktu hanya bisa ditegakkan di thread terpisah, jadi pool dibuat walau hanya satu CPU"""
+    global _stage_executor
+    if STAGE_WORKERS < 2 and not required:
+        return None
+    with _stage_executor_lock:
+        if _stage_executor is None:
+            _stage_executor = ThreadPoolExecutor(max_workers=max(2, STAGE_WORKERS) + STAGE_SPARE_WORKERS,
+                                                 thread_name_prefix='analysis-stage')
+        return _stage_executor
+
+def _jalankan_tahap(name, fn, inputs):
+    """Satu tahap DAG sebagai span (nama tahap = nama span, bisa diprofil dengan profile_stages)"""
+    with span(name):
+        return fn(inputs)
+
+# Analisis identik yang berjalan bersamaan dihitung sekali; hasil dibekukan sebagai bytes pickle
+# (sama seperti cache analisis) dan setiap pemanggil yang menumpang mendapat salinan sendiri
+ANALYSIS_FLIGHT = SingleFlight('analysis', freeze=lambda results: pickle.dumps(results, protocol=pickle.HIGHEST_PROTOCOL),
+                               thaw=pickle.loads)
+
+def _tahap_hilang(result):
+    """Status tahap yang tidak menghasilkan apa pun (timeout/skipped/error), None jika tahap berhasil"""
+    if isinstance(result, dict) and 'error' in result:
+        return result.get('status', 'error')
+    return None
+
+def _jalankan_dag(stages, executor, deadline=None, stage_deadlines=None):
     """
-    Menjalankan semua analisis kecerdasan dan mengembalikan hasil lengkap
+    Jalankan graf tahap: stages = dict nama -> (dependensi, fungsi(hasil_dependensi) -> hasil).
+    Setiap tahap disubmit begitu semua dependensinya selesai, sehingga latency total
+    mengikuti jalur terpanjang, bukan jumlah semua tahap.
+    executor=None: tahap dijalankan berurutan di thread pemanggil sesuai urutan dependensi
+
+    deadline: batas total (detik sejak DAG dimulai); stage_deadlines: dict nama -> batas (detik sejak disubmit).
+    Tahap yang melewatinya diganti {'error', 'status': 'timeout'}: future dibatalkan jika belum mulai,
+    thread yang sudah berjalan tidak bisa dihentikan sehingga hasilnya dibuang. Tahap yang
+    dependensinya tidak selesai diganti {'error', 'status': 'skipped'}. Butuh executor.
+    Returns: dict nama -> hasil
     """
-    print(f"Running comprehensive analysis for {crypto_symbol} on {timeframe} timeframe...")
-    start_time = time.time()
-    
     results = {}
+    pending = dict(stages)
+    if executor is None:
+        while pending:
+            ready = [name for name, (deps, _) in pending.items() if all(dep in results for dep in deps)]
+            if not ready:
+                raise ValueError(f"Dependensi tahap tidak terpenuhi: {', '.join(pending)}")
+            for name in ready:
+                deps, fn = pending.pop(name)
+                results[name] = _jalankan_tahap(name, fn, {dep: results[dep] for dep in deps})
+        return results
+    stage_deadlines = stage_deadlines or {}
+    overall = time.monotonic() + deadline if deadline else None
+    running = {}  # future -> (nama, waktu kedaluwarsa, batas detik)
+    while pending or running:
+        for name, (deps, fn) in list(pending.items()):
+            if not all(dep in results for dep in deps):
+                continue
+            del pending[name]
+            missing = [dep for dep in deps if _tahap_hilang(results[dep]) is not None]
+            if missing:
+                results[name] = {'error': f"Skipped: {', '.join(missing)} did not finish", 'status': STATUS_SKIPPED}
+                continue
+            now = time.monotonic()
+            limits = [(overall, deadline)] if overall is not None else []
+            if stage_deadlines.get(name):
+                limits.append((now + stage_deadlines[name], stage_deadlines[name]))
+            expiry, budget = min(limits, key=lambda limit: limit[0]) if limits else (None, None)
+            if expiry is not None and now >= expiry:
+                results[name] = {'error': f"Deadline exceeded ({budget:.1f}s)", 'status': STATUS_TIMEOUT}
+                continue
+            future = executor.submit(_jalankan_tahap, name, fn, {dep: results[dep] for dep in deps})
+            running[future] = (name, expiry, budget)
+        if not running:
+            if pending and not any(all(dep in results for dep in deps) for deps, _ in pending.values()):
+                raise ValueError(f"Dependensi tahap tidak terpenuhi: {', '.join(pending)}")
+            continue
+
+        expiries = [expiry for _, expiry, _ in running.values() if expiry is not None]
+        timeout = max(0.0, min(expiries) - time.monotonic()) if expiries else None
+        done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            results[running.pop(future)[0]] = future.result()
+
+        now = time.monotonic()
+        for future, (name, expiry, budget) in list(running.items()):
+            if expiry is not None and now >= expiry:
+                del running[future]
+                future.cancel()
+                results[name] = {'error': f"Deadline exceeded ({budget:.1f}s)", 'status': STATUS_TIMEOUT}
+                logger.warning(f"✗ Stage {name} exceeded its {budget:.1f}s deadline, continuing without it")
+    return results
+
+@traced()
+def _frame_fitur_ml(df):
+    """
+    Model ML dilatih dengan kolom tambahan (EMA, ATR, returns, swing, ...) yang dulu ditulis
+    market_context dan risk_manager ke df yang sama. Kolom itu dihitung sebagai array lalu
+    digabung sekali ke frame baru (df tidak diubah), agar tahap ML tidak perlu menunggu kedua tahap tersebut.
+    Urutan kolom mengikuti urutan saat model dilatih.
+    """
+    columns = kolom_fase_pasar(df)
+    columns.update(kolom_volatilitas(df))
+    return pd.concat([df, pd.DataFrame(columns, index=df.index, copy=False)], axis=1)
+
+def _analisis_lengkap(df, crypto_symbol, timeframe, account_balance, risk_percent, deadline, stage_deadlines, start_time):
+    """
+    Jalankan tahap analisis sebagai DAG lalu saran AI (tanpa cache), dipanggil lewat ANALYSIS_FLIGHT
+    """
+    # Setiap tahap mendapat view dangkal sendiri: kolom tambahan yang dibuat satu tahap
+    # (mis. 'atr' di market_context dan risk_manager) tidak terlihat tahap lain maupun pemanggil
+    def view():
+        return df.copy(deep=False)
     
     # 1. Analisis indikator teknikal (menggunakan fungsi analyze_indicators yang sudah ada)
-    from analysis import analyze_indicators
-    technical_analysis = analyze_indicators(df)
-    results['technical_analysis'] = technical_analysis
+    def technical_stage(deps):
+        from analysis import analyze_indicators
+        return analyze_indicators(view())
     
     # 2. Analisis pola candlestick
-    try:
-        pattern_analysis = analyze_patterns(df)
-        results['pattern_analysis'] = pattern_analysis
-        print(f"✓ Pattern recognition analysis completed with {len(pattern_analysis['patterns'])} patterns detected")
-    except Exception as e:
-        print(f"✗ Error in pattern recognition: {str(e)}")
-        results['pattern_analysis'] = {"error": str(e)}
+    def pattern_stage(deps):
+        try:
+            pattern_analysis = analyze_patterns(view())
+            logger.info(f"✓ Pattern recognition analysis completed with {len(pattern_analysis['patterns'])} patterns detected")
+            return pattern_analysis
+        except Exception as e:
+            logger.error(f"✗ Error in pattern recognition: {str(e)}")
+            return {"error": str(e)}
     
     # 3. Analisis konteks pasar
-    try:
-        market_context = analyze_market_context(df)
-        results['market_context'] = market_context
-        print(f"✓ Market context analysis completed: {market_context['market_phase']['phase']} detected")
-    except Exception as e:
-        print(f"✗ Error in market context analysis: {str(e)}")
-        results['market_context'] = {"error": str(e)}
-    
-    # 4. Analisis manajemen risiko
-    try:
-        current_price = df['close'].iloc[-1]
-        action = technical_analysis.get('total_buy', 0) > technical_analysis.get('total_sell', 0)
-        action_str = "BUY" if action else "SELL"
-        
-        risk_analysis = analyze_risk_management(df, crypto_symbol, current_price, action_str, account_balance, risk_percent)
-        results['risk_analysis'] = risk_analysis
-        print(f"✓ Risk management analysis completed: {risk_analysis['risk_profile']['risk_level']} risk profile")
-    except Exception as e:
-        print(f"✗ Error in risk management analysis: {str(e)}")
-        results['risk_analysis'] = {"error": str(e)}
+    def market_context_stage(deps):
+        try:
+            market_context = analyze_market_context(view())
+            logger.info(f"✓ Market context analysis completed: {market_context['market_phase']['phase']} detected")
+            return market_context
+        except Exception as e:
+            logger.error(f"✗ Error in market context analysis: {str(e)}")
+            return {"error": str(e)}
+    
+    # 4. Analisis manajemen risiko (butuh arah dari analisis teknikal)
+    def risk_stage(deps):
+        try:
+            technical_analysis = deps['technical_analysis']
+            current_price = df['close'].iloc[-1]
+            action = technical_analysis.get('total_buy', 0) > technical_analysis.get('total_sell', 0)
+            action_str = "BUY" if action else "SELL"
+            
+            risk_analysis = analyze_risk_management(view(), crypto_symbol, current_price, action_str, account_balance, risk_percent)
+            logger.info(f"✓ Risk management analysis completed: {risk_analysis['risk_profile']['risk_level']} risk profile")
+            return risk_analysis
+        except Exception as e:
+            logger.error(f"✗ Error in risk management analysis: {str(e)}")
+            return {"error": str(e)}
     
     # 5. Analisis prediksi machine learning
     # ML adalah opsional, jadi kita periksa apakah modul tersedia
-    try:
-        ml_prediction = analyze_ml_prediction(df, crypto_symbol)
-        results['ml_prediction'] = ml_prediction
-        print(f"✓ ML prediction analysis completed: {ml_prediction['prediction']['prediction']} with {ml_prediction['prediction']['confidence']:.1f}% confidence")
-    except Exception as e:
-        print(f"✗ Error in ML prediction analysis: {str(e)}")
-        results['ml_prediction'] = {"error": str(e)}
-    
-    # 6. Saran AI (integrasi semua analisis)
-    try:
-        ai_advice = provide_ai_advice(crypto_symbol, timeframe, results)
-        results['ai_advice'] = ai_advice
-        print(f"✓ AI advice generated: {ai_advice['action']} with {ai_advice['confidence']:.1f}% confidence")
-    except Exception as e:
-        print(f"✗ Error in AI advice generation: {str(e)}")
-        results['ai_advice'] = {"error": str(e)}
+    def ml_stage(deps):
+        try:
+            ml_prediction = analyze_ml_prediction(_frame_fitur_ml(df), crypto_symbol)
+            logger.info(f"✓ ML prediction analysis completed: {ml_prediction['prediction']['prediction']} with {ml_prediction['prediction']['confidence']:.1f}% confidence")
+            return ml_prediction
+        except Exception as e:
+            logger.error(f"✗ Error in ML prediction analysis: {str(e)}")
+            return {"error": str(e)}
+    
+    # 6. Saran AI (integrasi semua analisis yang selesai)
+    def advice_stage(deps):
+        try:
+            ai_advice = provide_ai_advice(crypto_symbol, timeframe, deps)
+            missing = [name for name in ANALYSIS_KEYS if _tahap_hilang(deps[name]) is not None]
+            if missing:
+                ai_advice['missing_contributors'] = missing
+            logger.info(f"✓ AI advice generated: {ai_advice['action']} with {ai_advice['confidence']:.1f}% confidence")
+            return ai_advice
+        except Exception as e:
+            logger.error(f"✗ Error in AI advice generation: {str(e)}")
+            return {"error": str(e)}
+    
+    stages = {
+        'technical_analysis': ((), technical_stage),
+        'pattern_analysis': ((), pattern_stage),
+        'market_context': ((), market_context_stage),
+        'risk_analysis': (('technical_analysis',), risk_stage),
+        'ml_prediction': ((), ml_stage)
+    }
+    bounded = bool(deadline or stage_deadlines)
+    with span('comprehensive_analysis', symbol=crypto_symbol, timeframe=timeframe):
+        stage_results = _jalankan_dag(stages, _get_stage_executor(required=bounded), deadline, stage_deadlines)
+        # Saran AI selalu dijalankan (di luar batas waktu) dengan hasil tahap yang ada
+        stage_results['ai_advice'] = _jalankan_tahap('ai_advice', advice_stage, stage_results)
+    
+    # Urutan kunci hasil sama seperti eksekusi berurutan sebelumnya
+    results = {name: stage_results[name] for name in (*stages, 'ai_advice')}
+    results['missing_stages'] = [name for name in ANALYSIS_KEYS if _tahap_hilang(stage_results[name]) is not None]
     
     # Catat waktu eksekusi
     execution_time = time.time() - start_time
     results['execution_time'] = execution_time
-    print(f"Comprehensive analysis completed in {execution_time:.2f} seconds")
+    logger.info(f"Comprehensive analysis completed in {execution_time:.2f} seconds")
+    return results
+
+def run_comprehensive_analysis(df, crypto_symbol, timeframe="1h", account_balance=1000, risk_percent=2, use_cache=True,
+                               deadline=None, stage_deadlines=None):
+    """
+    Menjalankan semua analisis kecerdasan dan mengembalikan hasil lengkap
+    use_cache: pakai hasil tersimpan jika data (hash baris OHLCV), parameter dan versi model sama
+    deadline, stage_deadlines: batas waktu total dan per tahap (default ANALYSIS_DEADLINE/STAGE_DEADLINES).
+    Tahap yang tidak selesai dicantumkan di results['missing_stages'] dan ai_advice['missing_contributors']
+    """
+    logger.info(f"Running comprehensive analysis for {crypto_symbol} on {timeframe} timeframe...")
+    start_time = time.time()
+    deadline = ANALYSIS_DEADLINE if deadline is None else deadline
+    stage_deadlines = STAGE_DEADLINES if stage_deadlines is None else stage_deadlines
+    
+    cache = analysis_cache.get_cache() if use_cache else None
+    cache_key = analysis_cache.buat_kunci(df, crypto_symbol, timeframe, account_balance, risk_percent)
+    if cache is not None:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            cached['execution_time'] = time.time() - start_time
+            cached['cached'] = True
+            logger.info(f"Comprehensive analysis for {crypto_symbol} served from cache")
+            return cached
+    
+    # Permintaan identik yang sedang berjalan (live, API, batch) ditunggu, bukan dihitung ulang
+    flight_key = (cache_key, deadline, tuple(sorted(stage_deadlines.items())))
+    results, shared = ANALYSIS_FLIGHT.do(flight_key, _analisis_lengkap, df, crypto_symbol, timeframe,
+                                         account_balance, risk_percent, deadline, stage_deadlines, start_time)
+    if shared:
+        results['execution_time'] = time.time() - start_time
+        results['coalesced'] = True
+        logger.info(f"Comprehensive analysis for {crypto_symbol} shared with a concurrent request")
+        return results
+    
+    # Hasil dengan tahap yang gagal tidak disimpan agar error sementara tidak ikut di-cache
+    if cache is not None and not any(isinstance(value, dict) and 'error' in value for value in results.values()):
+        cache.put(cache_key, results)
     
     return results
 
+# Kolom tabel hasil batch, diurutkan berdasarkan ai_confidence
+BATCH_COLUMNS = ['symbol', 'timeframe', 'price', 'ai_action', 'ai_confidence', 'technical_bias',
+                 'market_phase', 'risk_level', 'ml_prediction', 'ml_confidence', 'patterns',
+                 'missing', 'fetch_time', 'analysis_time', 'total_time', 'error']
+
+def _ringkas_hasil_batch(symbol, timeframe, df, results):
+    """Satu baris tabel batch dari hasil run_comprehensive_analysis"""
+    technical = results.get('technical_analysis', {})
+    ai_advice = results.get('ai_advice', {})
+    market_context = results.get('market_context', {})
+    risk_analysis = results.get('risk_analysis', {})
+    ml_prediction = results.get('ml_prediction', {})
+    pattern_analysis = results.get('pattern_analysis', {})
+
+    total_buy = technical.get('total_buy', 0)
+    total_sell = technical.get('total_sell', 0)
+    return {
+        'symbol': symbol,
+        'timeframe': timeframe,
+        'price': float(df['close'].iloc[-1]),
+        'ai_action': ai_advice.get('action'),
+        'ai_confidence': ai_advice.get('confidence'),
+        'technical_bias': 'BUY' if total_buy > total_sell else 'SELL' if total_sell > total_buy else 'NEUTRAL',
+        'market_phase': market_context.get('market_phase', {}).get('phase'),
+        'risk_level': risk_analysis.get('risk_profile', {}).get('risk_level'),
+        'ml_prediction': ml_prediction.get('prediction', {}).get('prediction'),
+        'ml_confidence': ml_prediction.get('prediction', {}).get('confidence'),
+        'patterns': len(pattern_analysis.get('patterns', [])),
+        'missing': ', '.join(results.get('missing_stages', [])) or None,
+        'error': ai_advice.get('error')
+    }
+
+def run_comprehensive_analysis_batch(symbols, timeframes, account_balance=1000, risk_percent=2, workers=4,
+                                     on_result=None, limiter=None):
+    """
+    Analisis lengkap untuk banyak simbol dan timeframe dalam satu panggilan.
+    - Setiap pasangan (simbol, timeframe) diambil lalu dianalisis di thread pool sendiri, sehingga
+      request jaringan satu simbol tumpang tindih dengan analisis simbol lain
+    - Tahap analisis per simbol tetap berjalan paralel lewat DAG run_comprehensive_analysis
+    - Model ML dimuat sekali sebelum batch dan dipakai ulang semua simbol (cache per proses)
+    - on_result: callback(simbol, timeframe, hasil lengkap) dari thread batch, misal untuk arsip hasil
+    - limiter: RateLimiter untuk request histori (default budget DEFAULT_REQUESTS_PER_MINUTE), agar
+      batch besar tidak mengirim semua request sekaligus dan terkena rate limit
+
+    Returns: DataFrame satu baris per pasangan, diurutkan berdasarkan keyakinan ai_advice (tertinggi dulu)
+    """
+    from market_data import ambil_data_crypto, RateLimiter
+    from intelligence.ml_models import preload_models
+
+    batch_start = time.time()
+    limiter = limiter or RateLimiter()
+    preload_models()
+
+    def analisis_pasangan(symbol, timeframe):
+        start_time = time.time()
+        with span('fetch', symbol=symbol, timeframe=timeframe):
+            df = ambil_data_crypto(symbol, timeframe, limiter=limiter)
+        fetch_time = time.time() - start_time
+        if df is None:
+            row = {'symbol': symbol, 'timeframe': timeframe, 'error': 'Gagal mengambil data'}
+        else:
+            analysis_start = time.time()
+            results = run_comprehensive_analysis(df, symbol, timeframe, account_balance, risk_percent)
+            if on_result is not None:
+                on_result(symbol, timeframe, results)
+            row = _ringkas_hasil_batch(symbol, timeframe, df, results)
+            row['analysis_time'] = time.time() - analysis_start
+        row['fetch_time'] = fetch_time
+        row['total_time'] = time.time() - start_time
+        return row
+
+    pairs = [(symbol, timeframe) for symbol in dict.fromkeys(symbols) for timeframe in dict.fromkeys(timeframes)]
+    rows = []
+    # Executor terpisah dari executor tahap: thread batch menunggu tahap selesai, jadi berbagi pool bisa deadlock
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='analysis-batch') as executor:
+        futures = {executor.submit(analisis_pasangan, symbol, timeframe): (symbol, timeframe) for symbol, timeframe in pairs}
+        for future in as_completed(futures):
+            symbol, timeframe = futures[future]
+            try:
+                rows.append(future.result())
+            except Exception as e:
+                logger.error(f"✗ Error in batch analysis for {symbol} {timeframe}: {str(e)}")
+                rows.append({'symbol': symbol, 'timeframe': timeframe, 'error': str(e)})
+
+    table = pd.DataFrame(rows, columns=BATCH_COLUMNS)
+    table = table.sort_values(['ai_confidence', 'symbol', 'timeframe'], ascending=[False, True, True],
+                              na_position='last', kind='stable').reset_index(drop=True)
+    logger.info(f"Batch analysis completed: {len(pairs)} pairs in {time.time() - batch_start:.2f} seconds")
+    return table
+
 def format_advanced_analysis_output(analysis_results, crypto_symbol, timeframe):
     """
     Format hasil analisis lanjutan menjadi output yang terstruktur
@@ -121,6 +415,22 @@ def format_advanced_analysis_output(analysis_results, crypto_symbol, timeframe):
         output += f"• Pattern Recognition: {contributors.get('patterns', 0):.1f}\n"
         output += f"• Machine Learning: {contributors.get('machine_learning', 0):.1f}\n"
     
+    # Tandai tahap yang tidak ikut dalam saran (batas waktu, dependensi hilang atau error)
+    missing_stages = analysis_results.get('missing_stages', [])
+    if missing_stages:
+        from termcolor import colored
+        labels = {
+            'technical_analysis': 'Technical Analysis',
+            'pattern_analysis': 'Pattern Recognition',
+            'market_context': 'Market Context',
+            'risk_analysis': 'Risk Management',
+            'ml_prediction': 'Machine Learning'
+        }
+        output += "\n" + colored("Partial Analysis - missing contributors:\n", 'red', attrs=['bold'])
+        for name in missing_stages:
+            result = analysis_results.get(name, {})
+            output += f"• {labels.get(name, name)}: {result.get('status', 'error')} ({result.get('error', '')})\n"
+    
     # Format Pattern Recognition
     pattern_analysis = analysis_results.get('pattern_analysis', {})
     if pattern_analysis and 'error' not in pattern_analysis:
@@ -0,0 +1,23 @@
+# json_utils.py
+
+import math
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+def nilai_json(value):
+    """Ubah hasil analisis menjadi nilai JSON standar: skalar numpy, Timestamp, NaN/inf -> None"""
+    if isinstance(value, dict):
+        return {str(key): nilai_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [nilai_json(item) for item in value]
+    if isinstance(value, (np.ndarray, pd.Series)):
+        return nilai_json(value.tolist())
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, (datetime, pd.Timestamp)):
+        return value.isoformat()
+    return value
@@ -0,0 +1,103 @@
+# live_feed.py
+
+import logging
+import time
+import pandas as pd
+from pycoingecko import CoinGeckoAPI
+
+from bar_aggregator import BarAggregator
+from market_data import COIN_MAP, PRICE_IDS_PER_REQUEST
+
+logger = logging.getLogger(__name__)
+
+def ambil_harga_terakhir(simbols):
+    """
+    Mengambil harga dan volume terakhir untuk banyak koin dalam satu request CoinGecko
+    (watchlist besar dipecah per PRICE_IDS_PER_REQUEST id).
+    Returns: dict {simbol: {'price', 'volume', 'timestamp' (epoch ms)}}
+    """
+    ids = {COIN_MAP[simbol]: simbol for simbol in set(simbols) if simbol in COIN_MAP}
+    if not ids:
+        return {}
+
+    cg = CoinGeckoAPI()
+    coin_ids = sorted(ids)
+    data = {}
+    for i in range(0, len(coin_ids), PRICE_IDS_PER_REQUEST):
+        try:
+            data.update(cg.get_price(
+                ids=coin_ids[i:i + PRICE_IDS_PER_REQUEST],
+                vs_currencies='usd',
+                include_24hr_vol=True,
+                include_last_updated_at=True
+            ))
+        except Exception as e:
+            logger.error(f"Error mengambil harga terakhir: {str(e)}")
+
+    now_ms = int(time.time() * 1000)
+    ticks = {}
+    for coin_id, values in data.items():
+        if coin_id not in ids or 'usd' not in values:
+            continue
+        last_updated = values.get('last_updated_at')
+        ticks[ids[coin_id]] = {
+            'price': float(values['usd']),
+            'volume': float(values.get('usd_24h_vol') or 0),
+            'timestamp': int(last_updated) * 1000 if last_updated else now_ms
+        }
+
+    logger.info(f"Harga terakhir diperbarui untuk {len(ticks)} koin")
+    return ticks
+
+def buat_state_seri(df, simbol, timeframe):
+    """
+    Membuat state live untuk satu seri (simbol, timeframe) dari histori hasil sync penuh.
+    Candle terakhir histori dianggap sebagai candle yang sedang terbentuk.
+    """
+    df = df.reset_index(drop=True).copy()
+    last = df.iloc[-1]
+
+    aggregator = BarAggregator([timeframe], symbol=simbol, volume_mode='last')
+    aggregator.seed(timeframe, {
+        'timestamp': int(pd.Timestamp(last['timestamp']).value // 10**6),
+        'open': float(last['open']),
+        'high': float(last['high']),
+        'low': float(last['low']),
+        'close': float(last['close']),
+        'volume': float(last['volume'])
+    })
+
+    return {
+        'symbol': simbol,
+        'timeframe': timeframe,
+        'df': df,
+        'aggregator': aggregator,
+        'needs_sync': False,
+        'last_sync': time.time()
+    }
+
+def terapkan_tick(state, tick):
+    """
+    Terapkan satu tick ke candle yang sedang terbentuk.
+    Jika tick membuka periode baru, candle lama ditutup, candle baru ditambahkan ke df
+    (jendela digeser satu baris) dan seri ditandai perlu sync histori penuh.
+    Returns: True jika ada candle yang ditutup
+    """
+    timeframe = state['timeframe']
+    aggregator = state['aggregator']
+    closed = aggregator.update(tick['timestamp'], tick['price'], tick['volume'])
+    bar = aggregator.forming_bar(timeframe)
+
+    df = state['df']
+    columns = ['open', 'high', 'low', 'close', 'volume']
+    values = [bar[column] for column in columns]
+
+    if closed:
+        new_row = pd.DataFrame([[pd.to_datetime(bar['timestamp'], unit='ms')] + values],
+                               columns=['timestamp'] + columns)
+        state['df'] = pd.concat([df.iloc[1:], new_row], ignore_index=True)
+        state['needs_sync'] = True
+    else:
+        df.loc[df.index[-1], columns] = values
+
+    return bool(closed)
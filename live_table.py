@@ -0,0 +1,192 @@
+# live_table.py
+
+import sys
+import threading
+from datetime import datetime
+from termcolor import colored
+from tabulate import tabulate
+
+# (header, lebar kolom, rata kanan)
+COLUMNS = [
+    ("Coin", 12, False),
+    ("Harga", 14, True),
+    ("Aksi", 11, False),
+    ("Keyakinan", 9, True),
+    ("Timeframe", 9, False),
+    ("Volatilitas", 11, True),
+    ("Waktu Update", 12, False)
+]
+AI_COLUMNS = [
+    ("Aksi AI", 11, False),
+    ("Keyakinan AI", 12, True)
+]
+
+def get_color_for_action(action):
+    """Mendapatkan warna berdasarkan aksi/keputusan trading"""
+    if action in ['STRONG_BUY', 'BUY']:
+        return 'green'
+    elif action == 'HOLD':
+        return 'yellow'
+    elif action in ['SELL', 'STRONG_SELL']:
+        return 'red'
+    return 'white'
+
+def urutkan_keputusan(decisions):
+    """Urutkan keputusan berdasarkan keyakinan (numerik, tinggi ke rendah), lalu simbol dan timeframe"""
+    return sorted((data for data in decisions if data),
+                  key=lambda data: (-data['confidence'], data['symbol'], data['timeframe']))
+
+def format_sel(data, show_ai=False):
+    """Teks dan warna setiap sel untuk satu keputusan: list of (teks, warna atau None)"""
+    cells = [
+        (f"{data['symbol']}/USDT", None),
+        (f"${data['price']:.4f}", None),
+        (data['action'], get_color_for_action(data['action'])),
+        (f"{data['confidence']:.1f}%", None),
+        (data['timeframe'], None),
+        (f"{data['volatility']:.2f}%", None),
+        (data['timestamp'].strftime('%H:%M:%S'), None)
+    ]
+    if show_ai:
+        ai_action = data.get('ai_action')
+        ai_confidence = data.get('ai_confidence')
+        cells += [
+            (ai_action or '-', get_color_for_action(ai_action) if ai_action else None),
+            (f"{ai_confidence:.1f}%" if ai_confidence is not None else '-', None)
+        ]
+    return cells
+
+def print_live_decision_table(decisions):
+    """Menampilkan tabel keputusan live dari semua aset yang dipantau (tabulate, untuk output non-terminal)"""
+    rows = urutkan_keputusan(decisions.values())
+    show_ai = any(data.get('ai_action') for data in rows)
+    headers = [column[0] for column in COLUMNS + (AI_COLUMNS if show_ai else [])]
+
+    table_data = []
+    for data in rows:
+        table_data.append([colored(text, color) if color else text for text, color in format_sel(data, show_ai)])
+
+    if table_data:
+        print(colored("\n=== LIVE TRADING DECISIONS ===", 'cyan', attrs=['bold']))
+        print(colored(f"Last Update: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", 'yellow'))
+        print(tabulate(table_data, headers=headers, tablefmt="grid"))
+    else:
+        print(colored("\nBelum ada data keputusan trading. Silakan tambahkan aset untuk dipantau.", 'yellow'))
+
+class LiveTableRenderer:
+    """
+    Renderer tabel live yang menggambar ulang hanya baris yang berubah.
+    Baris disimpan sebagai dict bertipe (bukan string terformat) dan diurutkan dengan kunci numerik.
+    Setiap baris layar yang terakhir digambar diingat; update hanya menulis baris yang teksnya berbeda
+    memakai posisi kursor ANSI, sehingga tidak ada clear layar dan flicker per siklus.
+    Jika output bukan terminal, renderer mencetak tabel tabulate lengkap sekali per siklus.
+    Selama pause() (layar sedang dipakai menu) data tetap diperbarui tetapi tidak digambar.
+    """
+
+    def __init__(self, header=None, stream=None):
+        self.header = header  # callable -> teks header (banner, info, menu cepat)
+        self.stream = stream or sys.stdout
+        self.interactive = hasattr(self.stream, 'isatty') and self.stream.isatty()
+        self._rows = {}
+        self._painted = []
+        self._table_top = None
+        self._show_ai = False
+        self._status = ''
+        self._paused = False
+        self._lock = threading.Lock()
+        self.stats = {'full_repaints': 0, 'rows_painted': 0}
+
+    def _aktif(self):
+        return self.interactive and not self._paused
+
+    def update(self, key, data):
+        """Simpan hasil satu aset dan langsung gambar ulang baris yang berubah"""
+        with self._lock:
+            self._rows[key] = data
+            if self._aktif():
+                self._repaint()
+
+    def remove(self, key):
+        with self._lock:
+            if self._rows.pop(key, None) is not None and self._aktif():
+                self._repaint()
+
+    def invalidate(self):
+        """Paksa gambar ulang penuh (misalnya setelah header berubah)"""
+        with self._lock:
+            self._table_top = None
+            if self._aktif():
+                self._repaint()
+
+    def pause(self):
+        """Hentikan penggambaran sementara; layar dipakai menu"""
+        with self._lock:
+            self._paused = True
+
+    def resume(self):
+        """Lanjutkan penggambaran dengan gambar ulang penuh"""
+        with self._lock:
+            self._paused = False
+        self.invalidate()
+
+    def status(self, text):
+        """Perbarui baris status di bawah tabel (misalnya hitung mundur update berikutnya)"""
+        with self._lock:
+            self._status = text
+            if self._aktif() and self._table_top is not None:
+                self.stream.write(self._status_line(len(self._painted)))
+                self.stream.flush()
+
+    def end_cycle(self):
+        """Dipanggil di akhir siklus: di luar terminal, cetak tabel lengkap"""
+        if not self.interactive and not self._paused:
+            print_live_decision_table(self._rows)
+
+    def _format_line(self, cells, columns):
+        parts = []
+        for (text, color), (_, width, align_right) in zip(cells, columns):
+            text = text[:width]
+            text = text.rjust(width) if align_right else text.ljust(width)
+            parts.append(colored(text, color) if color else text)
+        return ' | '.join(parts)
+
+    def _status_line(self, row_count):
+        return f"\033[{self._table_top + row_count + 1};1H\033[K{colored(self._status, 'yellow')}"
+
+    def _full_repaint(self):
+        columns = COLUMNS + (AI_COLUMNS if self._show_ai else [])
+        lines = self.header().split('\n') if self.header else []
+        lines.append(self._format_line([(name, 'cyan') for name, _, _ in columns], columns))
+        lines.append('-+-'.join('-' * width for _, width, _ in columns))
+        self._table_top = len(lines) + 1
+        self._painted = []
+        self.stats['full_repaints'] += 1
+        return "\033[2J\033[H" + '\n'.join(lines) + '\n'
+
+    def _repaint(self):
+        show_ai = any(data.get('ai_action') for data in self._rows.values())
+        out = []
+        if self._table_top is None or show_ai != self._show_ai:
+            self._show_ai = show_ai
+            out.append(self._full_repaint())
+
+        columns = COLUMNS + (AI_COLUMNS if self._show_ai else [])
+        lines = [self._format_line(format_sel(data, self._show_ai), columns)
+                 for data in urutkan_keputusan(self._rows.values())]
+        if not lines:
+            lines = [colored("Belum ada data keputusan trading. Silakan tambahkan aset untuk dipantau.", 'yellow')]
+
+        for i, line in enumerate(lines):
+            if i >= len(self._painted) or self._painted[i] != line:
+                out.append(f"\033[{self._table_top + i};1H{line}\033[K")
+                self.stats['rows_painted'] += 1
+
+        # Bersihkan baris sisa (dan baris status lama) jika jumlah baris berkurang
+        if len(lines) < len(self._painted):
+            for i in range(len(lines), len(self._painted) + 2):
+                out.append(f"\033[{self._table_top + i};1H\033[K")
+
+        self._painted = lines
+        out.append(self._status_line(len(lines)))
+        self.stream.write(''.join(out))
+        self.stream.flush()
@@ -0,0 +1,127 @@
+# log_setup.py
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from datetime import datetime
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s: %(message)s'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Atribut bawaan LogRecord; atribut lain (dari extra=...) ikut ditulis ke record JSON
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+class JsonFormatter(logging.Formatter):
+    """Satu record log per baris JSON: waktu, level, logger, pesan, thread/proses dan field extra"""
+
+    def format(self, record):
+        data = {
+            'timestamp': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName,
+            'process': record.processName
+        }
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRS and not name.startswith('_'):
+                data[name] = value
+        if record.exc_text:
+            data['exception'] = record.exc_text
+        elif record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
+
+def buat_formatter(fmt='text'):
+    if fmt == 'json':
+        return JsonFormatter()
+    return logging.Formatter(TEXT_FORMAT, datefmt=DATE_FORMAT)
+
+def antrekan_handler(handler):
+    """
+    Bungkus handler I/O dengan antrean: pemanggil hanya memasukkan record ke antrean
+    (tanpa lock I/O), sedangkan thread latar QueueListener yang menulis ke handler asli.
+    Returns: (QueueHandler, QueueListener yang sudah berjalan)
+    """
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return logging.handlers.QueueHandler(log_queue), listener
+
+def parse_module_levels(spec):
+    """'market_data=WARNING,intelligence=DEBUG' -> {'market_data': 'WARNING', 'intelligence': 'DEBUG'}"""
+    levels = {}
+    for item in (spec or '').split(','):
+        name, _, level = item.strip().partition('=')
+        if name and level:
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+_active = None  # (QueueHandler, QueueListener) yang terpasang di root logger
+
+def setup_logging(level='INFO', fmt='text', filename=None, module_levels=None):
+    """
+    Pasang logging non-blocking di root logger: semua modul menulis ke antrean,
+    satu thread latar menulis ke stderr (atau file). Aman dipanggil ulang untuk mengganti konfigurasi.
+
+    fmt: 'text' (format lama) atau 'json' (satu record per baris)
+    module_levels: dict nama logger -> level, contoh {'market_data': 'WARNING'}
+    """
+    global _active
+
+    if filename:
+        handler = logging.handlers.WatchedFileHandler(filename)
+    else:
+        handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(buat_formatter(fmt))
+
+    root = logging.getLogger()
+    if _active is not None:
+        root.removeHandler(_active[0])
+        _active[1].stop()
+    else:
+        # Handler dari basicConfig sebelumnya akan menulis dua kali
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+
+    queue_handler, listener = antrekan_handler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+    for name, module_level in (module_levels or {}).items():
+        logging.getLogger(name).setLevel(module_level.upper() if isinstance(module_level, str) else module_level)
+
+    _active = (queue_handler, listener)
+    return listener
+
+# ===== LOG DARI WORKER PROSES =====
+
+class _Redispatch:
+    """Teruskan record dari proses worker ke logger bernama sama di proses utama"""
+
+    def handle(self, record):
+        logger = logging.getLogger(record.name)
+        if logger.isEnabledFor(record.levelno):
+            logger.handle(record)
+
+def buat_antrean_worker(context):
+    """
+    Antrean log untuk worker process pool: worker hanya memasukkan record ke antrean,
+    record diteruskan ke pipeline logging proses utama oleh thread latar.
+    Returns: (antrean multiprocessing, QueueListener yang sudah berjalan)
+    """
+    log_queue = context.Queue()
+    listener = logging.handlers.QueueListener(log_queue, _Redispatch())
+    listener.start()
+    return log_queue, listener
+
+def setup_worker_logging(log_queue, level=logging.INFO):
+    """Dipanggil di initializer worker: semua log worker dikirim ke antrean proses utama"""
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
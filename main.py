@@ -1,23 +1,40 @@
 import time
 import requests
-import pandas as pd
 import numpy as np
 from datetime import datetime
 from termcolor import colored
+from tabulate import tabulate
 import colorama
 from analysis import analyze_indicators
-from decision import make_decision
+from decision import make_decision, hitung_level_resiko
+from market_data import ambil_data_crypto, DEFAULT_REQUESTS_PER_MINUTE, FETCH_FLIGHT, RateLimiter
+from live_feed import ambil_harga_terakhir, buat_state_seri, terapkan_tick
+from scheduler import LiveScheduler
+from analysis_pool import AnalysisPool, analisis_seri
+from live_table import LiveTableRenderer, get_color_for_action
+from watchlist import WatchlistRegistry
+from rotation import rencanakan_rotasi, laporan_rotasi
+from alerts import AlertEngine
+from log_setup import setup_logging, antrekan_handler, parse_module_levels
+from warm_state import WarmStateWriter, muat_warm_state, histori_masih_segar, STATE_FILE
+from intelligence.tracing import enable_tracing, profile_stages, export_chrome_trace, ringkasan_span
+from analysis_cache import configure_cache, get_cache
+from result_archive import ArchiveWriter, ARCHIVE_DIR, buat_record_live, buat_record_lengkap
+from metrics import (start_metrics_server, STAGE_SECONDS, CYCLE_SECONDS, CYCLE_SYMBOLS,
+                     SYMBOLS_PROCESSED, CACHE_REQUESTS, ERRORS, TRACKED_SERIES)
 import logging
+import logging.handlers
+import atexit
+import argparse
 import json
-from pycoingecko import CoinGeckoAPI
 import threading
 import os
 import sys
-from tabulate import tabulate
 
 # Cek apakah modul intelligence_integration tersedia
 try:
-    from intelligence_integration import run_comprehensive_analysis, format_advanced_analysis_output
+    from intelligence_integration import (run_comprehensive_analysis, run_comprehensive_analysis_batch,
+                                          format_advanced_analysis_output, configure_deadlines, ANALYSIS_FLIGHT)
     AI_FEATURES_AVAILABLE = True
 except ImportError:
     AI_FEATURES_AVAILABLE = False
@@ -26,25 +43,58 @@ except ImportError:
 # Inisialisasi colorama untuk output berwarna di terminal
 colorama.init()
 
-# Konfigurasi logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s: %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+# Konfigurasi logging: record masuk antrean dan ditulis thread latar agar loop live tidak menunggu I/O
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # Variabel global untuk thread live dan konfigurasi
 live_running = False
 live_thread = None
-tracked_coins = []
+live_renderer = None  # Renderer tabel live yang sedang aktif (untuk jeda saat menu dipakai)
+tracked_coins = WatchlistRegistry()  # Pasangan (simbol, timeframe) yang dipantau
 refresh_interval = 60  # Refresh data setiap 60 detik secara default
+settle_delay = 10  # Jeda (detik) setelah candle ditutup sebelum histori disinkronkan
+schedule_jitter = 5  # Jitter acak (detik) agar sinkronisasi tidak datang bersamaan
+max_sync_per_step = 10  # Maksimum sinkronisasi histori per langkah scheduler
+analysis_workers = 0  # Jumlah worker proses untuk analisis live (0 = analisis di thread live)
+live_ai_analysis = False  # Jalankan analisis AI lengkap untuk setiap aset di mode live
+metrics_port = 0  # Port endpoint metrik Prometheus (0 = nonaktif)
+api_requests_per_minute = DEFAULT_REQUESTS_PER_MINUTE  # Budget request API per menit untuk rotasi
+symbol_priorities = {}  # Prioritas per simbol untuk rotasi (default 1.0)
+rotation_plan = None  # Rencana rotasi yang sedang dipakai mode live
+alert_rules = []  # Aturan alert: list of {'name', 'when', 'cooldown', 'message'}
+alert_sinks = ['file:alerts/alerts.jsonl']  # Tujuan alert: stdout, file:path, udp:host:port, unix:path
+log_level = 'INFO'  # Level log global
+log_format = 'text'  # Format log: text atau json
+log_file = None  # File log (default: stderr)
+log_module_levels = {}  # Level per modul, contoh {'market_data': 'WARNING'}
+warm_state_file = STATE_FILE  # Snapshot state live untuk restart cepat (None = nonaktif)
+warm_state_interval = 60  # Interval (detik) penulisan snapshot state live
+analysis_cache_mb = 64  # Batas memori cache hasil analisis AI (0 = nonaktif)
+analysis_cache_dir = None  # Direktori cache hasil analisis di disk (None = hanya memori)
+analysis_deadline = None  # Batas waktu (detik) analisis AI lengkap (None = tanpa batas)
+stage_deadlines = {}  # Batas waktu per tahap, contoh {'ml_prediction': 2.0}
+archive_dir = ARCHIVE_DIR  # Direktori arsip hasil analisis (None = nonaktif)
+archive_writer = None  # Penulis arsip, dibuat saat hasil pertama diarsipkan
 
 # ===== TAHAP 1: FUNGSI DASAR =====
 
-def print_banner():
-    """Menampilkan banner aplikasi"""
-    banner = colored("""
+def arsipkan(record):
+    """Masukkan record ke arsip hasil analisis (ditulis batch oleh thread latar)"""
+    global archive_writer
+    if not archive_dir:
+        return
+    if archive_writer is None:
+        archive_writer = ArchiveWriter(archive_dir)
+        atexit.register(archive_writer.close)
+    archive_writer.append(record)
+
+def arsipkan_hasil_lengkap(symbol, timeframe, results):
+    arsipkan(buat_record_lengkap(symbol, timeframe, results))
+
+def banner_text():
+    """Teks banner aplikasi"""
+    return colored("""
 ╔═══════════════════════════════════════════════════════════╗
 ║           TradingMetrics-AI - v2.1.0                      ║
 ╠═══════════════════════════════════════════════════════════╣
@@ -53,7 +103,10 @@ def print_banner():
 ║ + Fitur Live Decision                                     ║
 ╚═══════════════════════════════════════════════════════════╝
 """, 'green', attrs=['bold'])
-    print(banner)
+
+def print_banner():
+    """Menampilkan banner aplikasi"""
+    print(banner_text())
 
     # Loading animation
     loading_stages = [
@@ -74,176 +127,14 @@ def print_banner():
     print(colored(f"Waktu Inisialisasi: {current_time}", 'yellow'))
     logger.info("TradingMetrics-AI diinisialisasi")
 
-def ambil_data_crypto(simbol, interval="15m", limit=100):
-    """Mengambil data cryptocurrency dari CoinGecko API"""
-    try:
-        # Mapping interval ke days untuk CoinGecko
-        days_map = {
-            "15m": 1,     # 1 hari data dengan interval 15 menit
-            "30m": 2,     # 2 hari data dengan interval 30 menit
-            "1h": 7,      # 7 hari data dengan interval 1 jam
-            "4h": 30      # 30 hari data dengan interval 4 jam
-        }
-        
-        # Mapping simbol Binance ke id CoinGecko
-        coin_map = {
-            'BTC': 'bitcoin',
-            'ETH': 'ethereum',
-            'BNB': 'binancecoin',
-            'DOGE': 'dogecoin',
-            'XRP': 'ripple',
-            'ADA': 'cardano',
-            'SOL': 'solana',
-            'DOT': 'polkadot',
-            'SHIB': 'shiba-inu',
-            'MATIC': 'matic-network',
-            'AVAX': 'avalanche-2',
-            'LINK': 'chainlink',
-            'UNI': 'uniswap',
-            'PEPE': 'pepe',
-            'MEME': 'meme',
-            'BONK': 'bonk',
-            'WLD': 'worldcoin-wld',
-            'INJ': 'injective-protocol',
-            'SUI': 'sui',
-            'FLOKI': 'floki',
-            'ATOM': 'cosmos',
-            'NEAR': 'near',
-            'FTM': 'fantom',
-            'APE': 'apecoin',
-            'OP': 'optimism',
-            'ARB': 'arbitrum',
-            'LTC': 'litecoin',
-            'BCH': 'bitcoin-cash',
-            'TRX': 'tron',
-            'ETC': 'ethereum-classic',
-            'FIL': 'filecoin',
-            'ICP': 'internet-computer',
-            'SAND': 'the-sandbox',
-            'GALA': 'gala',
-            'APT': 'aptos',
-            'AAVE': 'aave',
-            'SXP': 'swipe',
-            'GMT': 'stepn',
-            'ALGO': 'algorand',
-            '1INCH': '1inch'
-        }
-        
-        if simbol not in coin_map:
-            raise ValueError(f"Symbol {simbol} tidak ditemukan dalam mapping CoinGecko")
-            
-        logger.info(f"Mengambil data {simbol} menggunakan CoinGecko API")
-        
-        cg = CoinGeckoAPI()
-        
-        # Dapatkan data harga dengan interval
-        data = cg.get_coin_market_chart_by_id(
-            id=coin_map[simbol],
-            vs_currency='usd',
-            days=days_map[interval]
-        )
-        
-        # Membuat DataFrame dari data
-        prices = pd.DataFrame(data['prices'], columns=['timestamp', 'close'])
-        volumes = pd.DataFrame(data['total_volumes'], columns=['timestamp', 'volume'])
-        
-        # Konversi timestamp ke format datetime
-        prices['timestamp'] = pd.to_datetime(prices['timestamp'], unit='ms')
-        volumes['timestamp'] = pd.to_datetime(volumes['timestamp'], unit='ms')
-        
-        # Gabungkan data
-        df = pd.merge_asof(prices, volumes, on='timestamp')
-        
-        # Perkirakan nilai open, high, low
-        # Ini adalah estimasi untuk menggantikan data OHLC lengkap
-        df['open'] = df['close'].shift(1)
-        df['high'] = df['close'] * 1.002  # Estimasi sederhana
-        df['low'] = df['close'] * 0.998   # Estimasi sederhana
-        
-        # Isi nilai yang hilang di awal
-        df['open'] = df['open'].fillna(df['close'])
-        
-        # Reorder kolom agar sesuai dengan format sebelumnya
-        df = df[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
-        
-        # Subsample data berdasarkan interval yang dipilih
-        if interval == '15m':
-            df = df.iloc[::1]  # Ambil setiap baris
-        elif interval == '30m':
-            df = df.iloc[::2]  # Ambil setiap 2 baris
-        elif interval == '1h':
-            df = df.iloc[::4]  # Ambil setiap 4 baris
-        elif interval == '4h':
-            df = df.iloc[::16]  # Ambil setiap 16 baris
-        
-        # Terbatas pada jumlah baris yang diminta
-        df = df.tail(limit)
-        
-        logger.info(f"Berhasil mengambil {len(df)} baris data untuk {simbol}")
-        return df
-        
-    except Exception as e:
-        logger.error(f"Error fetching CoinGecko data: {str(e)}")
-        print(f"Error fetching data: {str(e)}")
-        print("Gagal mengambil data. Silakan coba lagi.")
-        return None
-
-def hitung_level_resiko(df, harga_sekarang, modal_awal=150000):
-    """Menghitung level risiko dan rekomendasi stop loss/take profit"""
-    volatilitas = df['close'].pct_change().std() * 100
-    atr = df['high'].rolling(14).max() - df['low'].rolling(14).min()
-    rata_atr = atr.mean()
-    
-    if volatilitas > 5:
-        persen_sl = 0.02
-        rasio_tp = 3
-    elif volatilitas > 3:
-        persen_sl = 0.015
-        rasio_tp = 2.5
-    else:
-        persen_sl = 0.01
-        rasio_tp = 2
-
-    support_kuat = df['low'].tail(20).min()
-    support_lemah = harga_sekarang - rata_atr
-    resistance_lemah = harga_sekarang + rata_atr
-    resistance_kuat = df['high'].tail(20).max()
-
-    jumlah_resiko = modal_awal * 0.02
-    ukuran_posisi = jumlah_resiko / persen_sl
-    
-    return {
-        'zona_entry': {
-            'beli_kuat': support_kuat,
-            'beli_lemah': support_lemah,
-            'jual_lemah': resistance_lemah,
-            'jual_kuat': resistance_kuat
-        },
-        'stop_loss': {
-            'ketat': harga_sekarang * (1 - persen_sl),
-            'sedang': harga_sekarang * (1 - persen_sl * 1.5),
-            'longgar': harga_sekarang * (1 - persen_sl * 2)
-        },
-        'take_profit': {
-            'aman': harga_sekarang * (1 + persen_sl * rasio_tp),
-            'sedang': harga_sekarang * (1 + persen_sl * rasio_tp * 1.5),
-            'agresif': harga_sekarang * (1 + persen_sl * rasio_tp * 2)
-        },
-        'ukuran_posisi': {
-            'disarankan': ukuran_posisi,
-            'minimum': modal_awal * 0.5,
-            'maksimum': modal_awal * 2
-        },
-        'volatilitas': volatilitas
-    }
-
 def hitung_indikator_tambahan(df):
-    """Menghitung indikator teknikal tambahan"""
-    df['EMA9'] = df['close'].ewm(span=9).mean()
-    df['EMA20'] = df['close'].ewm(span=20).mean()
-    df['EMA50'] = df['close'].ewm(span=50).mean()
+    """Menghitung indikator teknikal tambahan (hanya nilai terakhir, df tidak diubah)"""
+    close = df['close']
+    ema = {f'ema{span}': close.ewm(span=span).mean().iloc[-1] for span in (9, 20, 50)}
     
-    df['OBV'] = (np.sign(df['close'].diff()) * df['volume']).fillna(0).cumsum()
+    # OBV terakhir = jumlah kumulatif volume bertanda arah perubahan close
+    arah_volume = np.sign(np.diff(close.to_numpy(dtype=np.float64))) * df['volume'].to_numpy(dtype=np.float64)[1:]
+    obv = np.cumsum(np.nan_to_num(arah_volume, copy=False))[-1] if len(arah_volume) else 0.0
     
     high = df['high'].max()
     low = df['low'].min()
@@ -262,12 +153,8 @@ def hitung_indikator_tambahan(df):
     s2 = pp - (df['high'].iloc[-1] - df['low'].iloc[-1])
     
     return {
-        'ema': {
-            'ema9': df['EMA9'].iloc[-1],
-            'ema20': df['EMA20'].iloc[-1],
-            'ema50': df['EMA50'].iloc[-1]
-        },
-        'obv': df['OBV'].iloc[-1],
+        'ema': ema,
+        'obv': obv,
         'fibonacci': fib_levels,
         'pivot_points': {
             'pp': pp,
@@ -279,14 +166,14 @@ def hitung_indikator_tambahan(df):
     }
 
 def analisis_momentum(df):
-    """Menganalisis momentum harga"""
-    momentum = df['close'].diff(periods=10).iloc[-1]
+    """Menganalisis momentum harga (hanya jendela terakhir yang dihitung, bukan seluruh deret rolling)"""
+    close = df['close'].to_numpy(dtype=np.float64)
+    momentum = close[-1] - close[-11] if len(close) > 10 else np.nan
     tren_kekuatan = 0
     
-    if df['close'].iloc[-1] > df['close'].rolling(window=20).mean().iloc[-1]:
-        tren_kekuatan += 1
-    if df['close'].iloc[-1] > df['close'].rolling(window=50).mean().iloc[-1]:
-        tren_kekuatan += 1
+    for window in (20, 50):
+        if len(close) >= window and close[-1] > close[-window:].mean():
+            tren_kekuatan += 1
         
     volume_rata = df['volume'].mean()
     volume_sekarang = df['volume'].iloc[-1]
@@ -298,10 +185,60 @@ def analisis_momentum(df):
         'volume_strength': volume_strength
     }
 
-def format_output_crypto(analisis, simbol, timeframe, df):
-    """Format output analisis untuk ditampilkan di terminal"""
+def tampilkan_scan_batch(symbols, timeframe):
+    """Scan AI untuk banyak koin sekaligus dan tampilkan tabel peluang (keyakinan AI tertinggi dulu)"""
+    print(colored(f"\nMenganalisis {len(symbols)} koin ({timeframe})...", 'yellow'))
+    start_time = time.time()
+    table = run_comprehensive_analysis_batch(symbols, [timeframe], on_result=arsipkan_hasil_lengkap,
+                                             limiter=RateLimiter(api_requests_per_minute))
+
+    rows = []
+    # NaN (tahap gagal atau data tidak ada) dijadikan None agar mudah dicek saat format
+    for r in table.astype(object).where(table.notna(), None).itertuples(index=False):
+        if r.error:
+            rows.append([f"{r.symbol}/USDT", '-', '-', '-', '-', '-', '-', '-', colored(r.error, 'red')])
+            continue
+        rows.append([
+            f"{r.symbol}/USDT",
+            f"${r.price:.6f}" if r.price < 1 else f"${r.price:.2f}",
+            # Tanda * jika sebagian tahap tidak selesai (batas waktu/error)
+            colored(r.ai_action + ('*' if r.missing else ''), get_color_for_action(r.ai_action)),
+            f"{r.ai_confidence:.1f}%",
+            r.technical_bias,
+            r.market_phase or '-',
+            r.risk_level or '-',
+            f"{r.ml_prediction} ({r.ml_confidence:.1f}%)" if r.ml_prediction else '-',
+            f"{r.total_time:.2f}s"
+        ])
+    print(colored(f"\n=== PELUANG TRADING ({timeframe}) ===", 'cyan', attrs=['bold']))
+    print(tabulate(rows, headers=["Coin", "Harga", "Aksi AI", "Keyakinan AI", "Bias Teknikal",
+                                  "Fase Pasar", "Risiko", "Prediksi ML", "Waktu"], tablefmt="grid"))
+    if table['missing'].notna().any():
+        print(colored("* Analisis parsial: sebagian tahap tidak selesai (lihat kolom 'missing' di CSV)", 'yellow'))
+    print(colored(f"Total waktu: {time.time() - start_time:.2f} detik", 'yellow'))
+    cache = get_cache()
+    if cache is not None:
+        stats = cache.stats()
+        print(colored(f"Cache analisis: {stats['hits'] + stats['disk_hits']} hit, {stats['misses']} miss "
+                      f"({stats['hit_rate'] * 100:.0f}%), {stats['entries']} entri, {stats['bytes'] / 1024:.0f} KB", 'yellow'))
+    for label, flight in (('fetch', FETCH_FLIGHT), ('analisis', ANALYSIS_FLIGHT)):
+        stats = flight.stats()
+        if stats['shared']:
+            print(colored(f"Single-flight {label}: {stats['shared']} permintaan duplikat menumpang "
+                          f"(~{stats['saved_seconds']:.1f} detik kerja dihemat)", 'yellow'))
+
+    save_option = input(colored("\nSimpan tabel sebagai CSV? (y/n): ", 'green'))
+    if save_option.lower() == 'y':
+        os.makedirs('analysis_results', exist_ok=True)
+        filename = f"analysis_results/scan_{timeframe}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        table.to_csv(filename, index=False)
+        print(colored(f"Tabel disimpan di {filename}", 'green'))
+
+def format_output_crypto(analisis, simbol, timeframe, df, level_resiko=None):
+    """Format output analisis untuk ditampilkan di terminal (level_resiko bisa diberikan jika sudah dihitung)"""
     harga_sekarang = analisis['current_price']
-    level_resiko = hitung_level_resiko(df, harga_sekarang)
+    if level_resiko is None:
+        level_resiko = hitung_level_resiko(df, harga_sekarang)
     indikator = hitung_indikator_tambahan(df)
     momentum = analisis_momentum(df)
     
@@ -362,122 +299,236 @@ def format_output_crypto(analisis, simbol, timeframe, df):
     
     return output
 
-def get_color_for_action(action):
-    """Mendapatkan warna berdasarkan aksi/keputusan trading"""
-    if action in ['STRONG_BUY', 'BUY']:
-        return 'green'
-    elif action == 'HOLD':
-        return 'yellow'
-    elif action in ['SELL', 'STRONG_SELL']:
-        return 'red'
-    return 'white'
-
-def print_live_decision_table(decisions):
-    """Menampilkan tabel keputusan live dari semua aset yang dipantau"""
-    
-    # Header tabel
-    headers = ["Coin", "Harga", "Aksi", "Keyakinan", "Timeframe", "Volatilitas", "Waktu Update"]
-    
-    # Data tabel
-    table_data = []
-    
-    for coin, data in decisions.items():
-        if data:  # Periksa jika data tersedia
-            row = [
-                coin,
-                f"${data['price']:.4f}",
-                colored(data['action'], get_color_for_action(data['action'])),
-                f"{data['confidence']:.1f}%",
-                data['timeframe'],
-                f"{data['volatility']:.2f}%",
-                data['timestamp'].strftime('%H:%M:%S')
-            ]
-            table_data.append(row)
-    
-    # Mengurutkan tabel berdasarkan keyakinan (dari tinggi ke rendah)
-    table_data.sort(key=lambda x: float(x[3].replace('%', '')), reverse=True)
-    
-    # Cetak tabel
-    if table_data:
-        print(colored("\n=== LIVE TRADING DECISIONS ===", 'cyan', attrs=['bold']))
-        print(colored(f"Last Update: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", 'yellow'))
-        print(tabulate(table_data, headers=headers, tablefmt="grid"))
-    else:
-        print(colored("\nBelum ada data keputusan trading. Silakan tambahkan aset untuk dipantau.", 'yellow'))
-
 # ===== TAHAP 2: FUNGSI FITUR LIVE MONITORING =====
 
-def run_live_monitoring():
-    """Fungsi untuk menjalankan pemantauan trading secara live"""
-    
-    global live_running, tracked_coins, refresh_interval
-    
+def header_live():
+    """Header layar mode live: banner, info pemantauan dan menu cepat"""
+    return '\n'.join([
+        banner_text(),
+        colored("=== MODE LIVE MONITORING ===", 'green', attrs=['bold']),
+        colored(f"Memantau {len(tracked_coins)} aset, update mengikuti penutupan candle "
+                f"(tick harga setiap {rotation_plan['tick_interval'] if rotation_plan else refresh_interval:.0f} detik)", 'yellow'),
+        colored("Tekan Ctrl+C untuk menghentikan mode live", 'yellow'),
+        colored("Menu Cepat:", 'cyan') + " 1. Tambah aset | 2. Hapus aset | 3. Ubah interval refresh | 0. Menu utama",
+        ""
+    ])
+
+def run_live_monitoring(on_decision=None):
+    """
+    Fungsi untuk menjalankan pemantauan trading secara live
+    on_decision: callback(keputusan) untuk mode daemon; jika diisi, layar tidak digambar ulang
+    """
+
+    global live_running, live_renderer, rotation_plan
+
     live_decisions = {}
-    
+    live_series = {}  # (simbol, timeframe) -> state seri live (histori + candle yang sedang terbentuk)
+
+    # Sinkronisasi histori dijadwalkan sesaat setelah candle setiap aset ditutup
+    scheduler = LiveScheduler(settle_delay, schedule_jitter, max_sync_per_step)
+    # Budget request untuk sinkronisasi histori (budget total dikurangi tick), berlaku juga untuk
+    # sinkronisasi awal dan seri baru: job yang jatuh tempo bersamaan dikirim bertahap, bukan sekaligus
+    sync_limiter = RateLimiter(api_requests_per_minute)
+    tick_interval = refresh_interval
+    next_tick = time.time() + tick_interval
+    plan_inputs = None
+
+    # Analisis per aset bisa dijalankan di process pool agar tidak terikat GIL
+    pool = AnalysisPool(analysis_workers, deadlines=(analysis_deadline, stage_deadlines)) if analysis_workers > 0 else None
+    if pool is None and live_ai_analysis and AI_FEATURES_AVAILABLE:
+        # Model dimuat di latar agar siklus pertama tidak menunggu joblib
+        from intelligence.ml_models import preload_models
+        threading.Thread(target=preload_models, name='preload-models', daemon=True).start()
+
+    # Warm state sesi sebelumnya: seri yang masih dipantau dipakai langsung tanpa sinkronisasi ulang
+    warm_writer = WarmStateWriter(warm_state_file, warm_state_interval) if warm_state_file else None
+    restored = muat_warm_state(warm_state_file) if warm_state_file else None
+    if restored is not None:
+        watched = set(tracked_coins.items())
+        live_series.update((key, state) for key, state in restored[0].items() if key in watched)
+        live_decisions.update((key, result) for key, result in restored[1].items() if key in watched)
+        # Harga terakhir langsung diambil agar keputusan yang dipulihkan segera diperbarui
+        next_tick = time.time()
+
+    # Tabel live digambar ulang per baris setiap kali hasil satu aset tersedia
+    interactive = on_decision is None
+    renderer = LiveTableRenderer(header=header_live) if interactive else None
+    if interactive:
+        live_renderer = renderer
+        renderer.invalidate()
+        for key, result in live_decisions.items():
+            renderer.update(key, result)
+    watchlist_version = None
+
+    if metrics_port:
+        try:
+            start_metrics_server(metrics_port)
+        except OSError as e:
+            logger.error(f"Endpoint metrik gagal dijalankan di port {metrics_port}: {str(e)}")
+
+    # Aturan alert dievaluasi terhadap snapshot kolumnar semua seri setiap kali satu seri diperbarui
+    alert_engine = AlertEngine.from_config(alert_rules, alert_sinks) if alert_rules else None
+
+    def publish(key, result):
+        """Teruskan keputusan baru ke tabel live atau ke sink daemon"""
+        for stage, duration in result.get('timings', {}).items():
+            STAGE_SECONDS.observe(duration, stage=stage)
+        SYMBOLS_PROCESSED.inc()
+
+        live_decisions[key] = result
+        arsipkan(buat_record_live(result))
+        if alert_engine is not None:
+            with STAGE_SECONDS.time(stage='alerts'):
+                alert_engine.update(key, result)
+                alert_engine.evaluate()
+        with STAGE_SECONDS.time(stage='render'):
+            if interactive:
+                renderer.update(key, result)
+            else:
+                on_decision(result)
+
     while live_running:
-        # Clear console/terminal
-        os.system('cls' if os.name == 'nt' else 'clear')
-        
-        print_banner()
-        print(colored("\n=== MODE LIVE MONITORING ===", 'green', attrs=['bold']))
-        print(colored(f"Memantau {len(tracked_coins)} aset dengan interval refresh {refresh_interval} detik", 'yellow'))
-        print(colored("Tekan Ctrl+C untuk menghentikan mode live", 'yellow'))
-        
-        # Proses setiap aset yang dipantau
-        for coin_config in tracked_coins:
-            simbol = coin_config['symbol']
-            timeframe = coin_config['timeframe']
-            
+        # Perubahan watchlist dari menu diambil lewat snapshot berversi, tanpa restart;
+        # seri yang tetap dipantau mempertahankan state dan jadwalnya
+        version, items = tracked_coins.snapshot()
+        if version != watchlist_version:
+            watchlist_version = version
+            active_keys = set(items)
+            for key in scheduler.keys() - active_keys:
+                scheduler.remove(*key)
+                live_series.pop(key, None)
+                live_decisions.pop(key, None)
+                if alert_engine is not None:
+                    alert_engine.remove(key)
+                if interactive:
+                    renderer.remove(key)
+            for key in active_keys - scheduler.keys():
+                # Seri hasil warm state yang belum melewati penutupan candle tidak perlu sync langsung
+                scheduler.add(*key, immediate=key not in live_series or not histori_masih_segar(live_series[key]))
+            TRACKED_SERIES.set(len(active_keys))
+
+        # Rencana rotasi dihitung ulang jika watchlist, interval, budget atau prioritas berubah
+        inputs = (version, refresh_interval, api_requests_per_minute, tuple(sorted(symbol_priorities.items())))
+        if inputs != plan_inputs:
+            plan_inputs = inputs
+            rotation_plan = rencanakan_rotasi(items, api_requests_per_minute, refresh_interval, symbol_priorities)
+            for key, detail in rotation_plan['series'].items():
+                scheduler.set_every(*key, detail['every'] or 1)
+            tick_interval = rotation_plan['tick_interval']
+            sync_limiter.set_rate(rotation_plan['budget_rpm'] - rotation_plan['tick_rpm'])
+            if not rotation_plan['full_coverage']:
+                logger.info(f"Budget {api_requests_per_minute} rpm tidak cukup untuk sinkronisasi setiap candle, "
+                            f"seri dirotasi berdasarkan prioritas")
+            if interactive:
+                # Jumlah aset dan interval di header berubah
+                renderer.invalidate()
+
+        now = time.time()
+        sync_keys = scheduler.pop_due(now, limit=sync_limiter.available())
+        tick_due = bool(live_series) and now >= next_tick
+
+        if not sync_keys and not tick_due:
+            # Tunggu sampai job atau tick berikutnya (job yang jatuh tempo menunggu token budget),
+            # cek ulang setiap detik
+            next_sync = scheduler.next_due()
+            if next_sync is not None:
+                next_sync = max(next_sync, now + sync_limiter.wait_time())
+            candidates = [t for t in (next_sync, next_tick if live_series else None) if t is not None]
+            wake = min(candidates) if candidates else now + 1
+            if interactive:
+                renderer.status(f"Update berikutnya dalam {max(0, int(wake - now))} detik...")
+            time.sleep(min(1.0, max(0.0, wake - now)))
+            continue
+
+        cycle_start = time.time()
+        changed = set()
+
+        # Fase tick: harga terakhir semua aset diambil dalam satu request,
+        # lalu hanya candle yang sedang terbentuk yang diperbarui
+        if tick_due:
+            with STAGE_SECONDS.time(stage='fetch_ticks'):
+                ticks = ambil_harga_terakhir([simbol for simbol, _ in live_series])
+            for (simbol, timeframe), state in live_series.items():
+                if simbol in ticks:
+                    if terapkan_tick(state, ticks[simbol]):
+                        logger.info(f"Candle {simbol} {timeframe} ditutup, menunggu sinkronisasi histori")
+                    # Seri di memori diperbarui tanpa mengambil ulang histori
+                    CACHE_REQUESTS.inc(cache='series', result='hit')
+                    changed.add((simbol, timeframe))
+                else:
+                    ERRORS.inc(symbol=simbol, stage='fetch_ticks')
+
+        # Sinkronisasi histori penuh hanya untuk job yang jatuh tempo (aset baru atau candle ditutup)
+        # Job yang gagal dicoba ulang dengan backoff pendek, bukan menunggu penutupan candle berikutnya
+        for key in sync_keys:
+            simbol, timeframe = key
+            CACHE_REQUESTS.inc(cache='series', result='miss')
+            history = None
+            # Token pasti tersedia: jumlah job sudah dibatasi sync_limiter.available() di pop_due
+            sync_limiter.try_acquire()
             try:
-                df = ambil_data_crypto(simbol, timeframe)
-                
-                if df is not None:
-                    analisis = analyze_indicators(df)
-                    keputusan = make_decision(analisis, df)
-                    level_resiko = hitung_level_resiko(df, analisis['current_price'])
-                    
-                    # Simpan keputusan untuk ditampilkan
-                    live_decisions[f"{simbol}/USDT"] = {
-                        'price': analisis['current_price'],
-                        'action': keputusan['action'],
-                        'confidence': keputusan['confidence'],
-                        'timeframe': timeframe,
-                        'volatility': level_resiko['volatilitas'],
-                        'timestamp': datetime.now()
-                    }
+                with STAGE_SECONDS.time(stage='fetch'):
+                    history = ambil_data_crypto(simbol, timeframe)
             except Exception as e:
-                logger.error(f"Error processing {simbol}: {str(e)}")
-                print(f"Error pada {simbol}: {str(e)}")
-        
-        # Tampilkan tabel keputusan
-        print_live_decision_table(live_decisions)
-        
-        # Tampilkan menu cepat
-        print(colored("\nMenu Cepat:", 'cyan'))
-        print("1. Tambah aset untuk dipantau")
-        print("2. Hapus aset dari pantauan")
-        print("3. Ubah interval refresh")
-        print("0. Kembali ke menu utama")
-        
-        # Waktu tunggu sebelum refresh
-        for i in range(refresh_interval, 0, -1):
-            sys.stdout.write(f"\rRefresh dalam {i} detik...   ")
-            sys.stdout.flush()
-            
-            # Cek apakah proses masih harus berjalan
-            if not live_running:
-                break
-                
-            # Tunggu 1 detik
-            time.sleep(1)
-        
-        if not live_running:
-            break
+                logger.error(f"Error sinkronisasi {simbol}: {str(e)}")
+            if history is not None:
+                live_series[key] = buat_state_seri(history, simbol, timeframe)
+                changed.add(key)
+                scheduler.complete(key)
+            else:
+                ERRORS.inc(symbol=simbol, stage='fetch')
+                delay = scheduler.retry(key)
+                logger.warning(f"Sinkronisasi {simbol} {timeframe} gagal, dicoba lagi dalam {delay:.0f} detik")
+
+        # Hitung ulang keputusan hanya untuk seri yang datanya berubah
+        jobs = {key: (key[0], key[1], live_series[key]['df']) for key in changed}
+        if pool is not None:
+            # Hasil dari worker masuk ke tabel satu per satu sesuai urutan selesai
+            for key, result, error in pool.map_unordered(jobs, live_ai_analysis):
+                if error is not None:
+                    logger.error(f"Error processing {key[0]}: {str(error)}")
+                    ERRORS.inc(symbol=key[0], stage='analysis')
+                    continue
+                publish(key, result)
+        else:
+            for key, (simbol, timeframe, df) in jobs.items():
+                try:
+                    result = analisis_seri(df, simbol, timeframe, live_ai_analysis)
+                except Exception as e:
+                    logger.error(f"Error processing {simbol}: {str(e)}")
+                    ERRORS.inc(symbol=simbol, stage='analysis')
+                    continue
+                publish(key, result)
+
+        if interactive:
+            renderer.end_cycle()
+
+        # Backpressure: tick berikutnya dihitung dari akhir siklus sehingga siklus yang
+        # overrun tidak menumpuk request
+        cycle_duration = time.time() - cycle_start
+        CYCLE_SECONDS.observe(cycle_duration)
+        CYCLE_SYMBOLS.observe(len(jobs))
+        if tick_due:
+            next_tick = time.time() + tick_interval
+        if cycle_duration > tick_interval:
+            logger.warning(f"Siklus live overrun: {cycle_duration:.1f} detik (interval {tick_interval:.0f} detik)")
+        if warm_writer is not None:
+            warm_writer.maybe_write(live_series, live_decisions)
+
+    if pool is not None:
+        pool.shutdown()
+    if warm_writer is not None:
+        warm_writer.close(live_series, live_decisions)
+    if alert_engine is not None:
+        alert_engine.close()
+    rotation_plan = None
+    if interactive:
+        live_renderer = None
 
 def start_live_monitoring():
     """Memulai thread untuk live monitoring"""
     
-    global live_running, live_thread, tracked_coins
+    global live_running, live_thread
     
     if live_running:
         print(colored("Mode live monitoring sudah berjalan!", 'yellow'))
@@ -510,10 +561,62 @@ def stop_live_monitoring():
     
     live_thread = None
 
+def jeda_tampilan_live():
+    """Hentikan sementara penggambaran layar live saat menu dipakai (monitoring tetap berjalan)"""
+    if live_renderer is not None:
+        live_renderer.pause()
+
+def lanjutkan_tampilan_live():
+    """Tampilkan kembali layar live"""
+    if live_renderer is not None:
+        live_renderer.resume()
+
+def format_json_keputusan(keputusan):
+    """Serialisasi satu keputusan live menjadi satu baris JSON"""
+    data = dict(keputusan)
+    data['timestamp'] = data['timestamp'].isoformat()
+    return json.dumps(data, default=float)
+
+def jalankan_daemon(output=None, max_bytes=10 * 1024 * 1024, backup_count=5):
+    """
+    Mode daemon non-interaktif: loop monitoring yang sama tanpa menu, clear layar maupun banner.
+    Setiap keputusan ditulis sebagai satu baris JSON ke stdout atau ke file yang dirotasi.
+    """
+    global live_running
+
+    if not tracked_coins:
+        logger.error("Tidak ada aset yang dipantau. Gunakan --symbols atau file konfigurasi.")
+        return
+
+    json_logger = logging.getLogger('tradingmetrics.decisions')
+    json_logger.propagate = False
+    json_logger.setLevel(logging.INFO)
+    if output:
+        handler = logging.handlers.RotatingFileHandler(output, maxBytes=max_bytes, backupCount=backup_count)
+    else:
+        handler = logging.StreamHandler(sys.stdout)
+        # stdout khusus untuk JSON; print() dari modul lain dialihkan ke stderr
+        sys.stdout = sys.stderr
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    # Penulisan keputusan juga lewat antrean agar thread live tidak menunggu disk atau pipe
+    queue_handler, listener = antrekan_handler(handler)
+    json_logger.addHandler(queue_handler)
+
+    logger.info(f"Mode daemon: memantau {len(tracked_coins)} aset, output ke {output or 'stdout'}")
+
+    live_running = True
+    try:
+        run_live_monitoring(on_decision=lambda keputusan: json_logger.info(format_json_keputusan(keputusan)))
+    finally:
+        live_running = False
+        listener.stop()
+        json_logger.removeHandler(queue_handler)
+        handler.close()
+
 def manage_tracked_coins(cryptos, timeframes):
     """Menu untuk mengelola aset yang dipantau"""
     
-    global tracked_coins, refresh_interval
+    global refresh_interval, api_requests_per_minute
     
     while True:
         print(colored("\n=== Kelola Aset yang Dipantau ===", 'cyan', attrs=['bold']))
@@ -521,8 +624,9 @@ def manage_tracked_coins(cryptos, timeframes):
         # Tampilkan daftar aset yang sedang dipantau
         if tracked_coins:
             print(colored("\nAset yang Sedang Dipantau:", 'yellow'))
-            for i, coin in enumerate(tracked_coins, 1):
-                print(f"{i}. {coin['symbol']}/USDT ({coin['timeframe']})")
+            for i, (simbol, timeframe) in enumerate(tracked_coins, 1):
+                prioritas = symbol_priorities.get(simbol, 1.0)
+                print(f"{i}. {simbol}/USDT ({timeframe})" + (f" - prioritas {prioritas:g}" if prioritas != 1.0 else ""))
         else:
             print(colored("\nBelum ada aset yang dipantau.", 'yellow'))
         
@@ -530,9 +634,12 @@ def manage_tracked_coins(cryptos, timeframes):
         print("1. Tambah Aset")
         print("2. Hapus Aset")
         print("3. Ubah Interval Refresh (saat ini:", refresh_interval, "detik)")
+        print("4. Ubah Budget API (saat ini:", api_requests_per_minute, "request/menit)")
+        print("5. Atur Prioritas Aset")
+        print("6. Laporan Rotasi & Staleness")
         print("0. Kembali")
         
-        pilihan = input(colored("\nMasukkan pilihan (0-3): ", 'green'))
+        pilihan = input(colored("\nMasukkan pilihan (0-6): ", 'green'))
         
         if pilihan == '0':
             break
@@ -563,20 +670,10 @@ def manage_tracked_coins(cryptos, timeframes):
             simbol = cryptos[coin_choice]
             timeframe = timeframes[tf_choice]
             
-            exists = False
-            for coin in tracked_coins:
-                if coin['symbol'] == simbol and coin['timeframe'] == timeframe:
-                    exists = True
-                    break
-            
-            if exists:
-                print(colored(f"{simbol}/USDT dengan timeframe {timeframe} sudah dipantau!", 'yellow'))
-            else:
-                tracked_coins.append({
-                    'symbol': simbol,
-                    'timeframe': timeframe
-                })
+            if tracked_coins.add(simbol, timeframe):
                 print(colored(f"{simbol}/USDT ({timeframe}) ditambahkan ke pemantauan.", 'green'))
+            else:
+                print(colored(f"{simbol}/USDT dengan timeframe {timeframe} sudah dipantau!", 'yellow'))
         
         elif pilihan == '2':
             # Hapus aset
@@ -585,34 +682,72 @@ def manage_tracked_coins(cryptos, timeframes):
                 continue
             
             print(colored("\nPilih Aset untuk Dihapus:", 'yellow'))
-            for i, coin in enumerate(tracked_coins, 1):
-                print(f"{i}. {coin['symbol']}/USDT ({coin['timeframe']})")
+            for i, (simbol, timeframe) in enumerate(tracked_coins, 1):
+                print(f"{i}. {simbol}/USDT ({timeframe})")
             
             del_choice = input(colored("\nMasukkan nomor aset: ", 'green'))
             
             try:
-                del_idx = int(del_choice) - 1
-                if 0 <= del_idx < len(tracked_coins):
-                    removed = tracked_coins.pop(del_idx)
-                    print(colored(f"{removed['symbol']}/USDT ({removed['timeframe']}) dihapus dari pemantauan.", 'green'))
+                removed = tracked_coins.remove_at(int(del_choice) - 1)
+                if removed is not None:
+                    print(colored(f"{removed[0]}/USDT ({removed[1]}) dihapus dari pemantauan.", 'green'))
                 else:
                     print(colored("Nomor tidak valid!", 'red'))
             except ValueError:
                 print(colored("Input tidak valid!", 'red'))
         
         elif pilihan == '3':
-            # Ubah interval refresh
+            # Ubah interval refresh (batasnya ditentukan budget API, bukan angka tetap)
             try:
-                new_interval = int(input(colored("\nMasukkan interval refresh baru (dalam detik, min 30): ", 'green')))
+                new_interval = int(input(colored("\nMasukkan interval refresh baru (dalam detik): ", 'green')))
                 
-                if new_interval < 30:
-                    print(colored("Interval minimal adalah 30 detik untuk menghindari rate limiting API.", 'yellow'))
-                    new_interval = 30
+                if new_interval < 1:
+                    print(colored("Interval minimal adalah 1 detik.", 'yellow'))
+                    new_interval = 1
                 
                 refresh_interval = new_interval
                 print(colored(f"Interval refresh diubah menjadi {refresh_interval} detik.", 'green'))
+                
+                plan = rencanakan_rotasi(tracked_coins.items(), api_requests_per_minute, refresh_interval, symbol_priorities)
+                if plan['tick_interval'] > refresh_interval:
+                    print(colored(f"Dengan budget {api_requests_per_minute} request/menit, tick harga efektif "
+                                  f"setiap {plan['tick_interval']:.0f} detik.", 'yellow'))
+            except ValueError:
+                print(colored("Input tidak valid! Gunakan angka.", 'red'))
+        
+        elif pilihan == '4':
+            # Ubah budget request API
+            try:
+                new_budget = int(input(colored("\nMasukkan budget request per menit: ", 'green')))
+                if new_budget < 1:
+                    print(colored("Budget minimal adalah 1 request/menit.", 'yellow'))
+                    new_budget = 1
+                api_requests_per_minute = new_budget
+                print(colored(f"Budget API diubah menjadi {api_requests_per_minute} request/menit.", 'green'))
+            except ValueError:
+                print(colored("Input tidak valid! Gunakan angka.", 'red'))
+        
+        elif pilihan == '5':
+            # Prioritas per simbol: simbol berprioritas tinggi disinkronkan lebih sering saat budget terbatas
+            simbol = input(colored("\nMasukkan simbol (contoh: BTC): ", 'green')).strip().upper()
+            try:
+                prioritas = float(input(colored("Masukkan prioritas (default 1, lebih besar = lebih sering): ", 'green')))
+                if prioritas <= 0:
+                    print(colored("Prioritas harus lebih besar dari 0!", 'red'))
+                    continue
+                if prioritas == 1.0:
+                    symbol_priorities.pop(simbol, None)
+                else:
+                    symbol_priorities[simbol] = prioritas
+                print(colored(f"Prioritas {simbol} diubah menjadi {prioritas:g}.", 'green'))
             except ValueError:
                 print(colored("Input tidak valid! Gunakan angka.", 'red'))
+        
+        elif pilihan == '6':
+            # Laporan biaya watchlist terhadap budget API
+            plan = rencanakan_rotasi(tracked_coins.items(), api_requests_per_minute, refresh_interval, symbol_priorities)
+            print(colored("\n=== Rencana Rotasi ===", 'cyan', attrs=['bold']))
+            print(laporan_rotasi(plan))
 
     
 def simpan_data_konfigurasi():
@@ -622,8 +757,29 @@ def simpan_data_konfigurasi():
         os.makedirs('config', exist_ok=True)
         
         config = {
-            'tracked_coins': tracked_coins,
-            'refresh_interval': refresh_interval
+            'tracked_coins': tracked_coins.to_config(),
+            'refresh_interval': refresh_interval,
+            'settle_delay': settle_delay,
+            'schedule_jitter': schedule_jitter,
+            'max_sync_per_step': max_sync_per_step,
+            'analysis_workers': analysis_workers,
+            'live_ai_analysis': live_ai_analysis,
+            'metrics_port': metrics_port,
+            'api_requests_per_minute': api_requests_per_minute,
+            'symbol_priorities': symbol_priorities,
+            'alert_rules': alert_rules,
+            'alert_sinks': alert_sinks,
+            'log_level': log_level,
+            'log_format': log_format,
+            'log_file': log_file,
+            'log_module_levels': log_module_levels,
+            'warm_state_file': warm_state_file,
+            'warm_state_interval': warm_state_interval,
+            'analysis_cache_mb': analysis_cache_mb,
+            'analysis_cache_dir': analysis_cache_dir,
+            'analysis_deadline': analysis_deadline,
+            'stage_deadlines': stage_deadlines,
+            'archive_dir': archive_dir
         }
         
         with open('config/tradingmetrics_config.json', 'w') as f:
@@ -635,15 +791,43 @@ def simpan_data_konfigurasi():
 
 def load_data_konfigurasi():
     """Muat data konfigurasi dari file"""
-    global tracked_coins, refresh_interval
+    global refresh_interval, settle_delay, schedule_jitter, max_sync_per_step
+    global analysis_workers, live_ai_analysis, metrics_port, api_requests_per_minute, symbol_priorities
+    global alert_rules, alert_sinks, log_level, log_format, log_file, log_module_levels
+    global warm_state_file, warm_state_interval, analysis_cache_mb, analysis_cache_dir, archive_dir
+    global analysis_deadline, stage_deadlines
     
     try:
         if os.path.exists('config/tradingmetrics_config.json'):
             with open('config/tradingmetrics_config.json', 'r') as f:
                 config = json.load(f)
             
-            tracked_coins = config.get('tracked_coins', [])
+            tracked_coins.replace((coin['symbol'], coin['timeframe']) for coin in config.get('tracked_coins', []))
             refresh_interval = config.get('refresh_interval', 60)
+            settle_delay = config.get('settle_delay', settle_delay)
+            schedule_jitter = config.get('schedule_jitter', schedule_jitter)
+            max_sync_per_step = config.get('max_sync_per_step', max_sync_per_step)
+            analysis_workers = config.get('analysis_workers', analysis_workers)
+            live_ai_analysis = config.get('live_ai_analysis', live_ai_analysis)
+            metrics_port = config.get('metrics_port', metrics_port)
+            api_requests_per_minute = config.get('api_requests_per_minute', api_requests_per_minute)
+            symbol_priorities = config.get('symbol_priorities', symbol_priorities)
+            alert_rules = config.get('alert_rules', alert_rules)
+            alert_sinks = config.get('alert_sinks', alert_sinks)
+            log_level = config.get('log_level', log_level)
+            log_format = config.get('log_format', log_format)
+            log_file = config.get('log_file', log_file)
+            log_module_levels = config.get('log_module_levels', log_module_levels)
+            warm_state_file = config.get('warm_state_file', warm_state_file)
+            warm_state_interval = config.get('warm_state_interval', warm_state_interval)
+            analysis_cache_mb = config.get('analysis_cache_mb', analysis_cache_mb)
+            analysis_cache_dir = config.get('analysis_cache_dir', analysis_cache_dir)
+            configure_cache(analysis_cache_mb > 0, max_mb=analysis_cache_mb, disk_dir=analysis_cache_dir)
+            archive_dir = config.get('archive_dir', archive_dir)
+            analysis_deadline = config.get('analysis_deadline', analysis_deadline)
+            stage_deadlines = config.get('stage_deadlines', stage_deadlines)
+            if AI_FEATURES_AVAILABLE:
+                configure_deadlines(analysis_deadline, stage_deadlines)
             
             logger.info(f"Konfigurasi dimuat: {len(tracked_coins)} aset, interval {refresh_interval}s")
         else:
@@ -704,9 +888,11 @@ def main():
     }
     
     while True:
-        # Clear console/terminal jika tidak dalam mode live
-        if not live_running:
-            os.system('cls' if os.name == 'nt' else 'clear')
+        # Clear console/terminal; jika mode live berjalan, layarnya sedang dijeda
+        os.system('cls' if os.name == 'nt' else 'clear')
+        if live_running:
+            print(banner_text())
+        else:
             print_banner()
         
         print(colored("\n=== MENU UTAMA ===", 'cyan', attrs=['bold']))
@@ -733,10 +919,6 @@ def main():
         elif pilihan_menu == '1':
             # Analisis Single Crypto (mode asli)
             
-            # Jika mode live sedang berjalan, hentikan dulu
-            if live_running:
-                stop_live_monitoring()
-            
             # Clear console/terminal
             os.system('cls' if os.name == 'nt' else 'clear')
             print_banner()
@@ -802,24 +984,14 @@ def main():
                 pilihan_tambahan = input(colored("\nMasukkan pilihan: ", 'green'))
                 
                 if pilihan_tambahan == '1':
-                    # Cek apakah sudah ada di tracked_coins
+                    # Jika mode live berjalan, aset langsung ikut dipantau pada langkah berikutnya
                     simbol = cryptos[pilihan]
                     timeframe = timeframes[pilihan_tf]
                     
-                    exists = False
-                    for coin in tracked_coins:
-                        if coin['symbol'] == simbol and coin['timeframe'] == timeframe:
-                            exists = True
-                            break
-                    
-                    if exists:
-                        print(colored(f"{simbol}/USDT dengan timeframe {timeframe} sudah dipantau!", 'yellow'))
-                    else:
-                        tracked_coins.append({
-                            'symbol': simbol,
-                            'timeframe': timeframe
-                        })
+                    if tracked_coins.add(simbol, timeframe):
                         print(colored(f"{simbol}/USDT ({timeframe}) ditambahkan ke pemantauan.", 'green'))
+                    else:
+                        print(colored(f"{simbol}/USDT dengan timeframe {timeframe} sudah dipantau!", 'yellow'))
             else:
                 print(colored("Gagal mengambil data. Silakan coba lagi.", 'red'))
             
@@ -833,32 +1005,23 @@ def main():
                 input(colored("\nTekan Enter untuk melanjutkan...", 'green'))
                 continue
             
+            # Jika mode live sudah berjalan, cukup tampilkan kembali layarnya (state tetap hangat)
             if live_running:
-                print(colored("Mode live monitoring sudah berjalan!", 'yellow'))
-                input(colored("\nTekan Enter untuk melanjutkan...", 'green'))
-                continue
-            
-            start_live_monitoring()
+                lanjutkan_tampilan_live()
+            else:
+                start_live_monitoring()
             
             # Menunggu sampai user menekan tombol untuk kembali
             input(colored("\nMode live berjalan di background. Tekan Enter untuk kembali ke menu utama...", 'green'))
+            jeda_tampilan_live()
         
         elif pilihan_menu == '3':
-            # Kelola Aset yang Dipantau
-            
-            # Jika mode live sedang berjalan, hentikan dulu
-            if live_running:
-                stop_live_monitoring()
-            
+            # Kelola Aset yang Dipantau (perubahan langsung dipakai mode live yang berjalan)
             manage_tracked_coins(cryptos, timeframes)
             
         elif pilihan_menu == '4' and AI_FEATURES_AVAILABLE:
             # Analisis Lanjutan dengan AI
             
-            # Jika mode live sedang berjalan, hentikan dulu
-            if live_running:
-                stop_live_monitoring()
-            
             # Clear console/terminal
             os.system('cls' if os.name == 'nt' else 'clear')
             print_banner()
@@ -868,14 +1031,15 @@ def main():
             print(colored("\nPilih Crypto:", 'yellow'))
             for key, value in cryptos.items():
                 print(f"{key}. {value}/USDT")
+            print("41. Semua crypto (tabel peluang)")
             print("0. Kembali")
             
-            pilihan = input(colored("\nMasukkan pilihan (0-40): ", 'green'))
+            pilihan = input(colored("\nMasukkan pilihan (0-41): ", 'green'))
             
             if pilihan == '0':
                 continue
                 
-            if pilihan not in cryptos:
+            if pilihan not in cryptos and pilihan != '41':
                 print(colored("Pilihan tidak valid!", 'red'))
                 continue
                 
@@ -891,6 +1055,12 @@ def main():
                 print(colored("Timeframe tidak valid!", 'red'))
                 continue
             
+            if pilihan == '41':
+                # Scan semua koin dalam satu batch
+                tampilkan_scan_batch(list(cryptos.values()), timeframes[pilihan_tf])
+                input(colored("\nTekan Enter untuk melanjutkan...", 'green'))
+                continue
+            
             print(colored("\nMengambil dan menganalisis data...", 'yellow'))
             df = ambil_data_crypto(cryptos[pilihan], timeframes[pilihan_tf])
             
@@ -910,9 +1080,13 @@ def main():
                 )
                 
                 print(advanced_output)
+                arsipkan_hasil_lengkap(cryptos[pilihan], timeframes[pilihan_tf], analysis_results)
+                if archive_dir:
+                    print(colored(f"Hasil dicatat di arsip {archive_dir} "
+                                  f"(python result_archive.py query --symbol {cryptos[pilihan]})", 'yellow'))
                 
-                # Beri opsi untuk menyimpan hasil analisis
-                save_option = input(colored("\nSimpan hasil analisis? (y/n): ", 'green'))
+                # Laporan teks tetap bisa diekspor untuk dibaca manual
+                save_option = input(colored("\nEkspor laporan teks? (y/n): ", 'green'))
                 if save_option.lower() == 'y':
                     result_dir = "analysis_results"
                     os.makedirs(result_dir, exist_ok=True)
@@ -929,7 +1103,69 @@ def main():
             
             input(colored("\nTekan Enter untuk melanjutkan...", 'green'))
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="TradingMetrics-AI")
+    parser.add_argument('--daemon', action='store_true', help="Jalankan monitoring tanpa menu, output JSON lines")
+    parser.add_argument('--symbols', help="Daftar simbol untuk daemon, contoh: BTC,ETH (default: aset di konfigurasi)")
+    parser.add_argument('--timeframe', default='15m', choices=['15m', '30m', '1h', '4h'], help="Timeframe untuk --symbols")
+    parser.add_argument('--output', help="File output JSON lines (default: stdout)")
+    parser.add_argument('--max-bytes', type=int, default=10 * 1024 * 1024, help="Ukuran maksimum file output sebelum dirotasi")
+    parser.add_argument('--backup-count', type=int, default=5, help="Jumlah file rotasi yang disimpan")
+    parser.add_argument('--metrics-port', type=int, help="Port endpoint metrik Prometheus (/metrics)")
+    parser.add_argument('--log-level', help="Level log global (DEBUG, INFO, WARNING, ERROR)")
+    parser.add_argument('--log-format', choices=['text', 'json'], help="Format log: text atau json (satu record per baris)")
+    parser.add_argument('--log-file', help="Tulis log ke file, bukan stderr")
+    parser.add_argument('--log-module', help="Level per modul, contoh: market_data=WARNING,intelligence=DEBUG")
+    parser.add_argument('--trace', metavar='FILE', help="Catat span tiap tahap analisis dan tulis Chrome trace JSON saat keluar")
+    parser.add_argument('--trace-memory', action='store_true', help="Sertakan delta alokasi memori per span (tracemalloc, lebih lambat)")
+    parser.add_argument('--profile-stage', action='append', help="Jalankan span/tahap ini di bawah cProfile (bisa berulang), contoh: ml_prediction")
+    parser.add_argument('--profile-dir', default='profiles', help="Direktori output file .prof")
+    parser.add_argument('--alert-sink', action='append', help="Tujuan alert (bisa berulang): stdout, file:path, udp:host:port, unix:path")
+    return parser.parse_args(argv)
+
+def simpan_trace(path):
+    """Tulis Chrome trace dan ringkasan span terlama ke log"""
+    jumlah = export_chrome_trace(path)
+    logger.info(f"Trace {jumlah} event disimpan di {path} (buka di chrome://tracing atau ui.perfetto.dev)")
+    for item in ringkasan_span()[:10]:
+        logger.info(f"  {item['name']}: {item['count']}x, wall {item['wall'] * 1000:.1f}ms "
+                    f"(rata-rata {item['mean_wall'] * 1000:.2f}ms), CPU {item['cpu'] * 1000:.1f}ms, "
+                    f"alokasi {item['alloc'] / 1024:.0f}KB")
+
+def konfigurasi_tracing(args):
+    """Aktifkan tracing/profiling tahap analisis dari argumen CLI (analisis di proses ini; worker pool tidak ikut)"""
+    if args.profile_stage:
+        profile_stages(args.profile_stage, args.profile_dir)
+    if args.trace or args.trace_memory:
+        enable_tracing(memory=args.trace_memory)
+    if args.trace:
+        atexit.register(simpan_trace, args.trace)
+
+def konfigurasi_logging(args):
+    """Terapkan konfigurasi logging dari file konfigurasi, ditimpa argumen CLI"""
+    module_levels = dict(log_module_levels)
+    module_levels.update(parse_module_levels(args.log_module))
+    setup_logging(args.log_level or log_level, args.log_format or log_format, args.log_file or log_file, module_levels)
+
 if __name__ == "__main__":
+    args = parse_args()
+
+    if args.daemon:
+        load_data_konfigurasi()
+        konfigurasi_logging(args)
+        konfigurasi_tracing(args)
+        if args.metrics_port is not None:
+            metrics_port = args.metrics_port
+        if args.alert_sink:
+            alert_sinks = args.alert_sink
+        if args.symbols:
+            tracked_coins.replace((simbol.strip(), args.timeframe) for simbol in args.symbols.split(',') if simbol.strip())
+        try:
+            jalankan_daemon(args.output, args.max_bytes, args.backup_count)
+        except KeyboardInterrupt:
+            logger.info("Mode daemon dihentikan")
+        sys.exit(0)
+
     try:
         # Buat struktur direktori yang diperlukan
         os.makedirs('config', exist_ok=True)
@@ -940,6 +1176,8 @@ if __name__ == "__main__":
         
         # Muat konfigurasi sebelum memulai
         load_data_konfigurasi()
+        konfigurasi_logging(args)
+        konfigurasi_tracing(args)
         
         # Jalankan program utama
         main()
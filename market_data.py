@@ -0,0 +1,199 @@
+# market_data.py
+
+import logging
+import threading
+import time
+import numpy as np
+import pandas as pd
+from pycoingecko import CoinGeckoAPI
+
+from bar_aggregator import build_ohlcv
+from singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Rate limit CoinGecko free tier (request per menit)
+DEFAULT_REQUESTS_PER_MINUTE = 10
+
+# Jumlah id maksimum per request /simple/price
+PRICE_IDS_PER_REQUEST = 250
+
+# Mapping interval ke days untuk CoinGecko
+# CoinGecko memberi data 5 menit untuk 1 hari terakhir dan data per jam untuk 2-90 hari
+DAYS_MAP = {
+    "15m": 1,     # 1 hari data 5 menit -> 96 candle 15 menit
+    "30m": 1,     # 1 hari data 5 menit -> 48 candle 30 menit
+    "1h": 7,      # 7 hari data per jam -> 168 candle 1 jam
+    "4h": 30      # 30 hari data per jam -> 180 candle 4 jam
+}
+
+# Mapping simbol Binance ke id CoinGecko
+COIN_MAP = {
+    'BTC': 'bitcoin',
+    'ETH': 'ethereum',
+    'BNB': 'binancecoin',
+    'DOGE': 'dogecoin',
+    'XRP': 'ripple',
+    'ADA': 'cardano',
+    'SOL': 'solana',
+    'DOT': 'polkadot',
+    'SHIB': 'shiba-inu',
+    'MATIC': 'matic-network',
+    'AVAX': 'avalanche-2',
+    'LINK': 'chainlink',
+    'UNI': 'uniswap',
+    'PEPE': 'pepe',
+    'MEME': 'meme',
+    'BONK': 'bonk',
+    'WLD': 'worldcoin-wld',
+    'INJ': 'injective-protocol',
+    'SUI': 'sui',
+    'FLOKI': 'floki',
+    'ATOM': 'cosmos',
+    'NEAR': 'near',
+    'FTM': 'fantom',
+    'APE': 'apecoin',
+    'OP': 'optimism',
+    'ARB': 'arbitrum',
+    'LTC': 'litecoin',
+    'BCH': 'bitcoin-cash',
+    'TRX': 'tron',
+    'ETC': 'ethereum-classic',
+    'FIL': 'filecoin',
+    'ICP': 'internet-computer',
+    'SAND': 'the-sandbox',
+    'GALA': 'gala',
+    'APT': 'aptos',
+    'AAVE': 'aave',
+    'SXP': 'swipe',
+    'GMT': 'stepn',
+    'ALGO': 'algorand',
+    '1INCH': '1inch'
+}
+
+class RateLimiter:
+    """
+    Token bucket untuk budget request CoinGecko yang dipakai bersama beberapa pemanggil/thread.
+    Token terisi requests_per_minute per menit sampai kapasitas burst; satu request = satu token.
+    """
+
+    def __init__(self, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE, burst=1):
+        self.burst = max(1.0, float(burst))
+        self.rate = max(float(requests_per_minute), 1e-6) / 60.0
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.stats = {'acquired': 0, 'waited_seconds': 0.0}
+
+    def _isi(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def set_rate(self, requests_per_minute):
+        with self._lock:
+            self._isi()
+            self.rate = max(float(requests_per_minute), 1e-6) / 60.0
+
+    def available(self):
+        """Jumlah request yang boleh dikirim sekarang"""
+        with self._lock:
+            self._isi()
+            return int(self._tokens)
+
+    def wait_time(self):
+        """Detik sampai satu token tersedia (0 jika sudah tersedia)"""
+        with self._lock:
+            self._isi()
+            return max(0.0, (1.0 - self._tokens) / self.rate)
+
+    def try_acquire(self):
+        """Ambil satu token tanpa menunggu; False jika budget habis"""
+        with self._lock:
+            self._isi()
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            self.stats['acquired'] += 1
+            return True
+
+    def acquire(self, timeout=None):
+        """Tunggu sampai satu token tersedia; False jika timeout habis lebih dulu"""
+        start = time.monotonic()
+        while True:
+            with self._lock:
+                self._isi()
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    self.stats['acquired'] += 1
+                    self.stats['waited_seconds'] += time.monotonic() - start
+                    return True
+                wait = (1.0 - self._tokens) / self.rate
+            if timeout is not None:
+                remaining = timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+# Permintaan histori yang sama dari beberapa pemanggil (live, batch, API) hanya diambil sekali;
+# pemanggil yang menumpang mendapat view dangkal sendiri sehingga kolom tambahan tidak saling terlihat
+FETCH_FLIGHT = SingleFlight('fetch', freeze=lambda df: df.copy(deep=False), thaw=lambda df: df.copy(deep=False))
+
+def ambil_data_crypto(simbol, interval="15m", limit=100, coin_id=None, limiter=None):
+    """
+    Mengambil data cryptocurrency dari CoinGecko API
+    coin_id: id CoinGecko, untuk koin yang tidak ada di COIN_MAP
+    limiter: RateLimiter bersama; request menunggu token budget (hanya pemanggil yang benar-benar mengambil)
+    """
+    df, _ = FETCH_FLIGHT.do((simbol, interval, limit, coin_id), _ambil_data_crypto, simbol, interval, limit, coin_id, limiter)
+    return df
+
+def _ambil_data_crypto(simbol, interval, limit, coin_id, limiter=None):
+    try:
+        coin_id = coin_id or COIN_MAP.get(simbol)
+        if coin_id is None:
+            raise ValueError(f"Symbol {simbol} tidak ditemukan dalam mapping CoinGecko")
+
+        if limiter is not None:
+            limiter.acquire()
+
+        logger.info(f"Mengambil data {simbol} menggunakan CoinGecko API")
+
+        cg = CoinGeckoAPI()
+
+        # Dapatkan data harga dengan interval
+        data = cg.get_coin_market_chart_by_id(
+            id=coin_id,
+            vs_currency='usd',
+            days=DAYS_MAP[interval]
+        )
+
+        # Membuat DataFrame dari data
+        prices = pd.DataFrame(data['prices'], columns=['timestamp', 'close'])
+        volumes = pd.DataFrame(data['total_volumes'], columns=['timestamp', 'volume'])
+
+        # Gabungkan data (timestamp masih dalam epoch ms)
+        prices['timestamp'] = prices['timestamp'].astype(np.int64)
+        volumes['timestamp'] = volumes['timestamp'].astype(np.int64)
+        points = pd.merge_asof(prices, volumes, on='timestamp')
+
+        # Bangun candle OHLC asli dari titik harga di dalam setiap interval
+        # total_volumes CoinGecko adalah volume 24 jam bergulir, jadi yang dipakai nilai terakhir per candle
+        df = build_ohlcv(
+            points['timestamp'].values,
+            points['close'].values,
+            points['volume'].fillna(0).values,
+            interval,
+            volume_mode='last'
+        )
+
+        # Terbatas pada jumlah baris yang diminta
+        df = df.tail(limit).reset_index(drop=True)
+
+        logger.info(f"Berhasil mengambil {len(df)} baris data untuk {simbol}")
+        return df
+
+    except Exception as e:
+        logger.error(f"Error fetching CoinGecko data: {str(e)}")
+        return None
@@ -0,0 +1,179 @@
+# metrics.py
+
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# Semua metrik yang dibuat otomatis terdaftar di sini
+REGISTRY = []
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+class _Metric:
+    """Dasar metrik berlabel dengan format teks Prometheus"""
+    type_name = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key, extra=()):
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._samples(key, value))
+        return lines
+
+    def _samples(self, key, value):
+        return [f"{self.name}{self._labels(key)} {_format_value(value)}"]
+
+class Counter(_Metric):
+    """Nilai yang hanya bertambah (jumlah error, jumlah request, dll)"""
+    type_name = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(_Metric):
+    """Nilai sesaat yang bisa naik turun"""
+    type_name = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+class Histogram(_Metric):
+    """Distribusi nilai (latency) dalam bucket kumulatif"""
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            # Simpan per bucket (non-kumulatif); dijumlahkan saat render
+            state[0][bisect.bisect_left(self.buckets, value)] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Context manager untuk mengukur durasi blok kode"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self, key, value):
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += bucket_count
+            lines.append(f"{self.name}_bucket{self._labels(key, [('le', _format_value(bound))])} {cumulative}")
+        lines.append(f"{self.name}_sum{self._labels(key)} {_format_value(total)}")
+        lines.append(f"{self.name}_count{self._labels(key)} {count}")
+        return lines
+
+def render_metrics():
+    """Semua metrik terdaftar dalam format teks Prometheus"""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+# ===== METRIK MODE LIVE =====
+
+STAGE_SECONDS = Histogram(
+    'tradingmetrics_stage_seconds',
+    'Durasi setiap tahap mode live (fetch, analyze_indicators, make_decision, hitung_level_resiko, render, ...)',
+    ['stage']
+)
+CYCLE_SECONDS = Histogram('tradingmetrics_cycle_seconds', 'Durasi satu siklus mode live')
+CYCLE_SYMBOLS = Histogram(
+    'tradingmetrics_cycle_symbols',
+    'Jumlah seri yang dianalisis per siklus',
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500)
+)
+SYMBOLS_PROCESSED = Counter('tradingmetrics_symbols_processed_total', 'Jumlah analisis seri yang selesai')
+CACHE_REQUESTS = Counter('tradingmetrics_cache_requests_total', 'Akses cache per jenis cache dan hasil (hit/miss)', ['cache', 'result'])
+SINGLEFLIGHT_CALLS = Counter(
+    'tradingmetrics_singleflight_calls_total',
+    'Permintaan single-flight per lapisan (leader = dihitung, shared = menumpang permintaan yang sedang berjalan)',
+    ['flight', 'role']
+)
+SINGLEFLIGHT_SAVED_SECONDS = Counter(
+    'tradingmetrics_singleflight_saved_seconds_total',
+    'Perkiraan detik kerja duplikat yang dihemat single-flight',
+    ['flight']
+)
+ERRORS = Counter('tradingmetrics_errors_total', 'Jumlah error per simbol dan tahap', ['symbol', 'stage'])
+TRACKED_SERIES = Gauge('tradingmetrics_tracked_series', 'Jumlah seri (simbol, timeframe) yang dipantau')
+
+# ===== HTTP ENDPOINT =====
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = render_metrics().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Jangan mengotori layar live dengan log akses HTTP
+        pass
+
+_server = None
+
+def start_metrics_server(port, host='127.0.0.1'):
+    """Jalankan endpoint /metrics di thread daemon (sekali per proses)"""
+    global _server
+    if _server is not None:
+        return _server
+    _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    _server.daemon_threads = True
+    thread = threading.Thread(target=_server.serve_forever, name='metrics-server', daemon=True)
+    thread.start()
+    logger.info(f"Endpoint metrik tersedia di http://{host}:{port}/metrics")
+    return _server
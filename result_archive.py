@@ -0,0 +1,347 @@
+# result_archive.py
+
+import argparse
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from tabulate import tabulate
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = 'archive'
+# Indeks disimpan per partisi di samping file datanya: archive/<SIMBOL>/<YYYY-MM-DD>.index.json
+INDEX_SUFFIX = '.index.json'
+
+# Writer menulis ke disk setiap FLUSH_INTERVAL detik atau begitu FLUSH_RECORDS record terkumpul
+FLUSH_INTERVAL = 2.0
+FLUSH_RECORDS = 500
+
+def _isoformat(value):
+    if isinstance(value, datetime):
+        return value.isoformat(timespec='seconds')
+    return value or datetime.now().isoformat(timespec='seconds')
+
+def _json_default(value):
+    # Skalar numpy (np.int64, np.bool_) dan datetime/Timestamp dari hasil analisis
+    if hasattr(value, 'item'):
+        return value.item()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+def buat_record_live(result):
+    """Record arsip dari keputusan mode live (hasil analisis_seri)"""
+    return {
+        'timestamp': _isoformat(result.get('timestamp')),
+        'source': 'live',
+        'symbol': result['symbol'],
+        'timeframe': result['timeframe'],
+        'action': result['action'],
+        'confidence': result['confidence'],
+        'price': result['price'],
+        'ai_action': result.get('ai_action'),
+        'ai_confidence': result.get('ai_confidence'),
+        'data': {key: value for key, value in result.items() if key not in ('timestamp', 'timings')}
+    }
+
+def buat_record_lengkap(symbol, timeframe, results):
+    """Record arsip dari hasil run_comprehensive_analysis (keputusan utama = saran AI)"""
+    ai_advice = results.get('ai_advice', {})
+    return {
+        'timestamp': _isoformat(None),
+        'source': 'comprehensive',
+        'symbol': symbol,
+        'timeframe': timeframe,
+        'action': ai_advice.get('action'),
+        'confidence': ai_advice.get('confidence'),
+        'price': results.get('technical_analysis', {}).get('current_price'),
+        'ai_action': ai_advice.get('action'),
+        'ai_confidence': ai_advice.get('confidence'),
+        'data': results
+    }
+
+def partition_path(archive_dir, symbol, date):
+    """Partisi per simbol dan tanggal: archive/<SIMBOL>/<YYYY-MM-DD>.jsonl"""
+    return os.path.join(archive_dir, symbol.upper(), f"{date}.jsonl")
+
+def index_path(archive_dir, symbol, date):
+    """Indeks satu partisi: archive/<SIMBOL>/<YYYY-MM-DD>.index.json"""
+    return os.path.join(archive_dir, symbol.upper(), f"{date}{INDEX_SUFFIX}")
+
+def _tulis_atomik(path, text):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+# ===== INDEKS =====
+
+def _entri_indeks(symbol, date):
+    return {'symbol': symbol, 'date': date, 'count': 0, 'actions': {}, 'timeframes': {}, 'sources': {},
+            'first': None, 'last': None}
+
+def _tambah_ke_indeks(entry, record):
+    entry['count'] += 1
+    for field, counts in (('action', entry['actions']), ('timeframe', entry['timeframes']), ('source', entry['sources'])):
+        value = record.get(field) or '-'
+        counts[value] = counts.get(value, 0) + 1
+    timestamp = record['timestamp']
+    entry['first'] = timestamp if entry['first'] is None else min(entry['first'], timestamp)
+    entry['last'] = timestamp if entry['last'] is None else max(entry['last'], timestamp)
+
+def _indeks_dari_partisi(archive_dir, symbol, date):
+    """Hitung entri indeks dari isi file partisi lalu simpan ke file indeksnya"""
+    entry = _entri_indeks(symbol, date)
+    path = partition_path(archive_dir, symbol, date)
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            for line in f:
+                if line.strip():
+                    _tambah_ke_indeks(entry, json.loads(line))
+        entry['bytes'] = os.path.getsize(path)
+        _tulis_atomik(index_path(archive_dir, symbol, date), json.dumps(entry))
+    return entry
+
+def muat_indeks_partisi(archive_dir, symbol, date):
+    """
+    Entri indeks satu partisi. Dibangun ulang dari data jika file indeksnya hilang, rusak,
+    atau ukuran file partisi tidak sama dengan yang tercatat (mis. proses berhenti di tengah flush).
+    """
+    path = index_path(archive_dir, symbol, date)
+    data_path = partition_path(archive_dir, symbol, date)
+    try:
+        with open(path, 'r') as f:
+            entry = json.load(f)
+        size = os.path.getsize(data_path) if os.path.exists(data_path) else 0
+        if entry.get('bytes') == size:
+            return entry
+    except (OSError, ValueError):
+        pass
+    return _indeks_dari_partisi(archive_dir, symbol, date)
+
+def _daftar_partisi(archive_dir):
+    if not os.path.isdir(archive_dir):
+        return
+    for symbol in sorted(os.listdir(archive_dir)):
+        symbol_dir = os.path.join(archive_dir, symbol)
+        if not os.path.isdir(symbol_dir):
+            continue
+        for filename in sorted(os.listdir(symbol_dir)):
+            if filename.endswith('.jsonl'):
+                yield symbol, filename[:-len('.jsonl')]
+
+def muat_indeks(archive_dir=ARCHIVE_DIR):
+    """Indeks semua partisi: 'SIMBOL/YYYY-MM-DD' -> jumlah record per aksi, timeframe dan sumber"""
+    index = {}
+    for symbol, date in _daftar_partisi(archive_dir):
+        try:
+            index[f"{symbol}/{date}"] = muat_indeks_partisi(archive_dir, symbol, date)
+        except (OSError, ValueError) as e:
+            logger.error(f"Indeks partisi {symbol}/{date} tidak bisa dibangun: {str(e)}")
+    return index
+
+def bangun_ulang_indeks(archive_dir=ARCHIVE_DIR):
+    """Bangun ulang indeks setiap partisi dari isi datanya"""
+    return {f"{symbol}/{date}": _indeks_dari_partisi(archive_dir, symbol, date)
+            for symbol, date in _daftar_partisi(archive_dir)}
+
+# ===== WRITER =====
+
+class ArchiveWriter:
+    """
+    Penulis arsip dengan batch: append() hanya memasukkan record ke antrean (tanpa I/O),
+    thread latar mengelompokkan record per partisi, menulis satu kali per file per flush
+    dan memperbarui secara atomik hanya indeks partisi yang berubah.
+    """
+
+    def __init__(self, archive_dir=ARCHIVE_DIR, flush_interval=FLUSH_INTERVAL, flush_records=FLUSH_RECORDS):
+        self.archive_dir = archive_dir
+        self.flush_interval = flush_interval
+        self.flush_records = flush_records
+        self._queue = queue.SimpleQueue()
+        # Entri indeks partisi yang pernah ditulis writer ini (dimuat saat pertama disentuh)
+        self._index = {}
+        self._stopped = threading.Event()
+        self.stats = {'records': 0, 'flushes': 0, 'errors': 0}
+        self._thread = threading.Thread(target=self._run, name='archive-writer', daemon=True)
+        self._thread.start()
+
+    def append(self, record):
+        self._queue.put(record)
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            timeout = max(0.0, deadline - time.monotonic())
+            try:
+                record = self._queue.get(timeout=timeout)
+                if record is None:
+                    break
+                batch.append(record)
+            except queue.Empty:
+                pass
+            if len(batch) >= self.flush_records or time.monotonic() >= deadline:
+                if batch:
+                    self._flush(batch)
+                    batch = []
+                deadline = time.monotonic() + self.flush_interval
+        # Sisa antrean saat close()
+        while True:
+            try:
+                record = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if record is not None:
+                batch.append(record)
+        if batch:
+            self._flush(batch)
+
+    def _flush(self, batch):
+        partitions = {}
+        for record in batch:
+            # Record yang tidak valid atau tidak bisa diserialisasi dilewati tanpa membuang sisa batch
+            try:
+                key = (record['symbol'].upper(), record['timestamp'][:10])
+                line = json.dumps(record, default=_json_default) + '\n'
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"Record arsip dilewati: {type(e).__name__}: {str(e)}")
+                continue
+            partitions.setdefault(key, []).append((record, line))
+
+        try:
+            for (symbol, date), items in partitions.items():
+                key = f"{symbol}/{date}"
+                path = partition_path(self.archive_dir, symbol, date)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                if key not in self._index:
+                    self._index[key] = muat_indeks_partisi(self.archive_dir, symbol, date)
+                entry = self._index[key]
+                with open(path, 'a') as f:
+                    f.write(''.join(line for _, line in items))
+                    f.flush()
+                    entry['bytes'] = f.tell()
+                for record, _ in items:
+                    _tambah_ke_indeks(entry, record)
+                _tulis_atomik(index_path(self.archive_dir, symbol, date), json.dumps(entry))
+                self.stats['records'] += len(items)
+            self.stats['flushes'] += 1
+        except Exception as e:
+            # Writer tetap hidup: error apa pun hanya dicatat agar antrean terus dikosongkan
+            self.stats['errors'] += 1
+            self._index.clear()
+            logger.error(f"Error menulis arsip hasil analisis: {type(e).__name__}: {str(e)}")
+
+    def close(self):
+        """Tulis semua record yang tersisa lalu hentikan thread writer"""
+        if not self._stopped.is_set():
+            self._stopped.set()
+            self._queue.put(None)
+            self._thread.join()
+
+# ===== QUERY =====
+
+def parse_waktu(value, now=None):
+    """'7d', '24h', '30m' (relatif terhadap sekarang) atau tanggal/waktu ISO"""
+    if value is None:
+        return None
+    now = now or datetime.now()
+    match = re.fullmatch(r'(\d+)([mhdw])', value.strip())
+    if match:
+        amount, unit = int(match.group(1)), match.group(2)
+        return now - timedelta(**{{'m': 'minutes', 'h': 'hours', 'd': 'days', 'w': 'weeks'}[unit]: amount})
+    return datetime.fromisoformat(value)
+
+def cari_arsip(archive_dir=ARCHIVE_DIR, symbol=None, timeframe=None, action=None, source=None,
+               start=None, end=None, limit=None):
+    """
+    Query arsip. Indeks dipakai untuk melewati partisi yang pasti tidak cocok (simbol, tanggal,
+    atau tidak punya aksi/timeframe/sumber yang dicari), baru partisi sisanya dibaca baris per baris.
+    Yields: record yang cocok, urut per partisi (simbol, tanggal)
+    """
+    index = muat_indeks(archive_dir)
+    start_text = start.isoformat(timespec='seconds') if start else None
+    end_text = end.isoformat(timespec='seconds') if end else None
+    symbol = symbol.upper() if symbol else None
+
+    found = 0
+    for key in sorted(index):
+        entry = index[key]
+        if symbol and entry['symbol'] != symbol:
+            continue
+        if start_text and entry['last'] < start_text or end_text and entry['first'] > end_text:
+            continue
+        if action and action not in entry['actions'] or timeframe and timeframe not in entry['timeframes']:
+            continue
+        if source and source not in entry['sources']:
+            continue
+
+        path = partition_path(archive_dir, entry['symbol'], entry['date'])
+        if not os.path.exists(path):
+            continue
+        with open(path, 'r') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if action and record.get('action') != action or timeframe and record.get('timeframe') != timeframe:
+                    continue
+                if source and record.get('source') != source:
+                    continue
+                if start_text and record['timestamp'] < start_text or end_text and record['timestamp'] > end_text:
+                    continue
+                yield record
+                found += 1
+                if limit and found >= limit:
+                    return
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query arsip hasil analisis TradingMetrics-AI")
+    parser.add_argument('--dir', default=ARCHIVE_DIR, help="Direktori arsip")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    query = subparsers.add_parser('query', help="Cari record, contoh: query --action STRONG_BUY --timeframe 1h --since 7d")
+    query.add_argument('--symbol')
+    query.add_argument('--timeframe')
+    query.add_argument('--action')
+    query.add_argument('--source', choices=['live', 'comprehensive'])
+    query.add_argument('--since', help="Mulai dari: 7d, 24h, 30m atau tanggal ISO")
+    query.add_argument('--until', help="Sampai: 7d, 24h, 30m atau tanggal ISO")
+    query.add_argument('--limit', type=int)
+    query.add_argument('--format', choices=['table', 'jsonl'], default='table')
+
+    subparsers.add_parser('reindex', help="Bangun ulang indeks semua partisi")
+    args = parser.parse_args(argv)
+
+    if args.command == 'reindex':
+        index = bangun_ulang_indeks(args.dir)
+        print(f"Indeks dibangun ulang: {len(index)} partisi, {sum(entry['count'] for entry in index.values()):,} record")
+        return
+
+    records = cari_arsip(args.dir, args.symbol, args.timeframe, args.action, args.source,
+                         parse_waktu(args.since), parse_waktu(args.until), args.limit)
+    if args.format == 'jsonl':
+        for record in records:
+            print(json.dumps(record))
+        return
+
+    rows = [[record['timestamp'], f"{record['symbol']}/USDT", record['timeframe'], record['source'],
+             record['action'], f"{record['confidence']:.1f}%" if record['confidence'] is not None else '-',
+             record['price'], record.get('ai_action') or '-'] for record in records]
+    print(tabulate(rows, headers=["Waktu", "Coin", "Timeframe", "Sumber", "Aksi", "Keyakinan", "Harga", "Aksi AI"],
+                   tablefmt="grid"))
+    print(f"{len(rows)} record")
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s: %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    main()
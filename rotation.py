@@ -0,0 +1,156 @@
+# rotation.py
+
+import logging
+import math
+import numpy as np
+from tabulate import tabulate
+
+from bar_aggregator import timeframe_ms
+from market_data import DEFAULT_REQUESTS_PER_MINUTE, PRICE_IDS_PER_REQUEST
+
+logger = logging.getLogger(__name__)
+
+# Porsi budget maksimum untuk tick harga jika budget tidak cukup untuk interval yang diminta
+MAX_TICK_SHARE = 0.5
+
+def _water_filling(weights, caps, total):
+    """
+    Bagi total rate ke setiap seri sebanding akar bobotnya, dengan batas atas caps.
+    Seri yang melewati batas dikunci di batasnya dan sisa rate dibagi ulang ke seri lain.
+    Alokasi akar bobot meminimalkan sum(bobot * periode) dengan sum(rate) = total.
+    """
+    rates = np.zeros(len(weights))
+    fixed = np.zeros(len(weights), dtype=bool)
+    sqrt_weights = np.sqrt(weights)
+    while True:
+        free = ~fixed
+        if not free.any():
+            break
+        remaining = total - caps[fixed].sum()
+        rates[free] = max(remaining, 0.0) * sqrt_weights[free] / sqrt_weights[free].sum()
+        over = free & (rates > caps)
+        if not over.any():
+            break
+        fixed |= over
+        rates[over] = caps[over]
+    return rates
+
+def _pakai_sisa_budget(every, periods, weights, total):
+    """
+    Pembulatan ke atas menyisakan budget; pakai sisanya secara greedy untuk menurunkan `every`
+    pada seri dengan penurunan staleness berbobot terbesar per rate tambahan.
+    """
+    every = every.copy()
+    finite = np.isfinite(every)
+    while True:
+        used = (1.0 / (every[finite] * periods[finite])).sum()
+        candidates = finite & (every > 1)
+        if not candidates.any():
+            break
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cost = 1.0 / ((every - 1) * periods) - 1.0 / (every * periods)
+            gain = weights * periods / 2
+        fits = candidates & (cost <= total - used + 1e-12)
+        if not fits.any():
+            break
+        best = np.argmax(np.where(fits, gain / cost, -np.inf))
+        every[best] -= 1
+    return every
+
+def rencanakan_rotasi(series, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE, tick_interval=60, priorities=None):
+    """
+    Rencana rotasi sinkronisasi histori untuk watchlist besar dalam batas request per menit.
+
+    - Tick harga semua simbol memakai request batch (PRICE_IDS_PER_REQUEST id per request) setiap tick_interval;
+      jika itu memakan lebih dari MAX_TICK_SHARE budget, tick_interval diperpanjang
+    - Sisa budget dibagi ke seri (simbol, timeframe) untuk sinkronisasi histori. Idealnya setiap seri
+      disinkronkan di setiap penutupan candle; jika budget tidak cukup, rate dibagi sebanding
+      akar(prioritas / panjang candle) lalu periode dibulatkan ke atas menjadi kelipatan candle
+    - Staleness diukur dari umur histori: rata-rata setengah periode sinkronisasi, maksimum satu periode
+
+    series: list of (simbol, timeframe)
+    priorities: dict simbol -> prioritas (default 1.0)
+    Returns: dict rencana dengan 'tick_interval', pemakaian budget dan 'series' {key: detail}
+    """
+    priorities = priorities or {}
+    series = list(dict.fromkeys(series))
+    symbols = {symbol for symbol, _ in series}
+
+    tick_requests = math.ceil(len(symbols) / PRICE_IDS_PER_REQUEST)
+    tick_interval = float(tick_interval)
+    if tick_requests and tick_requests * 60.0 / tick_interval > requests_per_minute * MAX_TICK_SHARE:
+        tick_interval = tick_requests * 60.0 / (requests_per_minute * MAX_TICK_SHARE)
+    tick_rpm = tick_requests * 60.0 / tick_interval if tick_requests else 0.0
+
+    plan = {
+        'budget_rpm': float(requests_per_minute),
+        'tick_interval': tick_interval,
+        'tick_rpm': tick_rpm,
+        'sync_rpm': 0.0,
+        'full_coverage': True,
+        'series': {}
+    }
+    if not series:
+        return plan
+
+    periods = np.array([timeframe_ms(timeframe) / 1000.0 for _, timeframe in series])
+    priority = np.array([float(priorities.get(symbol, 1.0)) for symbol, _ in series])
+    priority = np.clip(priority, 1e-6, None)
+
+    # Rate maksimum yang berguna: satu sinkronisasi per penutupan candle
+    caps = 1.0 / periods
+    budget = (requests_per_minute - tick_rpm) / 60.0
+    rates = _water_filling(priority / periods, caps, budget)
+
+    # Sinkronisasi disejajarkan dengan penutupan candle: setiap `every` candle sekali
+    with np.errstate(divide='ignore'):
+        every = np.where(rates > 0, np.ceil(caps / rates - 1e-9), np.inf)
+    every = _pakai_sisa_budget(every, periods, priority / periods, budget)
+    sync_periods = every * periods
+
+    plan['full_coverage'] = bool((every == 1).all())
+    plan['sync_rpm'] = float((60.0 / sync_periods[np.isfinite(sync_periods)]).sum())
+    for i, key in enumerate(series):
+        finite = np.isfinite(every[i])
+        plan['series'][key] = {
+            'priority': float(priority[i]),
+            'every': int(every[i]) if finite else None,
+            'period': float(sync_periods[i]) if finite else None,
+            'rpm': float(60.0 / sync_periods[i]) if finite else 0.0,
+            'expected_staleness': float(sync_periods[i] / 2) if finite else None,
+            'max_staleness': float(sync_periods[i]) if finite else None
+        }
+    return plan
+
+def _format_durasi(seconds):
+    if seconds is None:
+        return '-'
+    if seconds < 3600:
+        return f"{seconds / 60:.0f}m"
+    return f"{seconds / 3600:.1f}j"
+
+def laporan_rotasi(plan):
+    """Laporan teks rencana rotasi: pemakaian budget dan staleness per seri"""
+    rows = []
+    for (symbol, timeframe), detail in sorted(plan['series'].items(),
+                                              key=lambda item: -(item[1]['expected_staleness'] or float('inf'))):
+        rows.append([
+            f"{symbol}/USDT",
+            timeframe,
+            f"{detail['priority']:g}",
+            f"setiap {detail['every']} candle" if detail['every'] else '-',
+            f"{detail['rpm']:.2f}",
+            _format_durasi(detail['expected_staleness']),
+            _format_durasi(detail['max_staleness'])
+        ])
+
+    lines = [
+        f"Budget: {plan['budget_rpm']:.0f} request/menit | Tick harga: {plan['tick_rpm']:.2f} rpm "
+        f"(setiap {plan['tick_interval']:.0f} detik) | Sinkronisasi histori: {plan['sync_rpm']:.2f} rpm",
+        "Semua seri disinkronkan di setiap penutupan candle" if plan['full_coverage']
+        else "Budget tidak cukup untuk sinkronisasi di setiap candle; seri dirotasi berdasarkan prioritas"
+    ]
+    if rows:
+        lines.append(tabulate(rows, headers=["Coin", "Timeframe", "Prioritas", "Sinkronisasi", "RPM",
+                                             "Staleness Rata-rata", "Staleness Maks"], tablefmt="grid"))
+    return '\n'.join(lines)
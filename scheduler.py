@@ -0,0 +1,155 @@
+# scheduler.py
+
+import heapq
+import itertools
+import logging
+import random
+import time
+
+from bar_aggregator import timeframe_ms
+
+logger = logging.getLogger(__name__)
+
+def next_candle_close(timeframe, now):
+    """Waktu (epoch detik) penutupan candle berikutnya untuk timeframe tertentu"""
+    period = timeframe_ms(timeframe) / 1000.0
+    return (int(now // period) + 1) * period
+
+class LiveScheduler:
+    """
+    Priority queue job (simbol, timeframe) untuk mode live.
+    Setiap job jatuh tempo sesaat setelah candle-nya ditutup (+ settle_delay + jitter acak),
+    sehingga sinkronisasi histori mengikuti kapan data benar-benar berubah, bukan detak jam tetap.
+
+    Rotasi: set_every() membuat job hanya disinkronkan setiap N penutupan candle
+    (dipakai rencana rotasi saat budget request tidak cukup).
+
+    Backpressure:
+    - pop_due() membatasi jumlah job per langkah (max_jobs_per_step, dan limit dari budget request);
+      sisanya menunggu langkah berikutnya
+    - complete() menjadwalkan ulang dari waktu selesai, jadi candle yang terlewat saat siklus
+      overrun digabung menjadi satu sinkronisasi, bukan menumpuk
+
+    Kegagalan: retry() mengembalikan job ke antrean dengan backoff eksponensial pendek
+    (retry_base, 2x per kegagalan, maks retry_max), bukan menunggu penutupan candle berikutnya.
+    """
+
+    def __init__(self, settle_delay=10.0, jitter=5.0, max_jobs_per_step=10, retry_base=15.0, retry_max=300.0):
+        self.settle_delay = settle_delay
+        self.jitter = jitter
+        self.max_jobs_per_step = max_jobs_per_step
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self._heap = []
+        self._due = {}
+        self._seq = itertools.count()
+        self._popped = {}
+        self._every = {}
+        self._failures = {}
+        self.stats = {'runs': 0, 'deferred': 0, 'skipped_closes': 0, 'max_lag': 0.0, 'retries': 0}
+
+    def _push(self, key, due):
+        self._due[key] = due
+        # Timeframe yang lebih pendek didahulukan jika jatuh tempo bersamaan
+        heapq.heappush(self._heap, (due, timeframe_ms(key[1]), next(self._seq), key))
+
+    def due_time(self, timeframe, now, every=1):
+        """Waktu jatuh tempo berikutnya: penutupan candle ke-`every` + settle_delay + jitter"""
+        period = timeframe_ms(timeframe) / 1000.0
+        return next_candle_close(timeframe, now + (every - 1) * period) + self.settle_delay + random.uniform(0, self.jitter)
+
+    def set_every(self, symbol, timeframe, every):
+        """Atur job agar disinkronkan setiap `every` penutupan candle (berlaku mulai penjadwalan berikutnya)"""
+        self._every[(symbol, timeframe)] = max(1, int(every))
+
+    def add(self, symbol, timeframe, now=None, immediate=True):
+        """Tambahkan job; immediate=True berarti sinkronisasi pertama langsung jatuh tempo"""
+        key = (symbol, timeframe)
+        if key in self._due:
+            return
+        now = time.time() if now is None else now
+        self._push(key, now if immediate else self.due_time(timeframe, now, self._every.get(key, 1)))
+
+    def remove(self, symbol, timeframe):
+        """Hapus job (entri di heap dibuang secara lazy)"""
+        self._due.pop((symbol, timeframe), None)
+        self._every.pop((symbol, timeframe), None)
+        self._failures.pop((symbol, timeframe), None)
+        self._popped.pop((symbol, timeframe), None)
+
+    def keys(self):
+        return set(self._due)
+
+    def _clean_top(self):
+        # Buang entri heap yang sudah dihapus atau dijadwalkan ulang
+        while self._heap:
+            due, _, _, key = self._heap[0]
+            if self._due.get(key) == due:
+                return
+            heapq.heappop(self._heap)
+
+    def next_due(self):
+        """Waktu jatuh tempo job terdekat, atau None jika tidak ada job"""
+        self._clean_top()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now=None, limit=None):
+        """
+        Ambil job yang sudah jatuh tempo, maksimal max_jobs_per_step
+        limit: batas tambahan untuk langkah ini, misalnya sisa token budget request
+        """
+        now = time.time() if now is None else now
+        cap = self.max_jobs_per_step or None
+        if limit is not None:
+            cap = limit if cap is None else min(cap, limit)
+        jobs = []
+        while True:
+            self._clean_top()
+            if not self._heap or self._heap[0][0] > now:
+                break
+            if cap is not None and len(jobs) >= cap:
+                self.stats['deferred'] += 1
+                break
+            due, _, _, key = heapq.heappop(self._heap)
+            # Job tetap terdaftar (tanpa entri heap) sampai complete() dipanggil
+            self._due[key] = None
+            self._popped[key] = due
+            self.stats['max_lag'] = max(self.stats['max_lag'], now - due)
+            jobs.append(key)
+        return jobs
+
+    def complete(self, key, finished_at=None):
+        """Jadwalkan ulang job ke penutupan candle berikutnya setelah job selesai"""
+        if key not in self._due:
+            return
+        finished_at = time.time() if finished_at is None else finished_at
+        due = self.due_time(key[1], finished_at, self._every.get(key, 1))
+
+        # Candle yang ditutup selama job terlambat/berjalan digabung ke sinkronisasi ini
+        popped_due = self._popped.pop(key, finished_at)
+        period = timeframe_ms(key[1]) / 1000.0
+        self.stats['skipped_closes'] += max(0, int((finished_at - popped_due) // period))
+
+        self.stats['runs'] += 1
+        self._failures.pop(key, None)
+        self._push(key, due)
+
+    def retry(self, key, delay=None, now=None):
+        """
+        Jadwalkan ulang job yang gagal setelah delay detik.
+        delay=None: backoff eksponensial retry_base * 2^(kegagalan beruntun - 1), maksimal retry_max,
+        dan tidak lebih lambat dari jadwal normal (penutupan candle berikutnya).
+        Returns: delay yang dipakai
+        """
+        if key not in self._due:
+            return None
+        now = time.time() if now is None else now
+        failures = self._failures[key] = self._failures.get(key, 0) + 1
+        if delay is None:
+            delay = min(self.retry_max, self.retry_base * 2 ** (failures - 1))
+        due = min(now + delay, self.due_time(key[1], now, self._every.get(key, 1)))
+
+        self._popped.pop(key, None)
+        self.stats['retries'] += 1
+        self._push(key, due)
+        return due - now
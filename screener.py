@@ -0,0 +1,239 @@
+# screener.py
+
+import argparse
+import logging
+import time
+import numpy as np
+import pandas as pd
+from pycoingecko import CoinGeckoAPI
+from termcolor import colored
+from tabulate import tabulate
+
+from analysis import analyze_indicators
+from decision import make_decision
+from market_data import ambil_data_crypto
+
+# Fitur AI bersifat opsional, sama seperti di main.py
+try:
+    from intelligence_integration import run_comprehensive_analysis
+    AI_FEATURES_AVAILABLE = True
+except ImportError:
+    AI_FEATURES_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Jumlah maksimum koin per halaman endpoint /coins/markets
+MARKETS_PAGE_SIZE = 250
+
+def ambil_snapshot_pasar(jumlah=500):
+    """
+    Ambil snapshot pasar untuk banyak koin sekaligus (250 koin per request).
+    Returns: DataFrame dengan satu baris per koin
+    """
+    cg = CoinGeckoAPI()
+    pages = []
+    for page in range(1, (jumlah - 1) // MARKETS_PAGE_SIZE + 2):
+        data = cg.get_coins_markets(
+            vs_currency='usd',
+            order='market_cap_desc',
+            per_page=MARKETS_PAGE_SIZE,
+            page=page,
+            price_change_percentage='1h,24h,7d'
+        )
+        if not data:
+            break
+        pages.extend(data)
+
+    columns = {
+        'id': 'id',
+        'symbol': 'symbol',
+        'current_price': 'price',
+        'total_volume': 'volume',
+        'market_cap': 'market_cap',
+        'high_24h': 'high_24h',
+        'low_24h': 'low_24h',
+        'price_change_percentage_1h_in_currency': 'change_1h',
+        'price_change_percentage_24h_in_currency': 'change_24h',
+        'price_change_percentage_7d_in_currency': 'change_7d'
+    }
+    snapshot = pd.DataFrame(pages[:jumlah]).reindex(columns=list(columns)).rename(columns=columns)
+    snapshot['symbol'] = snapshot['symbol'].str.upper()
+    return snapshot
+
+def prefilter(snapshot, top_k=10, volatility_band=(2.0, 25.0), min_volume_ratio=1.0, min_volume_usd=1000000):
+    """
+    Prefilter murah untuk seluruh universe sekaligus (vectorized, tanpa loop per koin).
+    - Momentum: gabungan perubahan harga 1 jam, 24 jam dan 7 hari
+    - Volume ratio: turnover (volume/market cap) dibanding median universe
+    - Volatilitas: range 24 jam terhadap harga, harus berada di dalam volatility_band
+    Returns: DataFrame finalis (top_k) diurutkan berdasarkan skor
+    """
+    price = snapshot['price'].to_numpy(dtype=np.float64)
+    volume = snapshot['volume'].to_numpy(dtype=np.float64)
+    market_cap = snapshot['market_cap'].to_numpy(dtype=np.float64)
+    high = snapshot['high_24h'].to_numpy(dtype=np.float64)
+    low = snapshot['low_24h'].to_numpy(dtype=np.float64)
+    change_1h = np.nan_to_num(snapshot['change_1h'].to_numpy(dtype=np.float64))
+    change_24h = np.nan_to_num(snapshot['change_24h'].to_numpy(dtype=np.float64))
+    change_7d = np.nan_to_num(snapshot['change_7d'].to_numpy(dtype=np.float64))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        momentum = change_1h * 0.4 + change_24h * 0.4 + change_7d * 0.2
+        turnover = volume / market_cap
+        volume_ratio = turnover / np.nanmedian(turnover[np.isfinite(turnover)])
+        volatility = (high - low) / price * 100
+
+    mask = (
+        np.isfinite(volume_ratio) & np.isfinite(volatility) &
+        (volatility >= volatility_band[0]) & (volatility <= volatility_band[1]) &
+        (volume_ratio >= min_volume_ratio) &
+        (volume >= min_volume_usd)
+    )
+
+    # Skor: z-score momentum absolut (peluang beli maupun jual) + z-score log volume ratio
+    def zscore(values):
+        std = values.std()
+        return (values - values.mean()) / std if std > 0 else np.zeros_like(values)
+
+    score = np.full(len(snapshot), -np.inf)
+    if mask.any():
+        score[mask] = zscore(np.abs(momentum[mask])) + zscore(np.log(volume_ratio[mask]))
+
+    result = snapshot.assign(momentum=momentum, volume_ratio=volume_ratio, volatility=volatility, score=score)
+    order = np.argsort(-score, kind='stable')[:min(top_k, int(mask.sum()))]
+    return result.iloc[order].reset_index(drop=True)
+
+# Kolom skor yang bisa dipakai untuk mengurutkan hasil screener
+SORT_KEYS = ('confidence', 'ai_confidence', 'score')
+
+def analisis_finalis(finalists, timeframe='1h', with_ai=True):
+    """
+    Analisis lengkap (indikator + keputusan, dan AI jika tersedia) untuk setiap finalis.
+    Kegagalan satu finalis dicatat di kolom 'error' tanpa menghentikan finalis lain.
+    """
+    results = []
+    for row in finalists.itertuples(index=False):
+        start_time = time.time()
+        result = {
+            'symbol': row.symbol,
+            'price': None,
+            'momentum': row.momentum,
+            'volume_ratio': row.volume_ratio,
+            'volatility': row.volatility,
+            'score': row.score,
+            'action': None,
+            'confidence': None,
+            'ai_action': None,
+            'ai_confidence': None,
+            'error': None
+        }
+        try:
+            df = ambil_data_crypto(row.symbol, timeframe, coin_id=row.id)
+            if df is None:
+                raise ValueError("Gagal mengambil data")
+
+            analisis = analyze_indicators(df)
+            keputusan = make_decision(analisis, df)
+            result.update(price=analisis['current_price'], action=keputusan['action'], confidence=keputusan['confidence'])
+
+            if with_ai and AI_FEATURES_AVAILABLE:
+                ai_advice = run_comprehensive_analysis(df, row.symbol, timeframe).get('ai_advice', {})
+                if 'error' in ai_advice:
+                    result['error'] = f"AI: {ai_advice['error']}"
+                else:
+                    result['ai_action'] = ai_advice.get('action')
+                    result['ai_confidence'] = ai_advice.get('confidence')
+        except Exception as e:
+            logger.error(f"Error menganalisis finalis {row.symbol}: {str(e)}")
+            result['error'] = str(e)
+
+        result['elapsed'] = time.time() - start_time
+        results.append(result)
+    return results
+
+def urutkan_hasil(results, sort_by='confidence'):
+    """Urutkan hasil berdasarkan satu kolom skor (tertinggi dulu); hasil tanpa nilai skor di akhir"""
+    if sort_by not in SORT_KEYS:
+        raise ValueError(f"Kolom urutan tidak dikenal: {sort_by}")
+    return sorted(results, key=lambda r: (r[sort_by] is None, -(r[sort_by] or 0)))
+
+def jalankan_screener(universe=500, top_k=10, timeframe='1h', with_ai=True,
+                      volatility_band=(2.0, 25.0), min_volume_ratio=1.0):
+    """
+    Screener dua tahap: snapshot + prefilter murah untuk seluruh universe,
+    lalu analisis mendalam hanya untuk top_k finalis.
+    Returns: dict dengan finalis, hasil analisis dan waktu setiap tahap
+    """
+    timings = {}
+
+    start_time = time.time()
+    snapshot = ambil_snapshot_pasar(universe)
+    timings['snapshot'] = time.time() - start_time
+
+    start_time = time.time()
+    finalists = prefilter(snapshot, top_k, volatility_band, min_volume_ratio)
+    timings['prefilter'] = time.time() - start_time
+
+    start_time = time.time()
+    results = analisis_finalis(finalists, timeframe, with_ai)
+    timings['deep_analysis'] = time.time() - start_time
+
+    failed = sum(1 for r in results if r['error'])
+    logger.info(f"Screener: {len(snapshot)} koin -> {len(finalists)} finalis -> {len(results)} dianalisis ({failed} dengan error)")
+
+    return {
+        'universe_size': len(snapshot),
+        'finalists': finalists,
+        'results': results,
+        'timings': timings
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Screener dua tahap untuk ratusan koin")
+    parser.add_argument('--universe', type=int, default=500, help="Jumlah koin teratas (market cap) yang discan")
+    parser.add_argument('--top', type=int, default=10, help="Jumlah finalis untuk analisis mendalam")
+    parser.add_argument('--timeframe', default='1h', choices=['15m', '30m', '1h', '4h'])
+    parser.add_argument('--min-volatility', type=float, default=2.0, help="Batas bawah range 24 jam (%%)")
+    parser.add_argument('--max-volatility', type=float, default=25.0, help="Batas atas range 24 jam (%%)")
+    parser.add_argument('--min-volume-ratio', type=float, default=1.0, help="Minimum turnover relatif terhadap median")
+    parser.add_argument('--no-ai', action='store_true', help="Lewati analisis AI untuk finalis")
+    parser.add_argument('--sort-by', choices=SORT_KEYS, default='confidence',
+                        help="Urutkan hasil: confidence (keyakinan teknikal), ai_confidence atau score (skor prefilter)")
+    args = parser.parse_args(argv)
+
+    hasil = jalankan_screener(
+        args.universe, args.top, args.timeframe, not args.no_ai,
+        (args.min_volatility, args.max_volatility), args.min_volume_ratio
+    )
+
+    headers = ["Coin", "Harga", "Momentum", "Vol Ratio", "Volatilitas", "Aksi", "Keyakinan", "Aksi AI", "Keyakinan AI",
+               "Waktu", "Error"]
+    rows = []
+    for r in urutkan_hasil(hasil['results'], args.sort_by):
+        rows.append([
+            f"{r['symbol']}/USDT",
+            f"${r['price']:.4f}" if r['price'] is not None else '-',
+            f"{r['momentum']:+.2f}%",
+            f"{r['volume_ratio']:.2f}x",
+            f"{r['volatility']:.2f}%",
+            r['action'] or '-',
+            f"{r['confidence']:.1f}%" if r['confidence'] is not None else '-',
+            r['ai_action'] or '-',
+            f"{r['ai_confidence']:.1f}%" if r['ai_confidence'] is not None else '-',
+            f"{r['elapsed']:.2f}s",
+            r['error'] or '-'
+        ])
+
+    print(colored(f"\n=== SCREENER ({hasil['universe_size']} koin, timeframe {args.timeframe}) ===", 'cyan', attrs=['bold']))
+    print(tabulate(rows, headers=headers, tablefmt="grid"))
+    timings = hasil['timings']
+    print(colored(f"Snapshot: {timings['snapshot']:.2f}s | Prefilter: {timings['prefilter'] * 1000:.2f}ms | "
+                  f"Analisis mendalam: {timings['deep_analysis']:.2f}s", 'yellow'))
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s: %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    main()
@@ -0,0 +1,81 @@
+# singleflight.py
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+
+from metrics import SINGLEFLIGHT_CALLS, SINGLEFLIGHT_SAVED_SECONDS
+
+logger = logging.getLogger(__name__)
+
+class SingleFlight:
+    """
+    Penggabungan permintaan identik yang berjalan bersamaan: pemanggil pertama untuk suatu kunci
+    menghitung hasilnya, pemanggil lain dengan kunci sama menunggu future yang sama.
+    Tidak ada cache: setelah selesai kunci dilepas, permintaan berikutnya dihitung ulang.
+
+    freeze/thaw: hasil dibekukan sekali di thread leader (hanya jika ada yang menumpang) lalu
+    setiap pemanggil yang menumpang mencairkan salinannya sendiri, sehingga tidak ada yang
+    berbagi objek yang bisa diubah. None = objek yang sama dibagikan.
+    """
+
+    def __init__(self, name, freeze=None, thaw=None):
+        self.name = name
+        self.freeze = freeze
+        self.thaw = thaw
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._stats = {'leaders': 0, 'shared': 0, 'saved_seconds': 0.0}
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Jalankan fn(*args, **kwargs) sekali per kunci yang sedang berjalan.
+        Returns: (hasil, shared) - shared True jika hasil diambil dari pemanggil lain
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+                call.followers = 0
+                self._stats['leaders'] += 1
+            else:
+                call.followers += 1
+                self._stats['shared'] += 1
+
+        if not leader:
+            SINGLEFLIGHT_CALLS.inc(flight=self.name, role='shared')
+            frozen = call.result()
+            return (self.thaw(frozen) if self.thaw is not None and frozen is not None else frozen), True
+
+        SINGLEFLIGHT_CALLS.inc(flight=self.name, role='leader')
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._selesai(key, call, start)
+            call.set_exception(e)
+            raise
+        # Setelah kunci dilepas tidak ada pemanggil baru yang bisa menumpang, jumlah follower sudah final
+        if self._selesai(key, call, start):
+            call.set_result(self.freeze(result) if self.freeze is not None and result is not None else result)
+        return result, False
+
+    def _selesai(self, key, call, start):
+        with self._lock:
+            del self._calls[key]
+            followers = call.followers
+            saved = (time.perf_counter() - start) * followers
+            self._stats['saved_seconds'] += saved
+        if followers:
+            SINGLEFLIGHT_SAVED_SECONDS.inc(saved, flight=self.name)
+            logger.debug(f"Single-flight {self.name}: {followers} permintaan menumpang {key!r}")
+        return followers
+
+    def stats(self):
+        """Statistik: leaders (dihitung), shared (menumpang), saved_seconds (perkiraan waktu kerja yang dihemat)"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = len(self._calls)
+        return stats
@@ -0,0 +1,196 @@
+# tradingmetrics.py
+
+import argparse
+import json
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from tabulate import tabulate
+
+from market_data import ambil_data_crypto, COIN_MAP, DAYS_MAP, DEFAULT_REQUESTS_PER_MINUTE, RateLimiter
+from analysis_pool import analisis_seri, AI_FEATURES_AVAILABLE
+from json_utils import nilai_json
+from log_setup import setup_logging
+from result_archive import ArchiveWriter, buat_record_live, buat_record_lengkap
+
+if AI_FEATURES_AVAILABLE:
+    from intelligence_integration import run_comprehensive_analysis_batch
+
+logger = logging.getLogger(__name__)
+
+# Kolom ringkasan mode quick (indikator + keputusan, tanpa AI)
+QUICK_COLUMNS = ['symbol', 'timeframe', 'price', 'action', 'confidence', 'volatility', 'total_buy', 'total_sell',
+                 'price_change_24h', 'fetch_time', 'analysis_time', 'total_time', 'error']
+
+TIMING_COLUMNS = ('fetch_time', 'analysis_time', 'total_time')
+
+def _daftar(value):
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+def analisis_quick(symbols, timeframes, jobs, limiter):
+    """
+    Mode quick: ambil histori dan jalankan analisis_seri (indikator, keputusan, level risiko)
+    untuk setiap pasangan di thread pool; request jaringan dibatasi budget limiter bersama,
+    analisis pasangan lain berjalan selama menunggu.
+    Returns: (DataFrame ringkasan, dict (simbol, timeframe) -> hasil lengkap)
+    """
+    def analisis_pasangan(symbol, timeframe):
+        start_time = time.time()
+        df = ambil_data_crypto(symbol, timeframe, limiter=limiter)
+        fetch_time = time.time() - start_time
+        if df is None:
+            return {'symbol': symbol, 'timeframe': timeframe, 'error': 'Gagal mengambil data',
+                    'fetch_time': fetch_time, 'total_time': fetch_time}, None
+        analysis_start = time.time()
+        result = analisis_seri(df, symbol, timeframe)
+        row = {column: result.get(column) for column in QUICK_COLUMNS if column in result}
+        row.update(fetch_time=fetch_time, analysis_time=time.time() - analysis_start, total_time=time.time() - start_time)
+        return row, result
+
+    pairs = [(symbol, timeframe) for symbol in dict.fromkeys(symbols) for timeframe in dict.fromkeys(timeframes)]
+    rows, results = [], {}
+    with ThreadPoolExecutor(max_workers=max(1, jobs), thread_name_prefix='cli-analyze') as executor:
+        futures = {executor.submit(analisis_pasangan, symbol, timeframe): (symbol, timeframe) for symbol, timeframe in pairs}
+        for future in as_completed(futures):
+            symbol, timeframe = futures[future]
+            try:
+                row, result = future.result()
+            except Exception as e:
+                logger.error(f"Error menganalisis {symbol} {timeframe}: {str(e)}")
+                row, result = {'symbol': symbol, 'timeframe': timeframe, 'error': str(e)}, None
+            rows.append(row)
+            if result is not None:
+                results[(symbol, timeframe)] = result
+
+    table = pd.DataFrame(rows, columns=QUICK_COLUMNS)
+    table = table.sort_values(['confidence', 'symbol', 'timeframe'], ascending=[False, True, True],
+                              na_position='last', kind='stable').reset_index(drop=True)
+    return table, results
+
+def analisis_full(symbols, timeframes, jobs, account_balance, risk_percent, limiter):
+    """Mode full: run_comprehensive_analysis_batch; hasil lengkap per pasangan ditangkap lewat on_result"""
+    results = {}
+
+    def simpan(symbol, timeframe, analysis_results):
+        results[(symbol, timeframe)] = analysis_results
+
+    table = run_comprehensive_analysis_batch(symbols, timeframes, account_balance, risk_percent,
+                                             workers=jobs, on_result=simpan, limiter=limiter)
+    return table, results
+
+def statistik_waktu(table, wall_time):
+    """Ringkasan waktu per pasangan (rata-rata, p50, p95, maks) dan throughput keseluruhan"""
+    stats = {
+        'pairs': len(table),
+        'failed': int(table['error'].notna().sum()),
+        'wall_time': wall_time,
+        'pairs_per_second': len(table) / wall_time if wall_time > 0 else 0.0
+    }
+    for column in TIMING_COLUMNS:
+        values = table[column].dropna().to_numpy(dtype=np.float64)
+        if len(values):
+            stats[column] = {
+                'mean': float(values.mean()),
+                'p50': float(np.percentile(values, 50)),
+                'p95': float(np.percentile(values, 95)),
+                'max': float(values.max())
+            }
+    return stats
+
+def tulis_output(table, results, stats, fmt, mode, stream):
+    records = nilai_json(table.astype(object).where(table.notna(), None).to_dict('records'))
+    if fmt in ('json', 'jsonl'):
+        for record in records:
+            result = results.get((record['symbol'], record['timeframe']))
+            if result is not None:
+                record['result'] = nilai_json({key: value for key, value in result.items() if key != 'timings'})
+    if fmt == 'json':
+        json.dump({'generated_at': datetime.now().isoformat(timespec='seconds'), 'mode': mode,
+                   'results': records, 'timing': stats}, stream, indent=2)
+        stream.write('\n')
+    elif fmt == 'jsonl':
+        for record in records:
+            stream.write(json.dumps(record) + '\n')
+    elif fmt == 'csv':
+        table.to_csv(stream, index=False)
+    else:
+        stream.write(tabulate(table.fillna('-'), headers='keys', tablefmt='grid', showindex=False, floatfmt='.4g') + '\n')
+
+def tampilkan_statistik(stats, stream=sys.stderr):
+    rows = [[column, f"{item['mean']:.3f}", f"{item['p50']:.3f}", f"{item['p95']:.3f}", f"{item['max']:.3f}"]
+            for column, item in ((column, stats.get(column)) for column in TIMING_COLUMNS) if item]
+    stream.write(tabulate(rows, headers=['Waktu (detik)', 'Rata-rata', 'p50', 'p95', 'Maks'], tablefmt='simple') + '\n')
+    stream.write(f"{stats['pairs']} pasangan ({stats['failed']} gagal) dalam {stats['wall_time']:.2f} detik, "
+                 f"{stats['pairs_per_second']:.2f} pasangan/detik\n")
+
+def perintah_analyze(args):
+    symbols = [symbol.upper() for symbol in _daftar(args.symbols)] if args.symbols else list(COIN_MAP)
+    timeframes = _daftar(args.timeframes)
+    unknown = [symbol for symbol in symbols if symbol not in COIN_MAP]
+    invalid = [timeframe for timeframe in timeframes if timeframe not in DAYS_MAP]
+    if unknown or invalid or not timeframes:
+        sys.stderr.write(f"Simbol tidak dikenal: {', '.join(unknown) or '-'}; "
+                         f"timeframe tidak didukung: {', '.join(invalid) or '-'} (pilihan: {', '.join(DAYS_MAP)})\n")
+        return 2
+    if args.rpm <= 0:
+        sys.stderr.write("--rpm harus lebih dari 0\n")
+        return 2
+    if args.mode == 'full' and not AI_FEATURES_AVAILABLE:
+        sys.stderr.write("Mode full membutuhkan modul kecerdasan buatan\n")
+        return 2
+
+    limiter = RateLimiter(args.rpm)
+    start_time = time.time()
+    if args.mode == 'full':
+        table, results = analisis_full(symbols, timeframes, args.jobs, args.balance, args.risk, limiter)
+    else:
+        table, results = analisis_quick(symbols, timeframes, args.jobs, limiter)
+    stats = statistik_waktu(table, time.time() - start_time)
+
+    if args.archive:
+        writer = ArchiveWriter(args.archive)
+        for (symbol, timeframe), result in results.items():
+            writer.append(buat_record_lengkap(symbol, timeframe, result) if args.mode == 'full' else buat_record_live(result))
+        writer.close()
+
+    if args.output:
+        with open(args.output, 'w', newline='') as stream:
+            tulis_output(table, results, stats, args.format, args.mode, stream)
+    else:
+        tulis_output(table, results, stats, args.format, args.mode, sys.stdout)
+    if not args.quiet:
+        tampilkan_statistik(stats)
+    return 1 if stats['failed'] else 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='tradingmetrics', description="TradingMetrics-AI tanpa menu interaktif")
+    parser.add_argument('--log-level', default='WARNING', help="Level log ke stderr (default WARNING)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    analyze = subparsers.add_parser('analyze', help="Analisis banyak simbol dan timeframe secara bersamaan")
+    analyze.add_argument('--symbols', help="Contoh: BTC,ETH,SOL (default: semua simbol yang didukung)")
+    analyze.add_argument('--timeframes', default='1h', help="Contoh: 15m,1h (pilihan: 15m, 30m, 1h, 4h)")
+    analyze.add_argument('--mode', choices=['quick', 'full'], default='quick',
+                         help="quick: indikator + keputusan; full: analisis AI lengkap")
+    analyze.add_argument('--format', choices=['json', 'jsonl', 'csv', 'table'], default='table')
+    analyze.add_argument('--jobs', type=int, default=4, help="Jumlah pasangan yang diproses bersamaan")
+    analyze.add_argument('--rpm', type=float, default=DEFAULT_REQUESTS_PER_MINUTE,
+                         help=f"Budget request CoinGecko per menit (default {DEFAULT_REQUESTS_PER_MINUTE})")
+    analyze.add_argument('--balance', type=float, default=1000, help="Saldo akun untuk mode full")
+    analyze.add_argument('--risk', type=float, default=2, help="Persen risiko per trade untuk mode full")
+    analyze.add_argument('--output', help="File output (default: stdout)")
+    analyze.add_argument('--archive', help="Catat hasil ke direktori arsip, contoh: archive")
+    analyze.add_argument('--quiet', action='store_true', help="Jangan tampilkan statistik waktu di stderr")
+    args = parser.parse_args(argv)
+
+    setup_logging(args.log_level)
+    if args.command == 'analyze':
+        return perintah_analyze(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
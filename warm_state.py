@@ -0,0 +1,140 @@
+# warm_state.py
+
+import logging
+import os
+import pickle
+import threading
+import time
+
+from analysis_pool import pack_frame, unpack_frame
+from live_feed import buat_state_seri
+from scheduler import next_candle_close
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE = 'state/warm_state.pkl'
+STATE_VERSION = 1
+
+# Snapshot lebih tua dari ini tidak dipakai: keputusan dan candle sudah terlalu basi
+MAX_STATE_AGE = 6 * 3600
+
+def buat_snapshot(live_series, live_decisions):
+    """
+    Ubah state live menjadi struktur ringkas untuk dipickle.
+    DataFrame disimpan sebagai array (timestamp int64 + OHLCV float64) seperti yang dikirim ke worker;
+    aggregator tidak disimpan karena candle yang sedang terbentuk selalu ada di baris terakhir df.
+    """
+    series = {}
+    for key, state in live_series.items():
+        timestamps, values = pack_frame(state['df'])
+        series[key] = {
+            'timestamps': timestamps,
+            'values': values,
+            'needs_sync': state['needs_sync'],
+            'last_sync': state['last_sync']
+        }
+    return {
+        'version': STATE_VERSION,
+        'saved_at': time.time(),
+        'series': series,
+        'decisions': dict(live_decisions)
+    }
+
+def tulis_atomik(path, data):
+    """Tulis ke file sementara lalu os.replace, sehingga file lama tetap utuh jika proses mati di tengah"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def simpan_warm_state(live_series, live_decisions, path=STATE_FILE):
+    """Simpan snapshot secara sinkron (dipakai saat loop live berhenti)"""
+    try:
+        data = pickle.dumps(buat_snapshot(live_series, live_decisions), protocol=pickle.HIGHEST_PROTOCOL)
+        tulis_atomik(path, data)
+        logger.info(f"Warm state disimpan: {len(live_series)} seri, {len(data) / 1024:.0f} KB")
+    except Exception as e:
+        logger.error(f"Error menyimpan warm state: {str(e)}")
+
+def muat_warm_state(path=STATE_FILE, max_age=MAX_STATE_AGE):
+    """
+    Muat snapshot dari disk.
+    Returns: (live_series, live_decisions) atau None jika file tidak ada, rusak, versinya lain atau terlalu lama
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            snapshot = pickle.load(f)
+    except Exception as e:
+        logger.error(f"Warm state tidak bisa dibaca, mulai dari kosong: {str(e)}")
+        return None
+
+    if snapshot.get('version') != STATE_VERSION:
+        logger.info("Versi warm state berbeda, diabaikan")
+        return None
+    age = time.time() - snapshot['saved_at']
+    if age > max_age:
+        logger.info(f"Warm state berumur {age / 3600:.1f} jam, diabaikan")
+        return None
+
+    live_series = {}
+    for key, saved in snapshot['series'].items():
+        state = buat_state_seri(unpack_frame(saved['timestamps'], saved['values']), *key)
+        state['needs_sync'] = saved['needs_sync']
+        state['last_sync'] = saved['last_sync']
+        live_series[key] = state
+
+    logger.info(f"Warm state dimuat: {len(live_series)} seri (umur {age:.0f} detik)")
+    return live_series, snapshot['decisions']
+
+def histori_masih_segar(state, now=None):
+    """True jika belum ada candle yang ditutup sejak sinkronisasi terakhir (histori tidak perlu diambil ulang)"""
+    now = time.time() if now is None else now
+    return not state['needs_sync'] and next_candle_close(state['timeframe'], state['last_sync']) > now
+
+class WarmStateWriter:
+    """
+    Penulis snapshot periodik untuk loop live.
+    Pickle dibuat di thread pemanggil (state konsisten), penulisan ke disk di thread latar;
+    jika penulisan sebelumnya belum selesai, snapshot kali ini dilewati.
+    """
+
+    def __init__(self, path=STATE_FILE, interval=60):
+        self.path = path
+        self.interval = interval
+        self._last_write = time.time()
+        self._thread = None
+
+    def maybe_write(self, live_series, live_decisions, now=None):
+        now = time.time() if now is None else now
+        if not self.interval or now - self._last_write < self.interval:
+            return False
+        if self._thread is not None and self._thread.is_alive():
+            return False
+        self._last_write = now
+        try:
+            data = pickle.dumps(buat_snapshot(live_series, live_decisions), protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.error(f"Error membuat warm state: {str(e)}")
+            return False
+        self._thread = threading.Thread(target=self._write, args=(data,), name='warm-state-writer', daemon=True)
+        self._thread.start()
+        return True
+
+    def _write(self, data):
+        try:
+            tulis_atomik(self.path, data)
+        except Exception as e:
+            logger.error(f"Error menulis warm state: {str(e)}")
+
+    def close(self, live_series, live_decisions):
+        """Tunggu penulisan berjalan lalu simpan snapshot terakhir secara sinkron"""
+        if self._thread is not None:
+            self._thread.join()
+        simpan_warm_state(live_series, live_decisions, self.path)
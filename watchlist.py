@@ -0,0 +1,86 @@
+# watchlist.py
+
+import threading
+
+class WatchlistRegistry:
+    """
+    Daftar pasangan (simbol, timeframe) yang dipantau, aman dipakai dari banyak thread.
+    Copy-on-write: setiap perubahan membuat tuple baru dan menaikkan versi, sehingga pembaca
+    (thread live) cukup mengambil snapshot tanpa lock dan tidak pernah melihat list setengah diubah.
+    """
+
+    def __init__(self, items=()):
+        self._lock = threading.Lock()
+        self._state = (0, tuple(self._normalisasi(items)))
+
+    @staticmethod
+    def _normalisasi(items):
+        seen = set()
+        for symbol, timeframe in items:
+            key = (symbol.upper(), timeframe)
+            if key not in seen:
+                seen.add(key)
+                yield key
+
+    def snapshot(self):
+        """(versi, tuple (simbol, timeframe)) - konsisten dan tidak berubah setelah diambil"""
+        return self._state
+
+    @property
+    def version(self):
+        return self._state[0]
+
+    def items(self):
+        return self._state[1]
+
+    def _commit(self, items):
+        # Dipanggil dengan lock dipegang; satu assignment sehingga pembaca tanpa lock tetap konsisten
+        self._state = (self._state[0] + 1, tuple(items))
+
+    def add(self, symbol, timeframe):
+        """Tambah pasangan; False jika sudah dipantau"""
+        key = (symbol.upper(), timeframe)
+        with self._lock:
+            items = self._state[1]
+            if key in items:
+                return False
+            self._commit(items + (key,))
+            return True
+
+    def remove(self, symbol, timeframe):
+        """Hapus pasangan; False jika tidak dipantau"""
+        key = (symbol.upper(), timeframe)
+        with self._lock:
+            items = self._state[1]
+            if key not in items:
+                return False
+            self._commit(item for item in items if item != key)
+            return True
+
+    def remove_at(self, index):
+        """Hapus berdasarkan posisi (untuk menu bernomor); mengembalikan pasangan yang dihapus atau None"""
+        with self._lock:
+            items = self._state[1]
+            if not 0 <= index < len(items):
+                return None
+            removed = items[index]
+            self._commit(items[:index] + items[index + 1:])
+            return removed
+
+    def replace(self, items):
+        """Ganti seluruh isi daftar"""
+        with self._lock:
+            self._commit(self._normalisasi(items))
+
+    def to_config(self):
+        """Format yang disimpan di file konfigurasi: list of {'symbol', 'timeframe'}"""
+        return [{'symbol': symbol, 'timeframe': timeframe} for symbol, timeframe in self.items()]
+
+    def __len__(self):
+        return len(self._state[1])
+
+    def __iter__(self):
+        return iter(self._state[1])
+
+    def __contains__(self, key):
+        return key in self._state[1]